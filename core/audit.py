@@ -0,0 +1,259 @@
+# core/audit.py
+import atexit
+import json
+import logging
+import os
+import threading
+import uuid
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: deteksi spool yatim lewat file lock tidak tersedia
+    fcntl = None
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+logger = logging.getLogger(__name__)
+
+
+def read_spool(path):
+    records = []
+    with open(path, encoding='utf-8') as handle:
+        for line in handle:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                # Baris terakhir bisa terpotong jika proses mati saat menulis
+                logger.warning('Baris spool audit rusak di %s dilewati.', path)
+    return records
+
+
+def write_records(records, batch_size):
+    """
+    Menyimpan record audit dengan bulk_create. Jika user sudah terhapus sejak
+    record dibuat, user_id dikosongkan (sama seperti on_delete=SET_NULL).
+    """
+    from django.contrib.auth import get_user_model
+    from .models import AuditLog
+
+    if not records:
+        return
+    close_old_connections()
+
+    def build():
+        return [
+            AuditLog(
+                user_id=record['user_id'],
+                action=record['action'],
+                details=record['details'],
+                timestamp=parse_datetime(record['timestamp']),
+            )
+            for record in records
+        ]
+
+    try:
+        AuditLog.objects.bulk_create(build(), batch_size=batch_size)
+    except IntegrityError:
+        user_ids = {record['user_id'] for record in records if record['user_id'] is not None}
+        existing = set(get_user_model().objects.filter(pk__in=user_ids).values_list('pk', flat=True))
+        for record in records:
+            if record['user_id'] not in existing:
+                record['user_id'] = None
+        AuditLog.objects.bulk_create(build(), batch_size=batch_size)
+
+
+class AuditWriter:
+    """
+    Penulis log audit di luar jalur request. Setiap record ditambahkan ke file
+    spool lokal (satu baris JSON) lalu di-flush ke database oleh thread latar
+    belakang dengan bulk_create, tiap `flush_interval` detik atau saat jumlah
+    record mencapai `batch_size`.
+
+    Saat flush, spool aktif diganti nama menjadi segmen dan segmen baru dihapus
+    setelah tersimpan. Jika proses mati sebelum itu, spool dan segmennya tetap
+    ada di disk dan diputar ulang oleh proses lain (at-least-once).
+    """
+
+    def __init__(self, spool_dir, batch_size=200, flush_interval=2.0):
+        self.spool_dir = Path(spool_dir)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.pid = None
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.wakeup = threading.Event()
+
+    def log(self, user_id, action, details=''):
+        self._ensure_started()
+        line = json.dumps({
+            'user_id': user_id,
+            'action': action[:255],
+            'details': details,
+            'timestamp': timezone.now().isoformat(),
+        }, ensure_ascii=False)
+        with self.lock:
+            self.spool.write(line + '\n')
+            self.pending += 1
+            full = self.pending >= self.batch_size
+        if full:
+            self.wakeup.set()
+
+    def flush(self):
+        with self.flush_lock:
+            with self.lock:
+                if self.pending:
+                    self.spool.close()
+                    self.sequence += 1
+                    os.replace(self.spool_path, self.spool_dir / ('%s-%06d.segment' % (self.token, self.sequence)))
+                    self.spool = self._open_spool()
+                    self.pending = 0
+            # Segmen yang gagal pada flush sebelumnya ikut dicoba lagi, sesuai urutan
+            for segment in sorted(self.spool_dir.glob(self.token + '-*.segment')):
+                write_records(read_spool(segment), self.batch_size)
+                segment.unlink()
+
+    def close(self):
+        if self.pid != os.getpid():
+            return
+        self.stopped = True
+        self.wakeup.set()
+        try:
+            self.flush()
+        except Exception:
+            logger.exception('Gagal flush log audit saat proses berhenti, data tetap di spool.')
+            return
+        self.spool.close()
+        self.spool_path.unlink(missing_ok=True)
+        self.lock_file.close()
+        (self.spool_dir / (self.token + '.lock')).unlink(missing_ok=True)
+
+    def replay_orphans(self):
+        """
+        Memasukkan spool milik proses yang sudah mati. Proses yang masih hidup
+        memegang flock pada file .lock-nya, sehingga spool-nya dilewati.
+        """
+        if fcntl is None:
+            return
+        for lock_path in sorted(self.spool_dir.glob('*.lock')):
+            token = lock_path.stem
+            if token == self.token:
+                continue
+            with open(lock_path, 'a') as handle:
+                try:
+                    fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    continue
+                paths = sorted(self.spool_dir.glob(token + '-*.segment'))
+                paths.append(self.spool_dir / (token + '.spool'))
+                for path in paths:
+                    if path.exists():
+                        write_records(read_spool(path), self.batch_size)
+                        path.unlink()
+                lock_path.unlink(missing_ok=True)
+
+    @property
+    def spool_path(self):
+        return self.spool_dir / (self.token + '.spool')
+
+    def _open_spool(self):
+        # Line-buffered: setiap record langsung sampai ke OS tanpa fsync per request
+        return open(self.spool_path, 'a', encoding='utf-8', buffering=1)
+
+    def _ensure_started(self):
+        if self.pid == os.getpid():
+            return
+        with self.lock:
+            if self.pid == os.getpid():
+                return
+            # Dimulai saat pertama dipakai (setelah fork worker gunicorn), bukan saat import
+            self.token = '%d-%s' % (os.getpid(), uuid.uuid4().hex[:8])
+            self.sequence = 0
+            self.pending = 0
+            self.stopped = False
+            self.spool_dir.mkdir(parents=True, exist_ok=True)
+            self.lock_file = open(self.spool_dir / (self.token + '.lock'), 'w')
+            if fcntl is not None:
+                fcntl.flock(self.lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            self.spool = self._open_spool()
+            self.thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+            self.pid = os.getpid()
+            self.thread.start()
+            atexit.register(self.close)
+
+    def _run(self):
+        try:
+            self.replay_orphans()
+        except Exception:
+            logger.exception('Gagal memutar ulang spool audit.')
+        while not self.stopped:
+            self.wakeup.wait(self.flush_interval)
+            self.wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Gagal menulis log audit, data tetap di spool.')
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = AuditWriter(
+                    getattr(settings, 'AUDIT_LOG_SPOOL_DIR', Path(settings.BASE_DIR) / 'var' / 'audit-spool'),
+                    batch_size=getattr(settings, 'AUDIT_LOG_BATCH_SIZE', 200),
+                    flush_interval=getattr(settings, 'AUDIT_LOG_FLUSH_INTERVAL', 2.0),
+                )
+    return _writer
+
+
+def log_action(user, action, details='', request=None):
+    """
+    Mencatat log audit. Jika `request` diberikan, request ditandai sudah dicatat
+    sehingga AuditLogMiddleware tidak membuat entri generik lagi.
+    """
+    if request is not None:
+        getattr(request, '_request', request).audit_logged = True
+    user_id = user.pk if user is not None and user.is_authenticated else None
+    if not getattr(settings, 'AUDIT_LOG_ASYNC', False):
+        from .models import AuditLog
+        AuditLog.objects.create(user_id=user_id, action=action[:255], details=details)
+        return
+    get_writer().log(user_id, action, details)
+
+
+class AuditLogMiddleware:
+    """
+    Mencatat setiap request tulis (POST/PUT/PATCH/DELETE) ke API yang berhasil.
+    Dipasang setelah AuthenticationMiddleware; user JWT sudah terisi di request
+    setelah view DRF berjalan.
+    """
+    audit_methods = ('POST', 'PUT', 'PATCH', 'DELETE')
+    path_prefix = '/api/'
+    # Login dan refresh token tidak mengubah data
+    ignored_paths = ('/api/token/',)
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            request.method in self.audit_methods
+            and request.path.startswith(self.path_prefix)
+            and not request.path.startswith(self.ignored_paths)
+            and response.status_code < 400
+            and not getattr(request, 'audit_logged', False)
+        ):
+            match = request.resolver_match
+            details = 'view=%s status=%d' % (match.view_name if match else '-', response.status_code)
+            log_action(getattr(request, 'user', None), '%s %s' % (request.method, request.path), details)
+        return response
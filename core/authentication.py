@@ -0,0 +1,68 @@
+# core/authentication.py
+from django.conf import settings
+from django.core.cache import cache
+from django.db import router, transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+USER_CACHE_KEY_PREFIX = 'auth-user:'
+# Hanya field yang dibaca permission class; field lain dimuat lazy seperti .only()
+CACHED_USER_FIELDS = ('id', 'role', 'verified', 'is_active')
+
+
+def user_cache_key(user_id):
+    return '%s%s' % (USER_CACHE_KEY_PREFIX, user_id)
+
+
+def forget_user(user_id):
+    """
+    Menghapus user dari cache autentikasi. Dihapus sekali lagi setelah commit:
+    request lain yang membaca baris lama sebelum commit bisa saja sudah
+    menyimpannya kembali ke cache.
+    """
+    key = user_cache_key(user_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication yang mengambil user dari cache (AUTH_USER_CACHE_TIMEOUT
+    detik) alih-alih query User di setiap request. Yang disimpan hanya
+    CACHED_USER_FIELDS dan md5 hash password (untuk CHECK_REVOKE_TOKEN), bukan
+    instance User lengkap; hash password tidak pernah ditulis ke cache. Cache
+    dihapus oleh signal setiap kali User disimpan atau dihapus (update data,
+    reset password, admin), sehingga perubahan role atau password langsung berlaku.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        key = user_cache_key(user_id)
+        cached = cache.get(key)
+        if cached is None:
+            # Pengecekan user aktif dan password dilakukan di sini
+            user = super().get_user(validated_token)
+            cached = {name: getattr(user, name) for name in CACHED_USER_FIELDS}
+            cached['password_hash'] = get_md5_hash_password(user.password)
+            cache.set(key, cached, getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 60))
+            return user
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not cached['is_active']:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != cached['password_hash']:
+                raise AuthenticationFailed(_("The user's password has been changed."), code='password_changed')
+        # Instance dengan field lain ter-defer: dibaca dari database hanya jika
+        # dipakai, dan save() hanya menyimpan field yang dimuat atau diubah
+        # (from_db membaca nilai menurut urutan concrete_fields)
+        names = [field.attname for field in self.user_model._meta.concrete_fields if field.attname in cached]
+        return self.user_model.from_db(
+            router.db_for_read(self.user_model), names, [cached[name] for name in names]
+        )
@@ -0,0 +1,47 @@
+# core/cache.py
+import hashlib
+import time
+
+from django.core.cache import cache
+
+VERSION_KEY_PREFIX = 'model-version:'
+
+
+def _version_key(model):
+    return VERSION_KEY_PREFIX + model._meta.label_lower
+
+
+def get_model_versions(models):
+    """
+    Versi (cap waktu ns) setiap model. Model yang belum punya versi (cache baru
+    atau terhapus) diberi versi baru, sehingga entri lama tidak akan terbaca.
+    """
+    keys = {_version_key(model): model for model in models}
+    versions = cache.get_many(list(keys))
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in sorted(keys)]
+
+
+def bump_model_version(model):
+    cache.set(_version_key(model), time.time_ns(), timeout=None)
+
+
+def response_cache_key(request, models):
+    """
+    Kunci cache respons: host, path, query string, format renderer dan versi
+    model yang dibaca. Setiap tulis ke salah satu model mengubah kuncinya.
+    """
+    versions = get_model_versions(models)
+    renderer = getattr(getattr(request, 'accepted_renderer', None), 'format', '')
+    raw = '|'.join([
+        request.scheme,
+        request.get_host(),
+        request.path,
+        '&'.join(sorted(request.GET.urlencode().split('&'))),
+        renderer,
+        ','.join(str(version) for version in versions),
+    ])
+    return 'response:' + hashlib.md5(raw.encode('utf-8')).hexdigest()
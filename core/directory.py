@@ -0,0 +1,112 @@
+# core/directory.py
+import math
+
+from django.db import transaction
+from django.db.models import Count
+
+from .models import DirectoryEntry, DirectoryToken, DirectoryTrigram, User
+from .search import normalize, words
+
+AUTOCOMPLETE_LIMIT = 10
+MAX_QUERY_WORDS = 5
+# Minimal bagian trigram query yang harus cocok agar sebuah entri ikut dalam hasil
+TRIGRAM_THRESHOLD = 0.5
+
+# Field User yang ditampilkan di direktori; simpan yang hanya mengubah field lain dilewati
+USER_FIELDS = frozenset({'first_name', 'last_name', 'username', 'is_active'})
+
+
+def trigrams(text):
+    """Trigram setiap kata, diberi padding seperti pg_trgm: "  ab" dan "ab " ikut terbentuk."""
+    result = set()
+    for word in words(text):
+        padded = '  %s ' % word
+        result.update(padded[index:index + 3] for index in range(len(padded) - 2))
+    return result
+
+
+def entry_values(user):
+    profile = getattr(user, 'profile', None)
+    full_name = ' '.join(filter(None, [user.first_name, user.last_name])) or user.username
+    return {
+        'full_name': full_name[:255],
+        'username': user.username,
+        'sort_name': normalize(full_name)[:255],
+        'job': (profile.job or '') if profile else '',
+        'education': profile.education if profile else '',
+        'graduation_year': profile.graduation_year if profile else None,
+    }
+
+
+def _delete_terms(user_ids):
+    # Satu DELETE langsung per tabel (lihat INDEX_TERM_MODELS di core.signals)
+    for model in (DirectoryToken, DirectoryTrigram):
+        model.objects.filter(entry_id__in=user_ids).delete()
+
+
+def index_users(user_ids, batch_size=1000):
+    """
+    Memperbarui entri direktori, kata dan trigram untuk sekumpulan user.
+    User yang sudah tidak aktif atau terhapus dikeluarkan dari direktori.
+    """
+    user_ids = list(user_ids)
+    users = list(User.objects.filter(pk__in=user_ids, is_active=True).select_related('profile'))
+    with transaction.atomic():
+        existing = set(DirectoryEntry.objects.filter(pk__in=user_ids).values_list('pk', flat=True))
+        entries = {user.pk: DirectoryEntry(user_id=user.pk, **entry_values(user)) for user in users}
+        DirectoryEntry.objects.bulk_update(
+            [entry for pk, entry in entries.items() if pk in existing],
+            ['full_name', 'username', 'sort_name', 'job', 'education', 'graduation_year'],
+            batch_size=batch_size,
+        )
+        DirectoryEntry.objects.bulk_create(
+            [entry for pk, entry in entries.items() if pk not in existing], batch_size=batch_size
+        )
+        _delete_terms(list(existing))
+        removed = existing - set(entries)
+        if removed:
+            DirectoryEntry.objects.filter(pk__in=removed).delete()
+
+        tokens, grams = [], []
+        for pk, entry in entries.items():
+            text = ' '.join([entry.full_name, entry.username, entry.job, entry.education])
+            entry_tokens = {token[:64] for token in words(text)}
+            if entry.graduation_year:
+                entry_tokens.add(str(entry.graduation_year))
+            tokens.extend(DirectoryToken(token=token, entry_id=pk) for token in entry_tokens)
+            grams.extend(DirectoryTrigram(trigram=gram, entry_id=pk) for gram in trigrams(text))
+        DirectoryToken.objects.bulk_create(tokens, batch_size=batch_size)
+        DirectoryTrigram.objects.bulk_create(grams, batch_size=batch_size)
+
+
+def autocomplete(query, queryset=None):
+    """
+    Entri yang setiap kata query-nya menjadi awalan salah satu kata entri
+    ("and sur" cocok dengan "Andi Surya"). Satu subquery per kata, masing-masing
+    range scan di index unik (token, entry).
+    """
+    queryset = DirectoryEntry.objects.all() if queryset is None else queryset
+    query_words = words(query)[:MAX_QUERY_WORDS]
+    if not query_words:
+        return queryset.none()
+    for word in query_words:
+        queryset = queryset.filter(pk__in=DirectoryToken.objects.filter(token__startswith=word).values('entry_id'))
+    return queryset.order_by('sort_name', 'pk')[:AUTOCOMPLETE_LIMIT]
+
+
+def search(query, queryset=None):
+    """
+    Pencarian toleran salah ketik: entri diurutkan menurut jumlah trigram
+    query yang cocok (minimal TRIGRAM_THRESHOLD), lalu nama.
+    """
+    queryset = DirectoryEntry.objects.all() if queryset is None else queryset
+    query_grams = trigrams(' '.join(words(query)[:MAX_QUERY_WORDS]))
+    if not query_grams:
+        return queryset.none()
+    minimum = max(1, math.ceil(len(query_grams) * TRIGRAM_THRESHOLD))
+    return (
+        queryset.filter(trigrams__trigram__in=query_grams)
+        .annotate(matched=Count('trigrams'))
+        .filter(matched__gte=minimum)
+        .order_by('-matched', 'sort_name', 'pk')
+    )
@@ -0,0 +1,148 @@
+# core/exports.py
+import csv
+
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+from .pagination import _lookup_value, keyset_filter, resolve_ordering
+from .streaming import streaming_content
+
+# Ukuran minimal potongan yang dikirim per yield
+STREAM_BUFFER_SIZE = 64 * 1024
+
+
+class _Echo:
+    # csv.writer butuh objek dengan write(); baris langsung dikembalikan sebagai string
+    def write(self, value):
+        return value
+
+
+def _buffered(chunks, buffer_size):
+    buffer, size = [], 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        size += len(chunk)
+        if size >= buffer_size:
+            yield ''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def iter_ndjson(rows, columns, buffer_size=STREAM_BUFFER_SIZE):
+    """
+    Satu objek JSON per baris. `rows` berupa tuple (misal dari values_list)
+    yang urutannya sama dengan `columns`.
+    """
+    encoder = JSONEncoder(ensure_ascii=False)
+    return _buffered(
+        (encoder.encode(dict(zip(columns, row))) + '\n' for row in rows),
+        buffer_size,
+    )
+
+
+def iter_csv(rows, columns, buffer_size=STREAM_BUFFER_SIZE):
+    writer = csv.writer(_Echo())
+
+    def lines():
+        yield writer.writerow(columns)
+        for row in rows:
+            yield writer.writerow([_csv_value(value) for value in row])
+
+    return _buffered(lines(), buffer_size)
+
+
+def iter_excel_csv(rows, columns, buffer_size=STREAM_BUFFER_SIZE):
+    # BOM UTF-8 agar Excel tidak salah membaca huruf non-ASCII
+    yield '\ufeff'
+    yield from iter_csv(rows, columns, buffer_size)
+
+
+def iter_json(rows, columns, buffer_size=STREAM_BUFFER_SIZE):
+    """Satu array JSON yang dialirkan per elemen."""
+    encoder = JSONEncoder(ensure_ascii=False)
+
+    def chunks():
+        yield '['
+        for index, row in enumerate(rows):
+            yield (',\n' if index else '\n') + encoder.encode(dict(zip(columns, row)))
+        yield '\n]\n'
+
+    return _buffered(chunks(), buffer_size)
+
+
+EXPORT_FORMATS = {
+    'ndjson': (iter_ndjson, 'application/x-ndjson; charset=utf-8', 'ndjson'),
+    'csv': (iter_csv, 'text/csv; charset=utf-8', 'csv'),
+    'excel': (iter_excel_csv, 'text/csv; charset=utf-8', 'csv'),
+    'json': (iter_json, 'application/json; charset=utf-8', 'json'),
+}
+
+
+def iter_rows(queryset, lookups, chunk_size=2000):
+    """
+    Membaca hasil queryset per potongan dengan keyset (WHERE posisi > terakhir
+    ... LIMIT n) mengikuti ordering queryset. Driver MySQL memuat seluruh hasil
+    ke memori untuk iterator(), sedangkan potongan keyset menjaga memori tetap
+    datar di semua database dan setiap query memakai range scan index.
+    """
+    ordering = resolve_ordering(queryset)
+    queryset = queryset.order_by(*ordering)
+    keys = [field.lstrip('-') for field in ordering]
+    width = len(lookups)
+    position = None
+    while True:
+        chunk = queryset if position is None else queryset.filter(keyset_filter(ordering, position))
+        rows = list(chunk.values_list(*lookups, *keys)[:chunk_size])
+        for row in rows:
+            yield row[:width]
+        if len(rows) < chunk_size:
+            return
+        position = list(rows[-1][width:])
+
+
+def iter_objects(queryset, chunk_size=500):
+    """
+    Seperti iter_rows, tetapi menghasilkan instance model; select_related dan
+    prefetch_related queryset berlaku per potongan. Kolom ordering tidak boleh
+    NULL karena posisi keyset dibandingkan dengan < dan >.
+    """
+    ordering = resolve_ordering(queryset)
+    queryset = queryset.order_by(*ordering)
+    keys = [field.lstrip('-') for field in ordering]
+    position = None
+    while True:
+        chunk = queryset if position is None else queryset.filter(keyset_filter(ordering, position))
+        objects = list(chunk[:chunk_size])
+        yield from objects
+        if len(objects) < chunk_size:
+            return
+        position = [_lookup_value(objects[-1], key) for key in keys]
+
+
+def export_response(queryset, fields, export_format, filename, chunk_size=2000, request=None):
+    """
+    Mengalirkan hasil queryset sebagai NDJSON/CSV/JSON tanpa memuat semua baris
+    ke memori. `fields` berupa pasangan (nama kolom output, lookup ORM); baris
+    dibaca dengan values_list per potongan (iter_rows) sehingga tidak membuat
+    instance model. Berikan `request` agar di ASGI isi file dialirkan lewat
+    iterator async (lihat core.streaming).
+    """
+    writer, content_type, extension = EXPORT_FORMATS[export_format]
+    columns = [name for name, lookup in fields]
+    rows = iter_rows(queryset, [lookup for name, lookup in fields], chunk_size=chunk_size)
+    content = writer(rows, columns)
+    if request is not None:
+        content = streaming_content(request, content)
+    response = StreamingHttpResponse(content, content_type=content_type)
+    response['Content-Disposition'] = 'attachment; filename="%s.%s"' % (filename, extension)
+    response['Cache-Control'] = 'no-cache'
+    return response
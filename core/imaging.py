@@ -0,0 +1,166 @@
+# core/imaging.py
+import base64
+import io
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+RENDITION_WIDTHS = (320, 640, 1280)
+PLACEHOLDER_WIDTH = 16
+JPEG_QUALITY = 82
+WEBP_QUALITY = 80
+
+
+def _encode(image, image_format, quality):
+    buffer = io.BytesIO()
+    if image_format == 'JPEG':
+        image.save(buffer, 'JPEG', quality=quality, optimize=True, progressive=True)
+    else:
+        image.save(buffer, image_format, quality=quality, method=4)
+    return buffer.getvalue()
+
+
+def render_image(source, widths=RENDITION_WIDTHS):
+    """
+    Dijalankan di proses worker (tanpa Django ORM). `source` berupa path file
+    atau bytes. Mengembalikan ukuran asli, placeholder kecil (data URI) dan
+    daftar (lebar, tinggi, format, bytes) untuk setiap turunan. Lebar yang lebih
+    besar dari gambar asli tidak dibuat.
+    """
+    handle = io.BytesIO(source) if isinstance(source, bytes) else open(source, 'rb')
+    with handle, Image.open(handle) as original:
+        # Foto ponsel menyimpan orientasi di EXIF
+        image = ImageOps.exif_transpose(original)
+        has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+        width, height = image.size
+
+        variants = []
+        for target in sorted(set(widths)):
+            if target >= width:
+                continue
+            resized = image.resize((target, max(1, round(height * target / width))), Image.LANCZOS)
+            variants.append((target, resized.height, 'webp', _encode(resized, 'WEBP', WEBP_QUALITY)))
+            if has_alpha:
+                variants.append((target, resized.height, 'png', _encode(resized, 'PNG', None)))
+            else:
+                variants.append((target, resized.height, 'jpg', _encode(resized, 'JPEG', JPEG_QUALITY)))
+
+        tiny = image.resize((PLACEHOLDER_WIDTH, max(1, round(height * PLACEHOLDER_WIDTH / width))), Image.BILINEAR)
+        placeholder = 'data:image/webp;base64,' + base64.b64encode(_encode(tiny, 'WEBP', 40)).decode('ascii')
+    return {'width': width, 'height': height, 'placeholder': placeholder, 'variants': variants}
+
+
+def rendition_name(source_name, width, extension):
+    folder, filename = os.path.split(source_name)
+    stem = os.path.splitext(filename)[0]
+    return os.path.join(folder, 'renditions', '%s-%d.%s' % (stem, width, extension))
+
+
+def store_renditions(source_name, rendered, storage=None):
+    """Menyimpan turunan ke storage dan mengembalikan metadata untuk field JSON."""
+    storage = storage or default_storage
+    sources = {}
+    for width, height, extension, data in rendered['variants']:
+        name = storage.save(rendition_name(source_name, width, extension), ContentFile(data))
+        sources.setdefault(extension, []).append({'width': width, 'height': height, 'name': name})
+    return {
+        'source': source_name,
+        'width': rendered['width'],
+        'height': rendered['height'],
+        'placeholder': rendered['placeholder'],
+        'sources': sources,
+    }
+
+
+def read_source(name, storage=None):
+    # Storage lokal cukup mengirim path ke worker; storage lain mengirim isi file
+    storage = storage or default_storage
+    try:
+        return storage.path(name)
+    except NotImplementedError:
+        with storage.open(name, 'rb') as handle:
+            return handle.read()
+
+
+def save_renditions(model, pk, field_name, renditions_field, source_name, rendered):
+    """
+    Menyimpan hasil render dan memperbarui baris model, hanya jika file sumbernya
+    belum diganti sejak render dimulai.
+    """
+    from .cache import bump_model_version
+
+    renditions = store_renditions(source_name, rendered)
+    updated = model.objects.filter(pk=pk, **{field_name: source_name}).update(**{
+        renditions_field: renditions,
+        'updated_at': timezone.now(),
+    })
+    if updated:
+        # update() tidak memicu signal: versi cache respons dinaikkan manual
+        bump_model_version(model)
+    return renditions
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ProcessPoolExecutor(
+                    max_workers=getattr(settings, 'IMAGE_RENDITION_WORKERS', 2),
+                    # spawn: worker tidak mewarisi koneksi database dan thread proses web
+                    mp_context=multiprocessing.get_context('spawn'),
+                )
+    return _executor
+
+
+def _on_rendered(model, pk, field_name, renditions_field, source_name):
+    def callback(future):
+        try:
+            save_renditions(model, pk, field_name, renditions_field, source_name, future.result())
+        except Exception:
+            logger.exception('Gagal membuat turunan gambar %s.', source_name)
+        finally:
+            close_old_connections()
+    return callback
+
+
+def schedule_renditions(instance, field_name):
+    """
+    Menjadwalkan pembuatan turunan gambar setelah transaksi commit. Render
+    berjalan di process pool sehingga request upload tidak menunggu Pillow.
+    """
+    schedule_rendition(type(instance), instance.pk, field_name, getattr(instance, field_name).name)
+
+
+def schedule_rendition(model, pk, field_name, source_name):
+    # Versi tanpa instance, untuk baris yang dibuat dengan bulk_create
+    renditions_field = model.RENDITION_FIELDS[field_name]
+
+    def submit():
+        if getattr(settings, 'IMAGE_RENDITIONS_ASYNC', False):
+            future = get_executor().submit(render_image, read_source(source_name))
+            future.add_done_callback(_on_rendered(model, pk, field_name, renditions_field, source_name))
+            return
+        try:
+            save_renditions(model, pk, field_name, renditions_field, source_name,
+                            render_image(read_source(source_name)))
+        except Exception:
+            logger.exception('Gagal membuat turunan gambar %s.', source_name)
+
+    transaction.on_commit(submit)
@@ -0,0 +1,55 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from core.imaging import read_source, render_image, save_renditions
+
+
+class Command(BaseCommand):
+    help = "Membuat turunan gambar (beberapa lebar + WebP + placeholder) untuk gambar yang sudah ada."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', help='Nama model, misalnya news atau galleryimage. Default: semua.')
+        parser.add_argument('--force', action='store_true', help='Buat ulang walaupun turunan sudah ada.')
+        parser.add_argument('--workers', type=int, default=None, help='Jumlah proses worker Pillow.')
+
+    def handle(self, *args, **options):
+        models = [model for model in apps.get_app_config('core').get_models() if getattr(model, 'RENDITION_FIELDS', None)]
+        if options['model']:
+            models = [model for model in models if model._meta.model_name == options['model'].lower()]
+            if not models:
+                raise CommandError(f"Model {options['model']} tidak punya field gambar.")
+
+        jobs = []
+        for model in models:
+            for field_name, renditions_field in model.RENDITION_FIELDS.items():
+                default = model._meta.get_field(field_name).get_default()
+                rows = model.objects.values_list('pk', field_name, renditions_field).order_by('pk')
+                for pk, name, renditions in rows.iterator(chunk_size=500):
+                    if not name or name == default:
+                        continue
+                    if renditions and renditions.get('source') == name and not options['force']:
+                        continue
+                    jobs.append((model, pk, field_name, renditions_field, name))
+
+        done = failed = 0
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=options['workers'], mp_context=context) as executor:
+            futures = {}
+            for job in jobs:
+                try:
+                    futures[executor.submit(render_image, read_source(job[-1]))] = job
+                except OSError as exc:
+                    failed += 1
+                    self.stderr.write(f"{job[-1]}: {exc}")
+            for future in as_completed(futures):
+                model, pk, field_name, renditions_field, name = futures[future]
+                try:
+                    save_renditions(model, pk, field_name, renditions_field, name, future.result())
+                    done += 1
+                except Exception as exc:
+                    failed += 1
+                    self.stderr.write(f"{name}: {exc}")
+        self.stdout.write(self.style.SUCCESS(f"{done} gambar diproses, {failed} gagal."))
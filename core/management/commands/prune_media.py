@@ -0,0 +1,36 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.storage import is_content_addressed, referenced_names
+
+
+class Command(BaseCommand):
+    help = "Menghapus file media content-addressed yang tidak lagi dirujuk baris mana pun."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Hanya tampilkan file yang akan dihapus.')
+        parser.add_argument('--min-age', type=int, default=24 * 60 * 60,
+                            help='Umur minimum file (detik), agar upload yang belum tersimpan ke database tidak ikut terhapus.')
+
+    def handle(self, *args, **options):
+        # Batas waktu diambil sebelum membaca database: file yang lebih baru dari ini dilewati
+        cutoff = time.time() - options['min_age']
+        referenced = referenced_names()
+        removed = kept = 0
+        for root, _, filenames in os.walk(settings.MEDIA_ROOT):
+            for filename in filenames:
+                path = os.path.join(root, filename)
+                name = os.path.relpath(path, settings.MEDIA_ROOT).replace(os.sep, '/')
+                if not is_content_addressed(name) or name in referenced or os.path.getmtime(path) > cutoff:
+                    kept += 1
+                    continue
+                if options['dry_run']:
+                    self.stdout.write(name)
+                else:
+                    os.remove(path)
+                removed += 1
+        verb = 'akan dihapus' if options['dry_run'] else 'dihapus'
+        self.stdout.write(self.style.SUCCESS(f"{removed} file {verb}, {kept} dipertahankan."))
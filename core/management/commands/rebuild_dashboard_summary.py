@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.models import DashboardSummary
+
+
+class Command(BaseCommand):
+    help = "Membangun ulang DashboardSummary dari tabel sumber dan melaporkan selisih (drift)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Hanya periksa selisih tanpa menulis; keluar dengan error jika ada drift.',
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            stored = DashboardSummary.totals(lock=True)
+            fresh = DashboardSummary.compute()
+            drift = {}
+            for field, value in fresh.items():
+                current = getattr(stored, field) if stored else None
+                if current != value:
+                    drift[field] = (current, value)
+
+            for field, (current, value) in drift.items():
+                self.stdout.write(f"{field}: tersimpan={current} seharusnya={value}")
+
+            if options['check']:
+                if drift:
+                    raise CommandError(f"Ditemukan drift pada {len(drift)} counter.")
+                self.stdout.write(self.style.SUCCESS("Tidak ada drift."))
+                return
+
+            DashboardSummary.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"DashboardSummary dibangun ulang ({len(drift)} counter diperbaiki)."))
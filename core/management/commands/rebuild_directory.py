@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.directory import index_users
+from core.models import DirectoryEntry, User
+
+
+class Command(BaseCommand):
+    help = "Membangun ulang indeks direktori alumni (entri, kata dan trigram) dari User dan AlumniProfile."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        if chunk_size < 1:
+            raise CommandError('--chunk-size harus lebih dari 0.')
+        # User nonaktif dan entri yatim ikut diproses agar dikeluarkan dari direktori
+        user_ids = sorted(
+            set(User.objects.values_list('pk', flat=True)) | set(DirectoryEntry.objects.values_list('pk', flat=True))
+        )
+        for start in range(0, len(user_ids), chunk_size):
+            index_users(user_ids[start:start + chunk_size])
+        self.stdout.write(self.style.SUCCESS(f"Direktori dibangun ulang ({DirectoryEntry.objects.count()} entri)."))
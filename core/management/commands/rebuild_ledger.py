@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import LedgerDay
+
+LEDGER_FIELDS = ('donation_total', 'donation_count', 'usage_total', 'usage_count', 'balance')
+
+
+class Command(BaseCommand):
+    help = "Membangun ulang rollup harian LedgerDay dari Donation dan Usage, serta melaporkan selisih."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Hanya periksa selisih tanpa menulis; keluar dengan error jika ada drift.',
+        )
+
+    def handle(self, *args, **options):
+        fresh = {row['date']: row for row in LedgerDay.compute()}
+        stored = {row['date']: row for row in LedgerDay.objects.values('date', *LEDGER_FIELDS)}
+
+        drift = 0
+        for day in sorted(set(fresh) | set(stored)):
+            expected, current = fresh.get(day), stored.get(day)
+            for field in LEDGER_FIELDS:
+                expected_value = expected[field] if expected else 0
+                current_value = current[field] if current else 0
+                if expected_value != current_value:
+                    drift += 1
+                    self.stdout.write(f"{day} {field}: tersimpan={current_value} seharusnya={expected_value}")
+
+        if options['check']:
+            if drift:
+                raise CommandError(f"Ditemukan {drift} selisih pada ledger.")
+            self.stdout.write(self.style.SUCCESS("Tidak ada drift."))
+            return
+
+        LedgerDay.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Ledger dibangun ulang ({len(fresh)} hari, {drift} selisih diperbaiki)."))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import SearchDocument
+from core.search import SEARCH_SOURCES, index_objects, remove_objects
+
+
+class Command(BaseCommand):
+    help = "Membangun ulang indeks pencarian dari berita, event, diskusi dan balasan diskusi."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', choices=sorted(SEARCH_SOURCES), help='Hanya satu jenis dokumen. Default: semua.')
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size harus lebih dari 0.')
+        sources = [SEARCH_SOURCES[options['kind']]] if options['kind'] else SEARCH_SOURCES.values()
+        for source in sources:
+            indexed = set()
+            chunk = []
+            for instance in source.get_queryset().order_by('pk').iterator(chunk_size=options['chunk_size']):
+                chunk.append(instance)
+                if len(chunk) >= options['chunk_size']:
+                    index_objects(source, chunk)
+                    indexed.update(instance.pk for instance in chunk)
+                    chunk = []
+            index_objects(source, chunk)
+            indexed.update(instance.pk for instance in chunk)
+
+            # Dokumen yang objek aslinya sudah tidak ada
+            stale = sorted(set(SearchDocument.objects.filter(kind=source.kind).values_list('object_id', flat=True)) - indexed)
+            for start in range(0, len(stale), options['chunk_size']):
+                remove_objects(source, stale[start:start + options['chunk_size']])
+            self.stdout.write(f"{source.kind}: {len(indexed)} dokumen diindeks, {len(stale)} dihapus.")
+        self.stdout.write(self.style.SUCCESS("Indeks pencarian selesai dibangun ulang."))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from core.models import NotificationBroadcast
+from core.notifications import fan_out
+
+
+class Command(BaseCommand):
+    help = "Menjalankan/melanjutkan broadcast notifikasi yang belum selesai (misalnya setelah proses restart)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=None, help='Jumlah user per batch bulk_create.')
+
+    def handle(self, *args, **options):
+        pending = NotificationBroadcast.objects.exclude(status='done').order_by('id').values_list('id', flat=True)
+        for broadcast_id in list(pending):
+            broadcast = fan_out(broadcast_id, chunk_size=options['chunk_size'])
+            self.stdout.write(
+                f"#{broadcast.pk} {broadcast.title}: {broadcast.sent}/{broadcast.total} "
+                f"({broadcast.throughput} notifikasi/detik)"
+            )
+        self.stdout.write(self.style.SUCCESS("Selesai."))
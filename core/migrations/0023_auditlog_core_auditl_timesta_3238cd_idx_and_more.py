@@ -0,0 +1,37 @@
+# Generated by Django 5.1.5 on 2026-10-18 08:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0022_bpa_direksi'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['timestamp', 'id'], name='core_auditl_timesta_3238cd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='discussionpost',
+            index=models.Index(fields=['created_at', 'id'], name='core_discus_created_446495_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='donation',
+            index=models.Index(fields=['created_at', 'id'], name='core_donati_created_2204c0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(fields=['created_at', 'id'], name='core_feedba_created_727911_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='news',
+            index=models.Index(fields=['published_date', 'id'], name='core_news_publish_b46988_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usage',
+            index=models.Index(fields=['date', 'id'], name='core_usage_date_99f48e_idx'),
+        ),
+    ]
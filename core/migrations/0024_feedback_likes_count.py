@@ -0,0 +1,32 @@
+# Generated by Django 5.1.5 on 2026-10-18 08:47
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_likes_count(apps, schema_editor):
+    Feedback = apps.get_model('core', 'Feedback')
+    counts = (
+        Feedback.likes.through.objects.filter(feedback_id=OuterRef('pk'))
+        .values('feedback_id')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    Feedback.objects.update(likes_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0023_auditlog_core_auditl_timesta_3238cd_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedback',
+            name='likes_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_likes_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.5 on 2026-10-18 08:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0024_feedback_likes_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='discussionreply',
+            index=models.Index(fields=['post', 'created_at', 'id'], name='core_discus_post_id_71bde5_idx'),
+        ),
+    ]
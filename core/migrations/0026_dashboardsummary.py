@@ -0,0 +1,28 @@
+# Generated by Django 5.1.5 on 2026-10-18 08:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0025_discussionreply_core_discus_post_id_71bde5_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('alumni_count', models.IntegerField(default=0)),
+                ('event_count', models.IntegerField(default=0)),
+                ('registration_count', models.IntegerField(default=0)),
+                ('feedback_count', models.IntegerField(default=0)),
+                ('strategic_decision_count', models.IntegerField(default=0)),
+                ('donation_count', models.IntegerField(default=0)),
+                ('donation_total', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('usage_count', models.IntegerField(default=0)),
+                ('usage_total', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+            ],
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.1.5 on 2026-10-18 08:51
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_ledger(apps, schema_editor):
+    Donation = apps.get_model('core', 'Donation')
+    Usage = apps.get_model('core', 'Usage')
+    LedgerDay = apps.get_model('core', 'LedgerDay')
+    days = defaultdict(lambda: {
+        'donation_total': Decimal('0'), 'donation_count': 0,
+        'usage_total': Decimal('0'), 'usage_count': 0,
+    })
+    donations = (
+        Donation.objects.annotate(day=TruncDate('created_at'))
+        .values('day').annotate(total=Sum('amount'), count=Count('id'))
+    )
+    for row in donations:
+        days[row['day']].update(donation_total=row['total'], donation_count=row['count'])
+    for row in Usage.objects.values('date').annotate(total=Sum('amount'), count=Count('id')):
+        days[row['date']].update(usage_total=row['total'], usage_count=row['count'])
+    balance = Decimal('0')
+    rows = []
+    for day in sorted(days):
+        values = days[day]
+        balance += values['donation_total'] - values['usage_total']
+        rows.append(LedgerDay(date=day, balance=balance, **values))
+    LedgerDay.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0026_dashboardsummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LedgerDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('donation_total', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('donation_count', models.IntegerField(default=0)),
+                ('usage_total', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('usage_count', models.IntegerField(default=0)),
+                ('balance', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+            ],
+        ),
+        migrations.RunPython(backfill_ledger, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.1.5 on 2026-10-18 09:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0032_image_renditions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('news', 'Berita'), ('event', 'Event'), ('discussion', 'Diskusi'), ('reply', 'Balasan Diskusi')], max_length=20)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('parent_id', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('title', models.CharField(max_length=255)),
+                ('snippet', models.TextField(blank=True)),
+                ('published_at', models.DateTimeField()),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='unique_search_document')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SearchPosting',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('weight', models.PositiveIntegerField()),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='postings', to='core.searchdocument')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('term', 'document'), name='unique_search_posting')],
+            },
+        ),
+    ]
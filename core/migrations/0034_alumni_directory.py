@@ -0,0 +1,52 @@
+# Generated by Django 5.1.5 on 2026-10-18 09:13
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0033_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DirectoryEntry',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='directory_entry', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('full_name', models.CharField(max_length=255)),
+                ('username', models.CharField(max_length=150)),
+                ('sort_name', models.CharField(max_length=255)),
+                ('job', models.CharField(blank=True, max_length=255)),
+                ('education', models.CharField(blank=True, max_length=255)),
+                ('graduation_year', models.IntegerField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['sort_name', 'user'], name='core_direct_sort_na_2d03c7_idx'), models.Index(fields=['graduation_year', 'education'], name='core_direct_graduat_c4ca63_idx'), models.Index(fields=['education'], name='core_direct_educati_52d483_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DirectoryToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=64)),
+                ('entry', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tokens', to='core.directoryentry')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('token', 'entry'), name='unique_directory_token')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DirectoryTrigram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trigram', models.CharField(max_length=3)),
+                ('entry', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trigrams', to='core.directoryentry')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('trigram', 'entry'), name='unique_directory_trigram')],
+            },
+        ),
+    ]
@@ -0,0 +1,354 @@
+# core/mixins.py
+import hashlib
+
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Count, Max, Prefetch
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.relations import ManyRelatedField, RelatedField
+from rest_framework.response import Response
+
+from .cache import get_model_versions, response_cache_key
+
+
+class EagerLoadPlan:
+    """
+    Kumpulan select_related (relasi tunggal) dan prefetch_related (relasi banyak)
+    untuk satu model. Relasi banyak punya plan sendiri untuk queryset prefetch-nya.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.select = set()
+        self.prefetch = {}
+        # Model yang ikut dimuat lewat select_related
+        self.related = set()
+        # Kolom model ini yang dibaca serializer; opaque jika ada atribut yang
+        # tidak bisa ditelusuri (property, method) sehingga semua kolom dimuat
+        self.columns = set()
+        self.opaque = False
+
+    def root(self):
+        # Posisi = (plan, prefix lookup, model, field relasi yang dilewati, posisi induk)
+        return (self, '', self.model, None, None)
+
+    def add(self, path, position=None):
+        """
+        Menambahkan lookup relasi (list nama atribut) mulai dari `position`. Mengembalikan
+        posisi di ujung path, atau None jika path tidak berakhir di relasi.
+        """
+        position = position or self.root()
+        for attr in path:
+            plan, prefix, model, via, parent = position
+            try:
+                field = model._meta.get_field(attr)
+            except FieldDoesNotExist:
+                # Nama anotasi tidak ada di kelas model; property/method bisa membaca kolom apa saja
+                if not prefix and hasattr(model, attr):
+                    plan.opaque = True
+                return None
+            if not prefix:
+                plan.columns.add(field.name)
+            if not field.is_relation or field.related_model is None:
+                return None
+            if via is not None and field.remote_field is via:
+                # Kembali ke objek asal (misal user -> profile -> user), Django sudah
+                # mengisi cache relasi baliknya sehingga tidak perlu join lagi.
+                position = parent
+                continue
+            lookup = prefix + attr
+            if field.many_to_many or field.one_to_many:
+                child = plan.prefetch.get(lookup)
+                if child is None:
+                    child = plan.prefetch[lookup] = EagerLoadPlan(field.related_model)
+                position = (child, '', field.related_model, field, position)
+            else:
+                plan.select.add(lookup)
+                plan.related.add(field.related_model)
+                position = (plan, lookup + '__', field.related_model, field, position)
+        return position
+
+    def models(self):
+        """Semua model yang datanya dibaca serializer (dipakai untuk versi cache)."""
+        models = {self.model} | self.related
+        for child in self.prefetch.values():
+            models |= child.models()
+        return models
+
+    def deferred(self, keep=()):
+        """
+        Kolom biasa yang tidak dibaca serializer. Kolom relasi (FK) dan primary
+        key selalu dimuat karena dipakai join, prefetch dan pengecekan izin.
+        """
+        if self.opaque:
+            return []
+        return [
+            field.name for field in self.model._meta.concrete_fields
+            if not field.is_relation and not field.primary_key
+            and field.name not in self.columns and field.name not in keep
+        ]
+
+    def apply(self, queryset, narrow=False, keep=()):
+        """
+        Menerapkan eager load ke queryset. Dengan narrow=True kolom yang tidak
+        dibaca ikut di-defer; hanya untuk baca, karena save() pada objek dengan
+        kolom yang di-defer hanya menyimpan kolom yang dimuat.
+        """
+        if self.select:
+            queryset = queryset.select_related(*sorted(self.select))
+        if self.prefetch:
+            queryset = queryset.prefetch_related(*[
+                Prefetch(lookup, queryset=child.apply(child.model._default_manager.all(), narrow=narrow))
+                for lookup, child in sorted(self.prefetch.items())
+            ])
+        if narrow:
+            deferred = self.deferred(keep)
+            if deferred:
+                queryset = queryset.defer(*deferred)
+        return queryset
+
+
+def collect_eager_loads(serializer, plan, position=None):
+    """
+    Menelusuri field serializer (termasuk serializer bersarang) dan mencatat relasi
+    yang dibaca. SerializerMethodField tidak bisa ditelusuri, sehingga relasi yang
+    dipakainya dideklarasikan di `Meta.method_field_sources`.
+    """
+    method_sources = getattr(getattr(serializer, 'Meta', None), 'method_field_sources', {})
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if isinstance(field, serializers.SerializerMethodField):
+            if name not in method_sources:
+                _mark_opaque(plan, position)
+            for lookup in method_sources.get(name, ()):
+                plan.add(lookup.split('__'), position)
+            continue
+
+        child = None
+        if isinstance(field, serializers.ListSerializer):
+            child = field.child
+        elif isinstance(field, serializers.BaseSerializer):
+            child = field
+
+        if field.source == '*':
+            if child is not None:
+                collect_eager_loads(child, plan, position)
+            else:
+                _mark_opaque(plan, position)
+            continue
+
+        path = field.source_attrs
+        if isinstance(field, RelatedField) and not isinstance(field, ManyRelatedField):
+            if field.use_pk_only_optimization():
+                # Cukup kolom FK di baris yang sama, objek relasinya tidak perlu dimuat
+                path = path[:-1]
+        end = plan.add(path, position)
+        if child is not None and end is not None:
+            collect_eager_loads(child, plan, end)
+
+
+def _mark_opaque(plan, position):
+    # Field yang bisa membaca atribut apa saja dari objek di posisi ini
+    owner, prefix = (position or plan.root())[:2]
+    if not prefix:
+        owner.opaque = True
+
+
+_plan_cache = {}
+# Kombinasi ?fields= dibatasi jumlah field, tetapi cache tetap diberi batas atas
+PLAN_CACHE_SIZE = 1024
+
+
+def get_eager_load_plan(serializer, model):
+    key = (type(serializer), model, tuple(serializer.fields))
+    plan = _plan_cache.get(key)
+    if plan is None:
+        plan = EagerLoadPlan(model)
+        collect_eager_loads(serializer, plan)
+        if len(_plan_cache) >= PLAN_CACHE_SIZE:
+            _plan_cache.clear()
+        _plan_cache[key] = plan
+    return plan
+
+
+def requested_fields(request, available):
+    """
+    Nama field dari ?fields=a,b (hanya field itu) dan ?omit=c,d (semua kecuali
+    field itu), dalam urutan `available`. Nama yang tidak dikenal diabaikan.
+    Mengembalikan None jika tidak ada parameter.
+    """
+    params = request.query_params if hasattr(request, 'query_params') else request.GET
+    only, omit = params.get('fields'), params.get('omit')
+    if not only and not omit:
+        return None
+    names = list(available)
+    if only:
+        wanted = set(filter(None, (name.strip() for name in only.split(','))))
+        names = [name for name in names if name in wanted]
+    if omit:
+        unwanted = set(name.strip() for name in omit.split(','))
+        names = [name for name in names if name not in unwanted]
+    return names
+
+
+class DynamicFieldsMixin:
+    """
+    Mixin serializer: ?fields= dan ?omit= (lihat requested_fields) memilih field
+    yang dikirim. Hanya berlaku pada request baca untuk serializer utama view,
+    bukan serializer bersarang. Karena eager load plan dihitung dari field yang
+    tersisa, relasi dan kolom yang tidak diminta ikut tidak dimuat.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        names = self.requested_field_names(fields)
+        if names is None:
+            return fields
+        return {name: fields[name] for name in names}
+
+    def requested_field_names(self, fields):
+        request = self.context.get('request')
+        view = self.context.get('view')
+        if request is None or view is None or request.method not in SAFE_METHODS:
+            return None
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        if parent is not None or not hasattr(view, 'get_serializer_class'):
+            return None
+        if type(self) is not view.get_serializer_class():
+            return None
+        return requested_fields(request, fields)
+
+
+def view_models(view):
+    """
+    Model yang datanya dibaca respons view: dari eager load plan serializer
+    ditambah `cache_dependencies` milik view.
+    """
+    serializer = view.get_serializer()
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+    plan = get_eager_load_plan(serializer, view.queryset.model)
+    return plan.models() | set(getattr(view, 'cache_dependencies', ()))
+
+
+class EagerLoadingMixin:
+    """
+    Mixin untuk GenericAPIView/ViewSet: menerapkan select_related/prefetch_related
+    berdasarkan field serializer yang dipakai view, sehingga list tidak lagi memicu
+    query N+1. Dipasang di filter_queryset() agar tetap berlaku untuk view yang
+    meng-override get_queryset().
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        serializer = self.get_serializer()
+        if isinstance(serializer, serializers.ListSerializer):
+            serializer = serializer.child
+        # Request baca: kolom yang tidak dibaca serializer di-defer, kecuali
+        # kolom urutan yang dibaca KeysetPagination untuk kursor
+        narrow = self.request.method in SAFE_METHODS
+        ordering = list(queryset.query.order_by) or list(queryset.model._meta.ordering)
+        keep = {field.lstrip('-').split('__')[0] for field in ordering if isinstance(field, str)}
+        return get_eager_load_plan(serializer, queryset.model).apply(queryset, narrow=narrow, keep=keep)
+
+
+class CachedReadMixin:
+    """
+    Mixin untuk ViewSet baca publik: hasil list/retrieve disimpan di cache dengan
+    kunci yang memuat versi setiap model yang dibaca serializer (dari eager load
+    plan ditambah `cache_dependencies`). Setiap save/delete model tersebut, baik
+    lewat API maupun admin, menaikkan versinya sehingga entri lama tidak pernah
+    terbaca lagi dan tidak perlu dihapus.
+    """
+    cache_timeout = 60 * 15
+    cache_dependencies = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def get_cache_models(self):
+        return view_models(self)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        key = response_cache_key(request, self.get_cache_models())
+        data = cache.get(key)
+        if data is not None:
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, self.cache_timeout)
+            response['X-Cache'] = 'MISS'
+        return response
+
+
+class ConditionalGetMixin:
+    """
+    ETag dan Last-Modified untuk list/retrieve. Sebelum serialisasi, satu query
+    MAX(updated_at)/COUNT pada queryset hasil filter menentukan validator;
+    jika cocok dengan If-None-Match/If-Modified-Since, langsung dibalas 304.
+    ETag juga memuat versi model terkait (lihat core.cache) dan user, sehingga
+    perubahan relasi atau field per-user ikut mengubahnya; Last-Modified
+    memakai yang terbaru dari MAX(updated_at) dan versi model tersebut.
+    """
+    last_modified_field = 'updated_at'
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.conditional_response(queryset, super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            queryset = self.filter_queryset(self.get_queryset()).filter(
+                **{self.lookup_field: kwargs[lookup_url_kwarg]}
+            )
+        except (TypeError, ValueError, ValidationError):
+            # Lookup tidak valid, biarkan get_object() yang membalas 404
+            return super().retrieve(request, *args, **kwargs)
+        return self.conditional_response(queryset, super().retrieve, request, *args, **kwargs)
+
+    def conditional_response(self, queryset, handler, request, *args, **kwargs):
+        stats = queryset.aggregate(last_modified=Max(self.last_modified_field), total=Count('pk'))
+        stats['versions'] = get_model_versions(view_models(self))
+        last_modified = stats['last_modified']
+        # MAX(updated_at) tidak berubah saat baris dihapus atau relasi berubah;
+        # versi model (cap waktu ns, dinaikkan pada setiap save/delete) menutupinya
+        timestamps = [version // 10 ** 9 for version in stats['versions'] if version]
+        if last_modified:
+            timestamps.append(int(last_modified.timestamp()))
+        timestamp = max(timestamps) if timestamps else None
+        etag = self.get_etag(request, stats)
+
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        response['ETag'] = etag
+        if timestamp is not None:
+            response['Last-Modified'] = http_date(timestamp)
+        return response
+
+    def get_etag(self, request, stats):
+        last_modified = stats['last_modified']
+        renderer = getattr(getattr(request, 'accepted_renderer', None), 'format', '')
+        raw = '|'.join([
+            request.get_full_path(),
+            renderer,
+            str(request.user.pk or ''),
+            last_modified.isoformat() if last_modified else '',
+            str(stats['total']),
+            ','.join(str(version) for version in stats['versions']),
+        ])
+        return '"%s"' % hashlib.md5(raw.encode('utf-8')).hexdigest()
@@ -1,9 +1,18 @@
+import datetime
 import os
 import random
+from collections import defaultdict
+from decimal import Decimal
+
 from django.conf import settings
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
 from django.contrib.auth.models import AbstractUser
 
+from .cache import bump_model_version
+
 class RandomFilename:
     """
     Callable class untuk menghasilkan nama file acak di folder yang ditentukan.
@@ -32,6 +41,19 @@ class RandomFilename:
             {}                             # Argumen keyword (kosong)
         )
 
+class AtomicSaveModel(models.Model):
+    """
+    Base model yang membungkus save() dalam transaksi, sehingga handler post_save
+    (misalnya counter dashboard) ikut commit/rollback bersama baris yang disimpan.
+    delete() lewat Collector sudah atomik.
+    """
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
 # Custom User dengan Role
 class User(AbstractUser):
     ROLE_CHOICES = (
@@ -48,7 +70,7 @@ class User(AbstractUser):
     # Field tambahan lainnya sesuai kebutuhan
 
 # Profil Alumni (jika ingin dipisah dari User)
-class AlumniProfile(models.Model):
+class AlumniProfile(AtomicSaveModel):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
     graduation_year = models.IntegerField()  # angkatan
     education = models.CharField(max_length=255)
@@ -60,6 +82,13 @@ class AlumniProfile(models.Model):
         null=True,
         default='profile_photos/profile.png'
     )
+    # Turunan foto (beberapa lebar + WebP) yang dibuat core.imaging setelah upload
+    profile_photo_renditions = models.JSONField(default=dict, blank=True, editable=False)
+    # Waktu perubahan terakhir, untuk ETag/Last-Modified (ConditionalGetMixin)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    # field gambar -> field JSON turunannya
+    RENDITION_FIELDS = {'profile_photo': 'profile_photo_renditions'}
 
     def __str__(self):
         return f"{self.user.username} - {self.graduation_year}"
@@ -88,6 +117,7 @@ class News(models.Model):
         blank=True,
         null=True
     )
+    image_renditions = models.JSONField(default=dict, blank=True, editable=False)
     category = models.CharField(max_length=100, choices=CATEGORY_CHOICES, blank=True, null=True)
     published_date = models.DateTimeField(auto_now_add=True)
     # Field author untuk menyimpan pembuat berita (boleh null jika tidak di-set)
@@ -98,12 +128,18 @@ class News(models.Model):
         blank=True,
         related_name='news_posts'
     )
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    RENDITION_FIELDS = {'image': 'image_renditions'}
+
+    class Meta:
+        indexes = [models.Index(fields=['published_date', 'id'])]
     
     def __str__(self):
         return self.title
 
 # Model Event
-class Event(models.Model):
+class Event(AtomicSaveModel):
     title = models.CharField(max_length=255)
     description = models.TextField()
     start_date = models.DateTimeField()
@@ -115,13 +151,64 @@ class Event(models.Model):
         blank=True,
         null=True
     )
-    # Field tambahan: misalnya kuota peserta, dll.
+    image_renditions = models.JSONField(default=dict, blank=True, editable=False)
+    # Kuota peserta; kosong berarti tanpa batas
+    capacity = models.PositiveIntegerField(null=True, blank=True)
+    # Jumlah kursi terisi, hanya diubah lewat UPDATE bersyarat (claim_seat/release_seat)
+    seats_taken = models.PositiveIntegerField(default=0, editable=False)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    RENDITION_FIELDS = {'image': 'image_renditions'}
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        # seats_taken di objek ini bisa sudah basi: save() biasa tidak boleh menimpanya
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'seats_taken'
+            ]
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def claim_seat(cls, event_id):
+        """
+        Mengambil satu kursi dengan satu UPDATE bersyarat. Baris event terkunci
+        sampai transaksi selesai, sehingga pendaftaran serentak tidak bisa
+        melewati kuota. Mengembalikan False jika penuh atau event tidak ada.
+        """
+        available = Q(capacity__isnull=True) | Q(seats_taken__lt=F('capacity'))
+        claimed = cls.objects.filter(available, pk=event_id).update(
+            seats_taken=F('seats_taken') + 1, updated_at=timezone.now()
+        )
+        if claimed:
+            # update() tidak memicu signal: versi cache respons dinaikkan manual
+            bump_model_version(cls)
+        return bool(claimed)
+
+    @classmethod
+    def release_seat(cls, event_id):
+        if cls.objects.filter(pk=event_id, seats_taken__gt=0).update(
+            seats_taken=F('seats_taken') - 1, updated_at=timezone.now()
+        ):
+            bump_model_version(cls)
+
+    @classmethod
+    def recount_seats(cls, event_ids=None):
+        """Menghitung ulang seats_taken dari tabel pendaftaran dalam satu UPDATE."""
+        counts = (
+            EventRegistration.objects.filter(event_id=OuterRef('pk'))
+            .values('event_id')
+            .annotate(total=Count('pk'))
+            .values('total')
+        )
+        events = cls.objects.all() if event_ids is None else cls.objects.filter(pk__in=event_ids)
+        events.update(seats_taken=Coalesce(Subquery(counts), 0))
+
 # Model Donasi
-class Donation(models.Model):
+class Donation(AtomicSaveModel):
     donor = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -141,22 +228,44 @@ class Donation(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [models.Index(fields=['created_at', 'id'])]
+
     def __str__(self):
         return f"Donasi oleh {self.name} - {self.amount}"
 
 # Model Kesan & Pesan / Feedback
-class Feedback(models.Model):
+class Feedback(AtomicSaveModel):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='feedbacks')
     message = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     # Field untuk menyimpan user yang memberi like
     likes = models.ManyToManyField(User, related_name='liked_feedbacks', blank=True)
+    # Jumlah like yang didenormalisasi agar list tidak perlu COUNT per baris
+    likes_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [models.Index(fields=['created_at', 'id'])]
 
     def __str__(self):
         return f"Feedback dari {self.user.username}"
 
+    @classmethod
+    def recount_likes(cls, feedback_ids):
+        """
+        Menghitung ulang likes_count dari tabel relasi untuk feedback tertentu
+        dalam satu UPDATE.
+        """
+        counts = (
+            cls.likes.through.objects.filter(feedback_id=OuterRef('pk'))
+            .values('feedback_id')
+            .annotate(total=Count('pk'))
+            .values('total')
+        )
+        cls.objects.filter(pk__in=feedback_ids).update(likes_count=Coalesce(Subquery(counts), 0))
+
 # Model Pendaftaran Event
-class EventRegistration(models.Model):
+class EventRegistration(AtomicSaveModel):
     event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='registrations')
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='event_registrations')
     registration_date = models.DateTimeField(auto_now_add=True)
@@ -167,6 +276,62 @@ class EventRegistration(models.Model):
     def __str__(self):
         return f"{self.user.username} registered for {self.event.title}"
 
+    @classmethod
+    def register(cls, event_id, user):
+        """
+        Mendaftarkan user jika masih ada kursi. Mengembalikan pendaftaran baru,
+        atau None jika kuota penuh. Pendaftaran ganda menaikkan IntegrityError
+        (dan kursinya ikut dibatalkan bersama transaksi).
+        """
+        with transaction.atomic():
+            if not Event.claim_seat(event_id):
+                return None
+            return cls.objects.create(event_id=event_id, user=user)
+
+
+# Antrean tunggu event yang penuh; urutan mengikuti id (siapa cepat dia dapat)
+class EventWaitlist(models.Model):
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='waitlist')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='event_waitlist')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('event', 'user')
+
+    def __str__(self):
+        return f"{self.user.username} waiting for {self.event.title}"
+
+    @property
+    def position(self):
+        return EventWaitlist.objects.filter(event_id=self.event_id, pk__lte=self.pk).count()
+
+    @classmethod
+    def promote(cls, event_id):
+        """
+        Memindahkan antrean terdepan menjadi peserta selama masih ada kursi.
+        Kursi diklaim lebih dulu sehingga promosi serentak untuk event yang sama
+        berjalan berurutan di bawah kunci baris event. Mengembalikan pendaftaran baru.
+        """
+        promoted = []
+        with transaction.atomic():
+            while Event.claim_seat(event_id):
+                entry = cls.objects.filter(event_id=event_id).select_related('event').order_by('pk').first()
+                if entry is None:
+                    Event.release_seat(event_id)
+                    break
+                entry.delete()
+                if EventRegistration.objects.filter(event_id=event_id, user_id=entry.user_id).exists():
+                    # Sudah terdaftar lewat jalur lain: kursinya dikembalikan
+                    Event.release_seat(event_id)
+                    continue
+                promoted.append(EventRegistration.objects.create(event_id=event_id, user_id=entry.user_id))
+                Notification.objects.create(
+                    user_id=entry.user_id,
+                    title='Pendaftaran event dikonfirmasi',
+                    message=f'Kursi tersedia: Anda kini terdaftar di event "{entry.event.title}".',
+                )
+        return promoted
+
 # Model Gallery
 class Gallery(models.Model):
     title = models.CharField(max_length=255)
@@ -174,8 +339,12 @@ class Gallery(models.Model):
     image = models.ImageField(
         upload_to=RandomFilename('gallery_images')
     )
+    image_renditions = models.JSONField(default=dict, blank=True, editable=False)
     description = models.TextField(blank=True, null=True)
     uploaded_date = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    RENDITION_FIELDS = {'image': 'image_renditions'}
 
     def __str__(self):
         return self.title
@@ -190,7 +359,11 @@ class GalleryAlbum(models.Model):
         blank=True,
         null=True
     )
+    cover_image_renditions = models.JSONField(default=dict, blank=True, editable=False)
     uploaded_date = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    RENDITION_FIELDS = {'cover_image': 'cover_image_renditions'}
 
     def __str__(self):
         return self.title
@@ -202,8 +375,12 @@ class GalleryImage(models.Model):
     image = models.ImageField(
         upload_to=RandomFilename('gallery_images')
     )
+    image_renditions = models.JSONField(default=dict, blank=True, editable=False)
     caption = models.CharField(max_length=255, blank=True, null=True)
     uploaded_date = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    RENDITION_FIELDS = {'image': 'image_renditions'}
 
     def __str__(self):
         return f"Image in {self.album.title}"
@@ -214,6 +391,10 @@ class DiscussionPost(models.Model):
     title = models.CharField(max_length=255)
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['created_at', 'id'])]
 
     def __str__(self):
         return self.title
@@ -224,22 +405,29 @@ class DiscussionReply(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="discussion_replies")
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['post', 'created_at', 'id'])]
 
     def __str__(self):
         return f"Reply by {self.user.username} on {self.post.title}"
 
 # Model Penggunaan (Usage)
-class Usage(models.Model):
+class Usage(AtomicSaveModel):
     description = models.CharField(max_length=255)
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     # Menggunakan auto_now_add agar tanggal di-set saat pembuatan record
     date = models.DateField(auto_now_add=True)
 
+    class Meta:
+        indexes = [models.Index(fields=['date', 'id'])]
+
     def __str__(self):
         return f"{self.description} - {self.amount}"
 
 # Model Keputusan Strategis
-class StrategicDecision(models.Model):
+class StrategicDecision(AtomicSaveModel):
     DECISION_TYPE_CHOICES = (
         ('event', 'Event Besar'),
         ('policy', 'Kebijakan'),
@@ -273,27 +461,134 @@ class AuditLog(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
     action = models.CharField(max_length=255)
     details = models.TextField(blank=True, null=True)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # default (bukan auto_now_add) agar waktu kejadian tetap dipakai saat log ditulis belakangan
+    timestamp = models.DateTimeField(default=timezone.now)
     
+    class Meta:
+        indexes = [models.Index(fields=['timestamp', 'id'])]
+
     def __str__(self):
         return f"{self.timestamp} - {self.user}: {self.action}"
 
 # Model Notifikasi
-class Notification(models.Model):
+class Notification(AtomicSaveModel):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='notifications')
     title = models.CharField(max_length=255)
     message = models.TextField()
     link = models.URLField(blank=True, null=True)  # Opsional, jika ingin memberikan tautan ke detail
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
-    
+
+    class Meta:
+        # Kotak masuk: filter per user lalu urut terbaru (keyset pagination)
+        indexes = [models.Index(fields=['user', 'created_at', 'id'])]
+
     def __str__(self):
         return f"{self.title} - {self.user.username if self.user else 'No User'}"
 
+# Jumlah notifikasi belum dibaca per user
+class NotificationCounter(models.Model):
+    """
+    Counter notifikasi belum dibaca, dijaga oleh signal Notification dan oleh
+    operasi massal (mark-read, fan-out) yang memanggil bump() secara eksplisit.
+    """
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True,
+                                related_name='notification_counter')
+    unread = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.unread}"
+
+    @classmethod
+    def unread_for(cls, user_id):
+        unread = cls.objects.filter(pk=user_id).values_list('unread', flat=True).first()
+        if unread is None:
+            unread = cls.recount([user_id])[user_id]
+        return unread
+
+    @classmethod
+    def recount(cls, user_ids):
+        """Menghitung ulang counter dari tabel Notification dan menyimpannya."""
+        counts = dict.fromkeys(user_ids, 0)
+        counts.update(
+            Notification.objects.filter(user_id__in=user_ids, is_read=False)
+            .values('user_id').annotate(total=Count('id')).values_list('user_id', 'total')
+        )
+        existing = set(cls.objects.filter(pk__in=user_ids).values_list('pk', flat=True))
+        for user_id, unread in counts.items():
+            if user_id in existing:
+                cls.objects.filter(pk=user_id).update(unread=unread)
+                continue
+            try:
+                with transaction.atomic():
+                    cls.objects.create(pk=user_id, unread=unread)
+            except IntegrityError:
+                cls.objects.filter(pk=user_id).update(unread=unread)
+        return counts
+
+    @classmethod
+    def bump(cls, deltas):
+        """
+        Menambah/mengurangi counter, `deltas` berupa {user_id: selisih}. User dengan
+        selisih yang sama diperbarui dalam satu UPDATE. User yang belum punya baris
+        dilewati; counternya dihitung dari sumber saat pertama kali dibaca.
+        """
+        by_delta = defaultdict(list)
+        for user_id, delta in deltas.items():
+            if delta:
+                by_delta[delta].append(user_id)
+        for delta, user_ids in by_delta.items():
+            cls.objects.filter(pk__in=user_ids).update(unread=F('unread') + delta)
+
+# Pengiriman notifikasi massal (fan-out)
+class NotificationBroadcast(models.Model):
+    """
+    Satu pengiriman notifikasi ke sekelompok user. Baris Notification dibuat di
+    luar request oleh core.notifications, progresnya dicatat di sini.
+    `audience` berisi filter: roles, verified dan graduation_years.
+    """
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    )
+    title = models.CharField(max_length=255)
+    message = models.TextField()
+    link = models.URLField(blank=True, null=True)
+    audience = models.JSONField(default=dict, blank=True)
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True,
+                                   related_name='notification_broadcasts')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    total = models.PositiveIntegerField(default=0)
+    sent = models.PositiveIntegerField(default=0)
+    # Posisi terakhir (id user) agar pengiriman yang terputus bisa dilanjutkan
+    last_user_id = models.PositiveBigIntegerField(default=0)
+    error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.title} ({self.sent}/{self.total})"
+
+    @property
+    def progress(self):
+        return round(100.0 * self.sent / self.total, 1) if self.total else (100.0 if self.status == 'done' else 0.0)
+
+    @property
+    def throughput(self):
+        """Jumlah notifikasi per detik sejak pengiriman dimulai."""
+        if not self.started_at:
+            return 0.0
+        elapsed = ((self.finished_at or timezone.now()) - self.started_at).total_seconds()
+        return round(self.sent / elapsed, 1) if elapsed > 0 else float(self.sent)
+
 class Direksi(models.Model):
     jabatan = models.CharField(max_length=255)
     nama = models.CharField(max_length=255)
     # Field tambahan (misalnya, foto, deskripsi, dll) bisa ditambahkan jika diperlukan.
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return f"{self.jabatan} - {self.nama}"
@@ -301,6 +596,312 @@ class Direksi(models.Model):
 class BPA(models.Model):
     jabatan = models.CharField(max_length=255)
     nama = models.CharField(max_length=255)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
-        return f"{self.jabatan} - {self.nama}"
\ No newline at end of file
+        return f"{self.jabatan} - {self.nama}"
+
+# Ringkasan angka dashboard
+class DashboardSummary(models.Model):
+    """
+    Counter untuk dashboard Direksi/BPA dan statistik, dipecah ke SHARD_COUNT
+    baris (pk 1..SHARD_COUNT) yang dijumlahkan saat dibaca. Signal save/delete
+    model yang dilacak menambah counter pada satu shard acak dalam transaksi
+    yang sama, sehingga penulisan paralel tidak antre pada satu row lock.
+    Bisa dibangun ulang dengan `manage.py rebuild_dashboard_summary`.
+    """
+    SHARD_COUNT = 16
+
+    alumni_count = models.IntegerField(default=0)
+    event_count = models.IntegerField(default=0)
+    registration_count = models.IntegerField(default=0)
+    feedback_count = models.IntegerField(default=0)
+    strategic_decision_count = models.IntegerField(default=0)
+    donation_count = models.IntegerField(default=0)
+    donation_total = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    usage_count = models.IntegerField(default=0)
+    usage_total = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+
+    # Model yang dilacak -> (kolom jumlah baris, kolom total `amount` atau None)
+    TRACKED_MODELS = {
+        AlumniProfile: ('alumni_count', None),
+        Event: ('event_count', None),
+        EventRegistration: ('registration_count', None),
+        Feedback: ('feedback_count', None),
+        StrategicDecision: ('strategic_decision_count', None),
+        Donation: ('donation_count', 'donation_total'),
+        Usage: ('usage_count', 'usage_total'),
+    }
+
+    def __str__(self):
+        return "Ringkasan dashboard"
+
+    @property
+    def balance(self):
+        return self.donation_total - self.usage_total
+
+    @classmethod
+    def compute(cls):
+        """Menghitung semua counter langsung dari tabel sumber."""
+        values = {}
+        for model, (count_field, total_field) in cls.TRACKED_MODELS.items():
+            if total_field:
+                result = model.objects.aggregate(count=Count('id'), total=Sum('amount'))
+                values[count_field] = result['count']
+                values[total_field] = result['total'] or 0
+            else:
+                values[count_field] = model.objects.count()
+        return values
+
+    @classmethod
+    def counter_fields(cls):
+        return [field.attname for field in cls._meta.concrete_fields if not field.primary_key]
+
+    @classmethod
+    def totals(cls, lock=False):
+        """
+        Jumlah semua shard sebagai instance yang tidak disimpan, atau None jika
+        belum ada baris. Dengan lock=True semua shard dikunci (select_for_update).
+        """
+        queryset = cls.objects.all()
+        if lock:
+            queryset = queryset.select_for_update()
+        shards = list(queryset)
+        if not shards:
+            return None
+        return cls(**{name: sum(getattr(shard, name) for shard in shards) for name in cls.counter_fields()})
+
+    @classmethod
+    def rebuild(cls):
+        """Menulis hasil compute() ke shard pertama dan mengosongkan shard lain."""
+        with transaction.atomic():
+            # Tunggu transaksi yang sedang menambah counter agar tidak terhitung dua kali
+            cls.totals(lock=True)
+            values = cls.compute()
+            cls.objects.update_or_create(pk=1, defaults=values)
+            cls.objects.exclude(pk=1).update(**{name: 0 for name in values})
+        return cls(**values)
+
+    @classmethod
+    def current(cls):
+        return cls.totals() or cls.rebuild()
+
+    @classmethod
+    def bump(cls, **deltas):
+        """Menambah/mengurangi counter dengan satu UPDATE atomik pada shard acak."""
+        deltas = {field: delta for field, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        shard = random.randint(1, cls.SHARD_COUNT)
+        changes = {field: F(field) + delta for field, delta in deltas.items()}
+        if cls.objects.filter(pk=shard).update(**changes):
+            return
+        if not cls.objects.exists():
+            # Ringkasan belum ada: bangun dari tabel sumber (sudah termasuk perubahan ini)
+            cls.rebuild()
+            return
+        # Shard ini belum pernah dipakai: buat baris kosong lalu tambahkan
+        cls.objects.get_or_create(pk=shard)
+        cls.objects.filter(pk=shard).update(**changes)
+
+# Buku kas harian (rollup Donation dan Usage)
+class LedgerDay(models.Model):
+    """
+    Rollup harian donasi dan penggunaan dana beserta saldo berjalan (saldo akhir
+    hari). Diperbarui oleh signal save/delete Donation dan Usage, sehingga grafik
+    keuangan cukup membaca beberapa ratus baris rollup.
+    """
+    GRANULARITIES = ('day', 'week', 'month')
+
+    date = models.DateField(unique=True)
+    donation_total = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    donation_count = models.IntegerField(default=0)
+    usage_total = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    usage_count = models.IntegerField(default=0)
+    balance = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+
+    def __str__(self):
+        return f"{self.date} - saldo {self.balance}"
+
+    @staticmethod
+    def entry_date(instance):
+        """Tanggal pembukuan untuk sebuah Donation atau Usage."""
+        if isinstance(instance, Donation):
+            return timezone.localdate(instance.created_at)
+        return instance.date
+
+    @classmethod
+    def opening_balance(cls, day, lock=False):
+        rows = cls.objects.filter(date__lt=day).order_by('-date')
+        if lock:
+            rows = rows.select_for_update()
+        return rows.values_list('balance', flat=True).first() or 0
+
+    @classmethod
+    def record(cls, day, donation_amount=0, donation_count=0, usage_amount=0, usage_count=0):
+        """
+        Menambahkan transaksi ke rollup hari `day` dan menggeser saldo berjalan
+        hari itu dan seterusnya.
+
+        Saldo pembuka hari baru dibaca dengan mengunci baris hari sebelumnya.
+        Transaksi lain yang menggeser saldo hari yang lebih awal juga mengunci
+        baris itu, sehingga keduanya berurutan: saldo pembuka sudah memuat
+        pergeserannya, atau pergeserannya menunggu dan ikut mengenai baris baru.
+        Sisa kasus (mis. hari pertama tanpa baris sebelumnya) diperiksa dengan
+        `rebuild_ledger --check`.
+        """
+        with transaction.atomic():
+            if not cls.objects.filter(date=day).exists():
+                try:
+                    with transaction.atomic():
+                        cls.objects.create(date=day, balance=cls.opening_balance(day, lock=True))
+                except IntegrityError:
+                    # Baris hari ini baru saja dibuat oleh transaksi lain
+                    pass
+            cls.objects.filter(date=day).update(
+                donation_total=F('donation_total') + donation_amount,
+                donation_count=F('donation_count') + donation_count,
+                usage_total=F('usage_total') + usage_amount,
+                usage_count=F('usage_count') + usage_count,
+            )
+            net = donation_amount - usage_amount
+            if net:
+                cls.objects.filter(date__gte=day).update(balance=F('balance') + net)
+
+    @classmethod
+    def compute(cls):
+        """Menghitung ulang semua rollup harian langsung dari Donation dan Usage."""
+        days = defaultdict(lambda: {
+            'donation_total': Decimal('0'), 'donation_count': 0,
+            'usage_total': Decimal('0'), 'usage_count': 0,
+        })
+        donations = (
+            Donation.objects.annotate(day=TruncDate('created_at'))
+            .values('day').annotate(total=Sum('amount'), count=Count('id'))
+        )
+        for row in donations:
+            days[row['day']].update(donation_total=row['total'], donation_count=row['count'])
+        usages = Usage.objects.values('date').annotate(total=Sum('amount'), count=Count('id'))
+        for row in usages:
+            days[row['date']].update(usage_total=row['total'], usage_count=row['count'])
+
+        balance = Decimal('0')
+        rows = []
+        for day in sorted(days):
+            values = days[day]
+            balance += values['donation_total'] - values['usage_total']
+            rows.append(dict(values, date=day, balance=balance))
+        return rows
+
+    @classmethod
+    def rebuild(cls):
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create([cls(**row) for row in cls.compute()], batch_size=1000)
+
+    @classmethod
+    def series(cls, start, end, granularity='day'):
+        """
+        Rollup dalam rentang [start, end] yang dikelompokkan per hari/minggu/bulan.
+        Hari tanpa transaksi tidak muncul; saldo akhir periode tetap terbawa.
+        """
+        if granularity == 'week':
+            bucket = lambda day: day - datetime.timedelta(days=day.weekday())
+        elif granularity == 'month':
+            bucket = lambda day: day.replace(day=1)
+        else:
+            bucket = lambda day: day
+
+        opening = cls.opening_balance(start)
+        periods = {}
+        for row in cls.objects.filter(date__range=(start, end)).order_by('date'):
+            key = bucket(row.date)
+            period = periods.get(key)
+            if period is None:
+                period = periods[key] = {
+                    'period': key, 'donation_total': Decimal('0'), 'donation_count': 0,
+                    'usage_total': Decimal('0'), 'usage_count': 0,
+                }
+            period['donation_total'] += row.donation_total
+            period['donation_count'] += row.donation_count
+            period['usage_total'] += row.usage_total
+            period['usage_count'] += row.usage_count
+            period['net'] = period['donation_total'] - period['usage_total']
+            period['closing_balance'] = row.balance
+        return {'opening_balance': opening, 'results': list(periods.values())}
+
+
+# Indeks pencarian (core.search): satu dokumen per berita/event/diskusi/balasan
+class SearchDocument(models.Model):
+    KIND_CHOICES = (
+        ('news', 'Berita'),
+        ('event', 'Event'),
+        ('discussion', 'Diskusi'),
+        ('reply', 'Balasan Diskusi'),
+    )
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    # Untuk balasan: id diskusi induknya
+    parent_id = models.PositiveBigIntegerField(null=True, blank=True)
+    title = models.CharField(max_length=255)
+    snippet = models.TextField(blank=True)
+    published_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['kind', 'object_id'], name='unique_search_document')]
+
+    def __str__(self):
+        return f"{self.kind}:{self.object_id}"
+
+
+class SearchPosting(models.Model):
+    """
+    Entri inverted index: term hasil stemming dan bobotnya (BM25, dalam bilangan
+    bulat) pada satu dokumen.
+    """
+    term = models.CharField(max_length=64)
+    document = models.ForeignKey(SearchDocument, on_delete=models.CASCADE, related_name='postings')
+    weight = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['term', 'document'], name='unique_search_posting')]
+
+
+# Direktori alumni (core.directory): salinan data user + profil yang siap dicari
+class DirectoryEntry(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='directory_entry')
+    full_name = models.CharField(max_length=255)
+    username = models.CharField(max_length=150)
+    # Nama dalam huruf kecil tanpa diakritik, untuk urutan direktori
+    sort_name = models.CharField(max_length=255)
+    job = models.CharField(max_length=255, blank=True)
+    education = models.CharField(max_length=255, blank=True)
+    graduation_year = models.IntegerField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['sort_name', 'user']),
+            models.Index(fields=['graduation_year', 'education']),
+            models.Index(fields=['education']),
+        ]
+
+    def __str__(self):
+        return self.full_name
+
+
+class DirectoryToken(models.Model):
+    # Kata utuh, untuk autocomplete dengan pencocokan awalan (LIKE 'abc%' memakai index)
+    token = models.CharField(max_length=64)
+    entry = models.ForeignKey(DirectoryEntry, on_delete=models.CASCADE, related_name='tokens')
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['token', 'entry'], name='unique_directory_token')]
+
+
+class DirectoryTrigram(models.Model):
+    # Potongan 3 huruf, untuk pencarian yang toleran salah ketik dan potongan kata
+    trigram = models.CharField(max_length=3)
+    entry = models.ForeignKey(DirectoryEntry, on_delete=models.CASCADE, related_name='trigrams')
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['trigram', 'entry'], name='unique_directory_trigram')]
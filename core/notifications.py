@@ -0,0 +1,189 @@
+# core/notifications.py
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from rest_framework import serializers
+
+from .models import Notification, NotificationBroadcast, NotificationCounter, User
+from .pubsub import broker, publish, user_channel
+
+logger = logging.getLogger(__name__)
+
+# Audiens bawaan untuk berita/event baru: semua anggota yang aktif
+DEFAULT_AUDIENCE = {'roles': ['alumni', 'direksi', 'bpa']}
+
+
+def validate_audience(audience):
+    """
+    Memeriksa dan menormalkan filter audiens:
+    {"roles": [...], "verified": true/false, "graduation_years": [...]}.
+    """
+    if audience in (None, ''):
+        return dict(DEFAULT_AUDIENCE)
+    if not isinstance(audience, dict):
+        raise serializers.ValidationError('Audience harus berupa objek.')
+    unknown = set(audience) - {'roles', 'verified', 'graduation_years'}
+    if unknown:
+        raise serializers.ValidationError('Filter audience tidak dikenal: %s.' % ', '.join(sorted(unknown)))
+    cleaned = {}
+    if audience.get('roles'):
+        valid_roles = {role for role, _ in User.ROLE_CHOICES}
+        roles = audience['roles']
+        if not isinstance(roles, list) or not set(roles) <= valid_roles:
+            raise serializers.ValidationError('Role harus salah satu dari: %s.' % ', '.join(sorted(valid_roles)))
+        cleaned['roles'] = sorted(set(roles))
+    if audience.get('verified') is not None:
+        if not isinstance(audience['verified'], bool):
+            raise serializers.ValidationError('Verified harus bernilai true atau false.')
+        cleaned['verified'] = audience['verified']
+    if audience.get('graduation_years'):
+        years = audience['graduation_years']
+        if not isinstance(years, list) or not all(isinstance(year, int) for year in years):
+            raise serializers.ValidationError('Graduation_years harus berupa daftar tahun.')
+        cleaned['graduation_years'] = sorted(set(years))
+    return cleaned
+
+
+def audience_queryset(broadcast):
+    users = User.objects.filter(is_active=True)
+    audience = broadcast.audience or {}
+    if audience.get('roles'):
+        users = users.filter(role__in=audience['roles'])
+    if audience.get('verified') is not None:
+        users = users.filter(verified=audience['verified'])
+    if audience.get('graduation_years'):
+        users = users.filter(profile__graduation_year__in=audience['graduation_years'])
+    if broadcast.created_by_id:
+        users = users.exclude(pk=broadcast.created_by_id)
+    return users
+
+
+def fan_out(broadcast_id, chunk_size=None):
+    """
+    Membuat Notification untuk seluruh audiens broadcast. User dibaca per potong
+    berdasarkan id (keyset, tanpa OFFSET); setiap potong ditulis dengan satu
+    bulk_create dan satu UPDATE counter dalam transaksi yang sama dengan posisi
+    terakhirnya, sehingga pengiriman yang terputus bisa dilanjutkan tanpa duplikat.
+    """
+    chunk_size = chunk_size or getattr(settings, 'NOTIFICATION_FANOUT_CHUNK_SIZE', 1000)
+    broadcast = NotificationBroadcast.objects.get(pk=broadcast_id)
+    if broadcast.status == 'done':
+        return broadcast
+    users = audience_queryset(broadcast).order_by('pk').values_list('pk', flat=True)
+    if broadcast.status == 'pending':
+        broadcast.started_at = timezone.now()
+        broadcast.total = users.count()
+    if broadcast.status != 'running':
+        # Broadcast baru atau yang gagal sebelumnya dilanjutkan dari last_user_id
+        broadcast.status = 'running'
+        broadcast.error = ''
+        broadcast.save(update_fields=['status', 'error', 'started_at', 'total'])
+
+    try:
+        while True:
+            user_ids = list(users.filter(pk__gt=broadcast.last_user_id)[:chunk_size])
+            if not user_ids:
+                break
+            with transaction.atomic():
+                # Klaim potongan lebih dulu: runner lain yang memproses broadcast yang
+                # sama akan menunggu kunci baris ini lalu mendapati posisinya sudah bergeser
+                claimed = NotificationBroadcast.objects.filter(
+                    pk=broadcast.pk, last_user_id=broadcast.last_user_id
+                ).update(sent=F('sent') + len(user_ids), last_user_id=user_ids[-1])
+                if not claimed:
+                    return broadcast
+                Notification.objects.bulk_create([
+                    Notification(user_id=user_id, title=broadcast.title, message=broadcast.message, link=broadcast.link)
+                    for user_id in user_ids
+                ], batch_size=chunk_size)
+                NotificationCounter.bump(dict.fromkeys(user_ids, 1))
+            broadcast.sent += len(user_ids)
+            broadcast.last_user_id = user_ids[-1]
+            # bulk_create tidak memicu signal, jadi client stream yang sedang terhubung diberi tahu di sini
+            payload = {'title': broadcast.title, 'message': broadcast.message, 'link': broadcast.link}
+            for user_id in user_ids:
+                channel = user_channel(user_id)
+                if broker.has_subscribers(channel):
+                    publish(channel, 'notification', payload)
+    except Exception as exc:
+        NotificationBroadcast.objects.filter(pk=broadcast.pk).update(status='failed', error=repr(exc)[:2000])
+        raise
+
+    broadcast.status = 'done'
+    broadcast.finished_at = timezone.now()
+    broadcast.save(update_fields=['status', 'finished_at'])
+    return broadcast
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'NOTIFICATION_FANOUT_WORKERS', 2),
+                    thread_name_prefix='notification-fanout',
+                )
+    return _executor
+
+
+def _run_in_background(broadcast_id):
+    try:
+        fan_out(broadcast_id)
+    except Exception:
+        logger.exception('Fan-out notifikasi %s gagal.', broadcast_id)
+    finally:
+        close_old_connections()
+
+
+def audience_from_request(request):
+    """
+    Membaca parameter opsional `notify` dan `audience` dari request pembuatan
+    berita/event. Mengembalikan None jika notifikasi tidak perlu dikirim.
+    """
+    if str(request.data.get('notify', 'true')).lower() in ('0', 'false'):
+        return None
+    audience = request.data.get('audience')
+    if isinstance(audience, str) and audience:
+        # Request multipart (ada upload gambar) mengirim audience sebagai string JSON
+        try:
+            audience = json.loads(audience)
+        except ValueError:
+            raise serializers.ValidationError({'audience': ['Audience harus berupa JSON yang valid.']})
+    try:
+        return validate_audience(audience)
+    except serializers.ValidationError as exc:
+        raise serializers.ValidationError({'audience': exc.detail})
+
+
+def schedule_fan_out(broadcast_id):
+    """
+    Menjalankan fan-out setelah transaksi saat ini commit, di thread pool latar
+    belakang sehingga request tidak menunggu pembuatan notifikasi.
+    """
+    if getattr(settings, 'NOTIFICATION_FANOUT_ASYNC', False):
+        transaction.on_commit(lambda: get_executor().submit(_run_in_background, broadcast_id))
+    else:
+        transaction.on_commit(lambda: fan_out(broadcast_id))
+
+
+def send_broadcast(title, message, link=None, audience=None, created_by=None):
+    record = NotificationBroadcast.objects.create(
+        title=title[:255],
+        message=message,
+        link=link,
+        audience=audience if audience is not None else dict(DEFAULT_AUDIENCE),
+        created_by=created_by if created_by is not None and created_by.is_authenticated else None,
+    )
+    schedule_fan_out(record.pk)
+    return record
@@ -0,0 +1,238 @@
+# core/pagination.py
+import datetime
+import decimal
+import json
+import uuid
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+def _cursor_value(value):
+    # Simpan nilai dalam bentuk yang bisa dikembalikan apa adanya ke filter ORM.
+    # isoformat() dipakai penuh (termasuk mikrodetik) agar posisi kursor presisi.
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    return value
+
+
+def _lookup_value(instance, field_name):
+    # Mendukung field relasi seperti 'user__username'
+    value = instance
+    for attr in field_name.split('__'):
+        if value is None:
+            return None
+        value = value[attr] if isinstance(value, dict) else getattr(value, attr)
+    return value
+
+
+def ordering_field(queryset, name):
+    """
+    Field model (atau output_field anotasi) untuk satu nama ordering seperti
+    'published_date' atau 'user__username'. None jika tidak bisa ditentukan.
+    """
+    annotation = queryset.query.annotations.get(name)
+    if annotation is not None:
+        return annotation.output_field
+    model, field = queryset.model, None
+    for attr in name.split('__'):
+        if model is None:
+            return None
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            return None
+        model = field.related_model if field.is_relation else None
+    return field
+
+
+def resolve_ordering(queryset):
+    """
+    Mengambil urutan dari queryset (atau Meta.ordering model) lalu menambahkan
+    primary key sebagai pemutus seri agar setiap posisi kursor unik.
+    """
+    ordering = list(queryset.query.order_by) or list(queryset.model._meta.ordering)
+    if not ordering:
+        ordering = ['-pk']
+    # attname: untuk primary key berupa relasi (OneToOne) nilai kursornya id, bukan objek
+    pk_name = queryset.model._meta.pk.attname
+    resolved = []
+    for field in ordering:
+        if not isinstance(field, str) or field == '?':
+            raise ImproperlyConfigured(
+                'KeysetPagination hanya mendukung ordering berupa nama field, bukan %r.' % (field,)
+            )
+        name = field.lstrip('-')
+        if name == 'pk':
+            name = pk_name
+        resolved.append(('-' if field.startswith('-') else '') + name)
+    if not any(field.lstrip('-') == pk_name for field in resolved):
+        descending = resolved[0].startswith('-')
+        resolved.append(('-' if descending else '') + pk_name)
+    return resolved
+
+
+def keyset_filter(ordering, values, reverse=False):
+    """
+    Membangun kondisi WHERE "baris setelah posisi ini" untuk ordering multi-kolom:
+    (a < x) OR (a = x AND b < y) OR ...  tanpa OFFSET.
+    """
+    condition = Q()
+    equal = Q()
+    for field, value in zip(ordering, values):
+        name = field.lstrip('-')
+        descending = field.startswith('-')
+        if reverse:
+            descending = not descending
+        condition |= equal & Q(**{'%s__%s' % (name, 'lt' if descending else 'gt'): value})
+        equal &= Q(**{name: value})
+    # Kondisi pada kolom pertama ditambahkan eksplisit supaya database bisa range scan di index
+    first = ordering[0]
+    descending = first.startswith('-') != reverse
+    leading = Q(**{'%s__%s' % (first.lstrip('-'), 'lte' if descending else 'gte'): values[0]})
+    return leading & condition
+
+
+class KeysetPagination(BasePagination):
+    """
+    Pagination berbasis kursor (keyset) yang mengikuti ordering queryset view.
+    Biaya halaman ke-N sama dengan halaman pertama karena tidak memakai OFFSET.
+    Untuk tabel kecil, set `pagination_class = None` pada viewset.
+    """
+    cursor_query_param = 'cursor'
+    page_size = api_settings.PAGE_SIZE or 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    invalid_cursor_message = 'Cursor tidak valid.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = resolve_ordering(queryset)
+
+        cursor = self.decode_cursor(request, queryset)
+        reverse, position = cursor if cursor else (False, None)
+
+        if reverse:
+            queryset = queryset.order_by(*[self._invert(field) for field in self.ordering])
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if position is not None:
+            queryset = queryset.filter(keyset_filter(self.ordering, position, reverse))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if reverse:
+            self.page.reverse()
+
+        first = self._position(self.page[0]) if self.page else position
+        last = self._position(self.page[-1]) if self.page else position
+        if reverse:
+            self.has_previous, self.has_next = has_more, position is not None
+        else:
+            self.has_previous, self.has_next = position is not None, has_more
+        self.previous_position = first
+        self.next_position = last
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                size = int(request.query_params[self.page_size_query_param])
+                if size > 0:
+                    return min(size, self.max_page_size)
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def get_next_link(self):
+        if not self.has_next or self.next_position is None:
+            return None
+        return self.encode_cursor(False, self.next_position)
+
+    def get_previous_link(self):
+        if not self.has_previous or self.previous_position is None:
+            return None
+        return self.encode_cursor(True, self.previous_position)
+
+    def encode_cursor(self, reverse, position):
+        payload = json.dumps({'r': int(reverse), 'p': position}, separators=(',', ':'))
+        encoded = urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request, queryset):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            payload = json.loads(urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+            reverse = bool(payload['r'])
+            position = payload['p']
+            if not isinstance(position, list) or len(position) != len(self.ordering):
+                raise ValueError
+            # Kursor datang dari client: setiap nilai dikonversi dengan field
+            # ordering-nya agar nilai yang diubah-ubah dibalas 404, bukan 500
+            values = []
+            for field_name, value in zip(self.ordering, position):
+                field = ordering_field(queryset, field_name.lstrip('-'))
+                if isinstance(value, (dict, list)):
+                    raise ValueError
+                values.append(field.to_python(value) if field is not None and value is not None else value)
+        except (TypeError, ValueError, KeyError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return reverse, values
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Nilai kursor halaman.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Jumlah item per halaman.',
+                'schema': {'type': 'integer'},
+            },
+        ]
+
+    def _position(self, instance):
+        return [_cursor_value(_lookup_value(instance, field.lstrip('-'))) for field in self.ordering]
+
+    @staticmethod
+    def _invert(field):
+        return field[1:] if field.startswith('-') else '-' + field
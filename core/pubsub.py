@@ -0,0 +1,97 @@
+# core/pubsub.py
+import asyncio
+import threading
+from collections import defaultdict
+
+from django.db import transaction
+
+
+class Subscription:
+    """
+    Satu koneksi stream. Event dimasukkan ke antrean asyncio milik event loop
+    koneksi tersebut; jika antrean penuh (client lambat), event dibuang dan
+    client diminta memuat ulang datanya (resync).
+    """
+
+    def __init__(self, loop, channels, maxsize):
+        self.loop = loop
+        self.channels = tuple(channels)
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    def deliver(self, event):
+        # Selalu dijalankan di thread event loop (lewat call_soon_threadsafe)
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+class Broker:
+    """
+    Pub/sub di dalam proses: publish() bisa dipanggil dari thread mana pun
+    (view sync, signal, thread fan-out), subscriber hidup di event loop ASGI.
+    Hanya menjangkau koneksi di proses yang sama.
+    """
+
+    def __init__(self):
+        self._channels = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, channels, maxsize=100):
+        subscription = Subscription(asyncio.get_running_loop(), channels, maxsize)
+        with self._lock:
+            for channel in subscription.channels:
+                self._channels[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._channels.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._channels[channel]
+
+    def publish(self, channel, event):
+        with self._lock:
+            subscribers = list(self._channels.get(channel, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+            except RuntimeError:
+                # Event loop sudah ditutup, subscriber dibersihkan saat stream berakhir
+                pass
+
+    def has_subscribers(self, channel):
+        return channel in self._channels
+
+    def subscriber_count(self):
+        with self._lock:
+            return len({subscription for subscribers in self._channels.values() for subscription in subscribers})
+
+
+broker = Broker()
+
+
+def user_channel(user_id):
+    return 'user:%s' % user_id
+
+
+DISCUSSIONS_CHANNEL = 'discussions'
+
+
+def publish(channel, event_type, data):
+    broker.publish(channel, {'event': event_type, 'data': data})
+
+
+def publish_on_commit(channel, event_type, build_data):
+    """
+    Publish setelah transaksi commit. `build_data` baru dipanggil saat itu dan
+    hanya jika ada subscriber, sehingga tidak ada serialisasi yang sia-sia.
+    """
+    def send():
+        if broker.has_subscribers(channel):
+            publish(channel, event_type, build_data())
+    transaction.on_commit(send)
@@ -0,0 +1,293 @@
+# core/search.py
+import html
+import math
+import re
+import unicodedata
+from collections import Counter
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, Count, F, PositiveBigIntegerField, Sum, When
+from django.utils.text import Truncator
+
+from .models import DiscussionPost, DiscussionReply, Event, News, SearchDocument, SearchPosting
+
+TAG_PATTERN = re.compile(r'<[^>]+>')
+TOKEN_PATTERN = re.compile(r'[0-9a-z]+')
+SNIPPET_LENGTH = 240
+MAX_QUERY_TERMS = 10
+
+# Kata fungsi bahasa Indonesia (dan beberapa bahasa Inggris) yang tidak diindeks
+STOPWORDS = frozenset('''
+    ada adalah agar akan aku anda antara apa apabila atas atau bagi bahwa baik banyak
+    bisa dalam dan dapat dari daripada dengan di dia harus hal hanya ia ialah ini itu
+    jadi jika juga kalau kami kamu karena ke kepada kita lagi lain lebih maka masih
+    mereka namun nya oleh pada para pun saat saja sangat sebagai sebuah secara sedang
+    sehingga sejak seperti serta setelah sudah supaya tanpa telah tentang tetapi tidak
+    untuk waktu yaitu yakni yang
+    a an and are as at be by for from in is it of on or that the this to was with
+'''.split())
+
+VOWELS = frozenset('aeiou')
+PARTICLES = ('kah', 'lah', 'tah', 'pun')
+POSSESSIVES = ('nya', 'ku', 'mu')
+SUFFIXES = ('kan', 'an', 'i')
+# (awalan, pengganti jika huruf berikutnya vokal); awalan terpanjang dicoba lebih dulu
+FIRST_ORDER_PREFIXES = (
+    ('meng', ''), ('meny', 's'), ('men', ''), ('mem', 'p'), ('me', ''),
+    ('peng', ''), ('peny', 's'), ('pen', ''), ('pem', 'p'),
+    ('di', ''), ('ter', ''), ('ke', ''),
+)
+SECOND_ORDER_PREFIXES = (('ber', ''), ('bel', ''), ('be', ''), ('per', ''), ('pel', ''), ('pe', ''))
+
+# Parameter BM25. Panjang rata-rata dibuat tetap agar bobot yang sudah
+# tersimpan tidak perlu dihitung ulang setiap kali jumlah dokumen berubah.
+BM25_K1 = 1.2
+BM25_B = 0.75
+AVERAGE_LENGTH = 300
+
+
+def syllables(word):
+    # Seperti pada algoritma Tala, jumlah suku kata didekati dengan jumlah vokal
+    return sum(1 for char in word if char in VOWELS)
+
+
+def _strip_suffix(word, suffixes):
+    if syllables(word) <= 2:
+        return word
+    for suffix in suffixes:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    return word
+
+
+def _strip_prefix(word, prefixes):
+    if syllables(word) <= 2:
+        return word
+    for prefix, replacement in prefixes:
+        rest = word[len(prefix):]
+        if word.startswith(prefix) and len(rest) >= 3:
+            if replacement and rest[0] in VOWELS:
+                return replacement + rest
+            return rest
+    return word
+
+
+def stem(word):
+    """
+    Stemmer bahasa Indonesia berbasis aturan (algoritma Tala, tanpa kamus):
+    partikel, kata ganti milik, awalan tingkat satu dan dua, lalu akhiran.
+    Hasilnya tidak selalu kata dasar yang benar, tetapi konsisten antara
+    dokumen dan query, dan itu yang dibutuhkan pencarian.
+    """
+    if not word.isalpha():
+        return word
+    word = _strip_suffix(word, PARTICLES)
+    word = _strip_suffix(word, POSSESSIVES)
+    word = _strip_prefix(word, FIRST_ORDER_PREFIXES)
+    word = _strip_prefix(word, SECOND_ORDER_PREFIXES)
+    return _strip_suffix(word, SUFFIXES)
+
+
+def plain_text(text):
+    # Konten bisa berisi HTML dari editor teks
+    text = html.unescape(TAG_PATTERN.sub(' ', text or ''))
+    return ' '.join(text.split())
+
+
+def normalize(text):
+    # Huruf kecil tanpa diakritik ("Ané" -> "ane")
+    text = unicodedata.normalize('NFKD', plain_text(text).lower())
+    return ''.join(char for char in text if not unicodedata.combining(char))
+
+
+def words(text):
+    return TOKEN_PATTERN.findall(normalize(text))
+
+
+def tokenize(text):
+    for token in words(text):
+        if len(token) < 2 or token in STOPWORDS:
+            continue
+        yield stem(token)[:64]
+
+
+def bm25_weight(frequency, length):
+    normalized = frequency * (BM25_K1 + 1) / (
+        frequency + BM25_K1 * (1 - BM25_B + BM25_B * length / AVERAGE_LENGTH)
+    )
+    return max(1, round(normalized * 1000))
+
+
+class SearchSource:
+    """
+    Sumber dokumen pencarian untuk satu model: field yang diindeks beserta
+    bobotnya (judul lebih berbobot dari isi) dan data yang ditampilkan di hasil.
+    """
+    kind = None
+    model = None
+    fields = ()
+    snippet_fields = ()
+    date_field = None
+
+    def get_queryset(self):
+        return self.model._default_manager.all()
+
+    def title(self, instance):
+        return instance.title
+
+    def parent_id(self, instance):
+        return None
+
+    def snippet(self, instance):
+        for name in self.snippet_fields:
+            text = plain_text(getattr(instance, name))
+            if text:
+                return Truncator(text).chars(SNIPPET_LENGTH)
+        return ''
+
+    def document(self, instance):
+        frequencies = Counter()
+        length = 0
+        for name, boost in self.fields:
+            for term in tokenize(getattr(instance, name)):
+                frequencies[term] += boost
+                length += boost
+        values = {
+            'parent_id': self.parent_id(instance),
+            'title': self.title(instance)[:255],
+            'snippet': self.snippet(instance),
+            'published_at': getattr(instance, self.date_field),
+        }
+        return values, {term: bm25_weight(frequency, length) for term, frequency in frequencies.items()}
+
+
+class NewsSource(SearchSource):
+    kind = 'news'
+    model = News
+    fields = (('title', 3), ('excerpt', 2), ('content', 1))
+    snippet_fields = ('excerpt', 'content')
+    date_field = 'published_date'
+
+
+class EventSource(SearchSource):
+    kind = 'event'
+    model = Event
+    fields = (('title', 3), ('description', 1))
+    snippet_fields = ('description',)
+    date_field = 'start_date'
+
+
+class DiscussionSource(SearchSource):
+    kind = 'discussion'
+    model = DiscussionPost
+    fields = (('title', 3), ('content', 1))
+    snippet_fields = ('content',)
+    date_field = 'created_at'
+
+
+class ReplySource(SearchSource):
+    kind = 'reply'
+    model = DiscussionReply
+    fields = (('content', 1),)
+    snippet_fields = ('content',)
+    date_field = 'created_at'
+
+    def get_queryset(self):
+        return super().get_queryset().select_related('post')
+
+    def title(self, instance):
+        return instance.post.title
+
+    def parent_id(self, instance):
+        return instance.post_id
+
+
+SEARCH_SOURCES = {source.kind: source for source in (NewsSource(), EventSource(), DiscussionSource(), ReplySource())}
+
+
+def source_for_model(model):
+    for source in SEARCH_SOURCES.values():
+        if source.model is model:
+            return source
+    return None
+
+
+def _delete_postings(document_ids):
+    # Satu DELETE langsung: SearchPosting tidak punya relasi turunan maupun
+    # receiver delete (lihat INDEX_TERM_MODELS di core.signals)
+    SearchPosting.objects.filter(document_id__in=document_ids).delete()
+
+
+def index_objects(source, instances, batch_size=1000):
+    """
+    Membuat atau memperbarui dokumen untuk sekumpulan objek satu sumber, lalu
+    mengganti seluruh posting-nya. Tanpa query per objek, sehingga dipakai juga
+    untuk rebuild indeks.
+    """
+    documents = {instance.pk: source.document(instance) for instance in instances}
+    if not documents:
+        return
+    with transaction.atomic():
+        existing = dict(
+            SearchDocument.objects.filter(kind=source.kind, object_id__in=documents).values_list('object_id', 'id')
+        )
+        rows = [
+            SearchDocument(id=existing.get(object_id), kind=source.kind, object_id=object_id, **values)
+            for object_id, (values, _) in documents.items()
+        ]
+        SearchDocument.objects.bulk_update(
+            [row for row in rows if row.id], ['parent_id', 'title', 'snippet', 'published_at'], batch_size=batch_size
+        )
+        SearchDocument.objects.bulk_create([row for row in rows if not row.id], batch_size=batch_size)
+        _delete_postings(list(existing.values()))
+        # bulk_create tidak mengembalikan id di MySQL, jadi id dokumen dibaca ulang
+        ids = dict(
+            SearchDocument.objects.filter(kind=source.kind, object_id__in=documents).values_list('object_id', 'id')
+        )
+        SearchPosting.objects.bulk_create([
+            SearchPosting(term=term, document_id=ids[object_id], weight=weight)
+            for object_id, (_, weights) in documents.items()
+            for term, weight in weights.items()
+        ], batch_size=batch_size)
+
+
+def remove_objects(source, object_ids):
+    with transaction.atomic():
+        documents = SearchDocument.objects.filter(kind=source.kind, object_id__in=object_ids)
+        _delete_postings(list(documents.values_list('id', flat=True)))
+        documents.delete()
+
+
+def document_count():
+    # Dipakai untuk IDF; tidak perlu tepat, cukup diperbarui berkala
+    return cache.get_or_set('search:document-count', SearchDocument.objects.count, 600) or 0
+
+
+def search(query, kinds=None):
+    """
+    Dokumen yang cocok dengan query, diurutkan menurut jumlah term yang cocok
+    lalu skor TF-IDF (bobot BM25 tersimpan x IDF). Semua skor berupa bilangan
+    bulat sehingga bisa dipakai sebagai posisi kursor KeysetPagination.
+    """
+    terms = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+    frequencies = dict(
+        SearchPosting.objects.filter(term__in=terms).values_list('term').annotate(count=Count('id')).order_by()
+    )
+    if not frequencies:
+        return SearchDocument.objects.none()
+    total = max(document_count(), max(frequencies.values()))
+    idf = {
+        term: max(1, round(100 * math.log(1 + (total - frequency + 0.5) / (frequency + 0.5))))
+        for term, frequency in frequencies.items()
+    }
+    documents = SearchDocument.objects.filter(postings__term__in=list(idf))
+    if kinds:
+        documents = documents.filter(kind__in=kinds)
+    return documents.annotate(
+        matched=Count('postings'),
+        score=Sum(
+            Case(*[When(postings__term=term, then=F('postings__weight') * value) for term, value in idf.items()]),
+            output_field=PositiveBigIntegerField(),
+        ),
+    ).order_by('-matched', '-score', '-id')
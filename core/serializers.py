@@ -1,9 +1,43 @@
 # core/serializers.py
+from django.core.files.storage import default_storage
+from django.db import models
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
 from rest_framework import serializers
-from .models import BPA, AuditLog, Direksi, DiscussionPost, DiscussionReply, EventRegistration, Gallery, GalleryAlbum, GalleryImage, Notification, StrategicDecision, User, AlumniProfile, News, Event, Donation, Feedback,Usage
+from .models import BPA, AuditLog, Direksi, DirectoryEntry, DiscussionPost, DiscussionReply, EventRegistration, Gallery, GalleryAlbum, GalleryImage, Notification, NotificationBroadcast, SearchDocument, StrategicDecision, User, AlumniProfile, News, Event, Donation, Feedback,Usage
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
-
-class UserSerializer(serializers.ModelSerializer):
+from .mixins import DynamicFieldsMixin, get_eager_load_plan
+from .notifications import validate_audience
+
+class RenditionsField(serializers.ReadOnlyField):
+    """
+    Turunan gambar (core.imaging) dalam bentuk siap pakai untuk <img srcset>/<picture>:
+    {"width", "height", "placeholder", "srcset": {"320w": url, ...}, "webp_srcset": {...}}.
+    File asli ikut dimasukkan ke srcset sebagai ukuran terbesar.
+    """
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        request = self.context.get('request')
+
+        def url(name):
+            location = default_storage.url(name)
+            return request.build_absolute_uri(location) if request is not None else location
+
+        sources = value.get('sources', {})
+        fallback = sources.get('jpg') or sources.get('png') or []
+        srcset = {'%dw' % item['width']: url(item['name']) for item in fallback}
+        srcset['%dw' % value['width']] = url(value['source'])
+        return {
+            'width': value['width'],
+            'height': value['height'],
+            'placeholder': value['placeholder'],
+            'srcset': srcset,
+            'webp_srcset': {'%dw' % item['width']: url(item['name']) for item in sources.get('webp', [])},
+        }
+
+class UserSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     password = serializers.CharField(write_only=True)  # Tambahkan field password
     # Tambahkan field verified agar bisa di-update
     verified = serializers.BooleanField(default=False)
@@ -20,26 +54,34 @@ class UserSerializer(serializers.ModelSerializer):
         user.save()
         return user
 
-class AlumniProfileSerializer(serializers.ModelSerializer):
+class AlumniProfileSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     user = UserSerializer()  # Nested representation
+    profile_photo_renditions = RenditionsField()
 
     class Meta:
         model = AlumniProfile
-        fields = ['user', 'graduation_year', 'education', 'job', 'profile_photo']
+        fields = ['user', 'graduation_year', 'education', 'job', 'profile_photo', 'profile_photo_renditions']
         # Menambahkan 'profile_photo' agar foto profil juga ikut ditampilkan
 
-class NewsSerializer(serializers.ModelSerializer):
+class NewsSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     author_full_name = serializers.SerializerMethodField()
     author_profile_photo = serializers.SerializerMethodField()
     published_date_formatted = serializers.SerializerMethodField()
+    image_renditions = RenditionsField()
 
     class Meta:
         model = News
         fields = [
-            'id', 'title', 'excerpt', 'content', 'image', 'category',
+            'id', 'title', 'excerpt', 'content', 'image', 'image_renditions', 'category',
             'published_date', 'published_date_formatted',
             'author', 'author_full_name', 'author_profile_photo'
         ]
+        # Relasi/kolom yang dibaca SerializerMethodField, dipakai EagerLoadingMixin
+        method_field_sources = {
+            'author_full_name': ('author',),
+            'author_profile_photo': ('author__profile',),
+            'published_date_formatted': ('published_date',),
+        }
 
     def get_author_full_name(self, obj):
         if obj.author:
@@ -61,27 +103,56 @@ class NewsSerializer(serializers.ModelSerializer):
         return local_time.strftime("%d %b %Y, %H:%M WIB")
 
 
-class EventSerializer(serializers.ModelSerializer):
+class EventSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    image_renditions = RenditionsField()
+
     class Meta:
         model = Event
         fields = '__all__'
 
-class DonationSerializer(serializers.ModelSerializer):
+class DonationSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Donation
         fields = ['id', 'donor', 'name', 'email', 'amount', 'message', 'proof', 'created_at']
         read_only_fields = ['id', 'created_at', 'donor']
 
-class FeedbackSerializer(serializers.ModelSerializer):
+class FeedbackListSerializer(serializers.ListSerializer):
+    """
+    Mengambil id feedback yang di-like user saat ini sekali untuk satu halaman,
+    sehingga is_liked tidak perlu query per baris.
+    """
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        liked_ids = set()
+        request = self.context.get("request")
+        if request and request.user.is_authenticated and items and 'is_liked' in self.child.fields:
+            liked_ids = set(
+                Feedback.likes.through.objects.filter(
+                    user_id=request.user.pk,
+                    feedback_id__in=[item.pk for item in items],
+                ).values_list('feedback_id', flat=True)
+            )
+        self.context['liked_feedback_ids'] = liked_ids
+        return super().to_representation(items)
+
+
+class FeedbackSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     full_name = serializers.SerializerMethodField()
     profile_photo = serializers.SerializerMethodField()
-    likes_count = serializers.SerializerMethodField()
+    likes_count = serializers.IntegerField(read_only=True)
     is_liked = serializers.SerializerMethodField()
     verified = serializers.SerializerMethodField()
 
     class Meta:
         model = Feedback
         fields = ['id', 'full_name', 'profile_photo', 'message', 'created_at', 'likes_count', 'is_liked', 'verified']
+        list_serializer_class = FeedbackListSerializer
+        method_field_sources = {
+            'full_name': ('user',),
+            'profile_photo': ('user__profile',),
+            'verified': ('user__verified',),
+            'is_liked': (),
+        }
 
     def get_full_name(self, obj):
         if obj.user:
@@ -96,13 +167,14 @@ class FeedbackSerializer(serializers.ModelSerializer):
             return request.build_absolute_uri(obj.user.profile.profile_photo.url)
         return request.build_absolute_uri("/media/profile_photos/profile.png")
 
-    def get_likes_count(self, obj):
-        return obj.likes.count()
-
     def get_is_liked(self, obj):
+        # Saat dipakai lewat FeedbackListSerializer, gunakan set id yang sudah diambil
+        liked_ids = self.context.get('liked_feedback_ids')
+        if liked_ids is not None:
+            return obj.pk in liked_ids
         request = self.context.get("request")
         if request and request.user.is_authenticated:
-            return request.user in obj.likes.all()
+            return obj.likes.filter(pk=request.user.pk).exists()
         return False
     
     def get_verified(self, obj):
@@ -121,26 +193,28 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
         # data['user_role'] = role_map.get(self.user.role, 0)
         return data
 
-class GallerySerializer(serializers.ModelSerializer):
+class GallerySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    image_renditions = RenditionsField()
+
     class Meta:
         model = Gallery
         fields = '__all__'
 
-class UserWithProfileSerializer(serializers.ModelSerializer):
+class UserWithProfileSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     profile = AlumniProfileSerializer(read_only=True)  # Nested representation dari AlumniProfile
 
     class Meta:
         model = User
         fields = ['id', 'username', 'email', 'role', 'first_name', 'last_name', 'phone', 'verified', 'profile', 'verification_requested']
 
-class EventRegistrationSerializer(serializers.ModelSerializer):
+class EventRegistrationSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     user_detail = UserWithProfileSerializer(source="user", read_only=True)
     class Meta:
         model = EventRegistration
         fields = ['id', 'event', 'user', 'user_detail', 'registration_date']
         read_only_fields = ('user', 'registration_date')
 
-class DiscussionReplySerializer(serializers.ModelSerializer):
+class DiscussionReplySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     full_name = serializers.SerializerMethodField()
     profile_photo = serializers.SerializerMethodField()
     verified = serializers.SerializerMethodField()
@@ -148,6 +222,11 @@ class DiscussionReplySerializer(serializers.ModelSerializer):
     class Meta:
         model = DiscussionReply
         fields = ['id', 'post', 'full_name', 'profile_photo', 'content', 'created_at', 'verified']
+        method_field_sources = {
+            'full_name': ('user',),
+            'profile_photo': ('user__profile',),
+            'verified': ('user__verified',),
+        }
 
     def get_full_name(self, obj):
         if obj.user:
@@ -167,15 +246,58 @@ class DiscussionReplySerializer(serializers.ModelSerializer):
         return obj.user.verified
 
 
-class DiscussionPostSerializer(serializers.ModelSerializer):
+class DiscussionPostListSerializer(serializers.ListSerializer):
+    """
+    Mengambil N balasan terbaru dan jumlah balasan untuk semua post di satu halaman
+    dengan satu query window function (ROW_NUMBER/COUNT per post).
+    """
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        limit = self.child.latest_replies_limit
+        latest, counts = {}, {}
+        # Dilewati jika kedua field tidak diminta (?fields=/?omit=)
+        if items and ({'reply_count', 'latest_replies'} & set(self.child.fields)):
+            reply_serializer = DiscussionReplySerializer(context=self.context)
+            replies = get_eager_load_plan(reply_serializer, DiscussionReply).apply(
+                DiscussionReply.objects.filter(post_id__in=[item.pk for item in items])
+            ).annotate(
+                row_number=Window(
+                    RowNumber(),
+                    partition_by=[F('post_id')],
+                    order_by=[F('created_at').desc(), F('id').desc()],
+                ),
+                post_reply_count=Window(Count('id'), partition_by=[F('post_id')]),
+            ).filter(row_number__lte=limit)
+            for reply in replies:
+                latest.setdefault(reply.post_id, []).append(reply)
+                counts[reply.post_id] = reply.post_reply_count
+        self.context['latest_replies'] = latest
+        self.context['reply_counts'] = counts
+        return super().to_representation(items)
+
+
+class DiscussionPostSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     full_name = serializers.SerializerMethodField()
     profile_photo = serializers.SerializerMethodField()  # tambahkan field ini
-    replies = DiscussionReplySerializer(many=True, read_only=True)
+    # Hanya jumlah dan beberapa balasan terbaru; balasan lengkap lewat /api/discussions/{id}/replies/
+    reply_count = serializers.SerializerMethodField()
+    latest_replies = serializers.SerializerMethodField()
     verified = serializers.SerializerMethodField()
 
+    latest_replies_limit = 3
+
     class Meta:
         model = DiscussionPost
-        fields = ['id', 'full_name', 'profile_photo', 'title', 'content', 'created_at', 'replies', 'verified']
+        fields = ['id', 'full_name', 'profile_photo', 'title', 'content', 'created_at', 'reply_count', 'latest_replies', 'verified']
+        list_serializer_class = DiscussionPostListSerializer
+        method_field_sources = {
+            'full_name': ('user',),
+            'profile_photo': ('user__profile',),
+            'verified': ('user__verified',),
+            # Dihitung DiscussionPostListSerializer atau query terpisah, hanya butuh pk
+            'reply_count': (),
+            'latest_replies': (),
+        }
 
     def get_full_name(self, obj):
         if obj.user:
@@ -195,8 +317,25 @@ class DiscussionPostSerializer(serializers.ModelSerializer):
     def get_verified(self, obj):
         return obj.user.verified
 
+    def get_reply_count(self, obj):
+        counts = self.context.get('reply_counts')
+        if counts is not None:
+            return counts.get(obj.pk, 0)
+        return obj.replies.count()
+
+    def get_latest_replies(self, obj):
+        latest = self.context.get('latest_replies')
+        if latest is not None:
+            replies = latest.get(obj.pk, [])
+        else:
+            replies = list(
+                obj.replies.select_related('user__profile').order_by('-created_at', '-id')[:self.latest_replies_limit]
+            )
+        # Ditampilkan berurutan dari yang lama ke yang baru
+        return DiscussionReplySerializer(replies[::-1], many=True, context=self.context).data
+
     
-class AlumniProfileUpdateSerializer(serializers.ModelSerializer):
+class AlumniProfileUpdateSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     # Gunakan source agar field ini bisa digunakan untuk GET dan update
     username = serializers.CharField(source='user.username', required=True)
     name = serializers.CharField(source='user.first_name', required=False)
@@ -221,25 +360,28 @@ class AlumniProfileUpdateSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
     
 
-class UsageSerializer(serializers.ModelSerializer):
+class UsageSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Usage
         fields = ['id', 'description', 'amount', 'date']
 
 
-class GalleryImageSerializer(serializers.ModelSerializer):
+class GalleryImageSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    image_renditions = RenditionsField()
+
     class Meta:
         model = GalleryImage
         fields = '__all__'
 
-class GalleryAlbumSerializer(serializers.ModelSerializer):
+class GalleryAlbumSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     images = GalleryImageSerializer(many=True, read_only=True)  # Foto-foto dalam album
+    cover_image_renditions = RenditionsField()
 
     class Meta:
         model = GalleryAlbum
         fields = '__all__'
 
-class StrategicDecisionSerializer(serializers.ModelSerializer):
+class StrategicDecisionSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     created_by = UserWithProfileSerializer(read_only=True)
     
     class Meta:
@@ -248,26 +390,53 @@ class StrategicDecisionSerializer(serializers.ModelSerializer):
 
 # core/serializers.py
 
-class AuditLogSerializer(serializers.ModelSerializer):
+class AuditLogSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     user = UserWithProfileSerializer(read_only=True)
     
     class Meta:
         model = AuditLog
         fields = ['id', 'user', 'action', 'details', 'timestamp']
 
-class NotificationSerializer(serializers.ModelSerializer):
-    user = UserWithProfileSerializer(read_only=True)
+class NotificationSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    # Tanpa data user: isi kotak masuk selalu milik user yang sedang login
 
     class Meta:
         model = Notification
-        fields = ['id', 'user', 'title', 'message', 'link', 'is_read', 'created_at']
+        fields = ['id', 'title', 'message', 'link', 'is_read', 'created_at']
+
+class NotificationBroadcastSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    progress = serializers.FloatField(read_only=True)
+    throughput = serializers.FloatField(read_only=True)
 
-class DireksiSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = NotificationBroadcast
+        fields = [
+            'id', 'title', 'message', 'link', 'audience', 'status', 'total', 'sent', 'progress', 'throughput',
+            'error', 'created_by', 'created_at', 'started_at', 'finished_at'
+        ]
+        read_only_fields = ['status', 'total', 'sent', 'error', 'created_by', 'created_at', 'started_at', 'finished_at']
+
+    def validate_audience(self, value):
+        return validate_audience(value)
+
+class DireksiSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Direksi
         fields = ['id', 'jabatan', 'nama']
 
-class BPASerializer(serializers.ModelSerializer):
+class BPASerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = BPA
-        fields = ['id', 'jabatan', 'nama']
\ No newline at end of file
+        fields = ['id', 'jabatan', 'nama']
+class SearchResultSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    # kind + object_id menunjuk ke objek aslinya; parent_id untuk balasan adalah id diskusi
+    score = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = SearchDocument
+        fields = ['kind', 'object_id', 'parent_id', 'title', 'snippet', 'published_at', 'score']
+
+class DirectoryEntrySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    class Meta:
+        model = DirectoryEntry
+        fields = ['user', 'full_name', 'username', 'job', 'education', 'graduation_year']
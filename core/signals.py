@@ -0,0 +1,277 @@
+# core/signals.py
+from collections import defaultdict
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .authentication import forget_user
+from .cache import bump_model_version
+from .directory import USER_FIELDS, index_users
+from .imaging import schedule_renditions
+from .models import AlumniProfile, DashboardSummary, DirectoryToken, DirectoryTrigram, DiscussionPost, Donation, Event, EventRegistration, EventWaitlist, Feedback, LedgerDay, Notification, NotificationCounter, SearchDocument, SearchPosting, Usage, User
+from .pubsub import publish_on_commit, user_channel
+from .search import SEARCH_SOURCES, index_objects, remove_objects, source_for_model
+from .serializers import NotificationSerializer
+
+
+@receiver(m2m_changed, sender=Feedback.likes.through)
+def sync_feedback_likes_count(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Menjaga Feedback.likes_count tetap sesuai ketika relasi likes diubah lewat
+    ORM (add/remove/clear), baik dari sisi feedback maupun dari sisi user.
+    """
+    if action == 'pre_clear' and reverse:
+        # pk_set kosong saat clear, simpan dulu feedback yang terdampak
+        instance._cleared_feedback_ids = list(
+            sender.objects.filter(user_id=instance.pk).values_list('feedback_id', flat=True)
+        )
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        feedback_ids = [instance.pk]
+    elif action == 'post_clear':
+        feedback_ids = getattr(instance, '_cleared_feedback_ids', [])
+    else:
+        feedback_ids = list(pk_set or [])
+    if feedback_ids:
+        Feedback.recount_likes(feedback_ids)
+
+
+def remember_old_amount(sender, instance, raw=False, **kwargs):
+    # Simpan amount lama sebelum update agar selisihnya bisa dihitung di post_save
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    instance._old_amount = (
+        sender.objects.filter(pk=instance.pk).values_list('amount', flat=True).first()
+    )
+
+
+def count_dashboard_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    count_field, total_field = DashboardSummary.TRACKED_MODELS[sender]
+    deltas = {}
+    if created:
+        deltas[count_field] = 1
+        if total_field:
+            deltas[total_field] = instance.amount
+    elif total_field:
+        old_amount = getattr(instance, '_old_amount', None)
+        if old_amount is not None:
+            deltas[total_field] = instance.amount - old_amount
+    DashboardSummary.bump(**deltas)
+
+
+def count_dashboard_delete(sender, instance, **kwargs):
+    count_field, total_field = DashboardSummary.TRACKED_MODELS[sender]
+    deltas = {count_field: -1}
+    if total_field:
+        deltas[total_field] = -instance.amount
+    DashboardSummary.bump(**deltas)
+
+
+for tracked_model, (_, total_field) in DashboardSummary.TRACKED_MODELS.items():
+    if total_field:
+        pre_save.connect(remember_old_amount, sender=tracked_model, dispatch_uid=f'old_amount_{tracked_model.__name__}')
+    post_save.connect(count_dashboard_save, sender=tracked_model, dispatch_uid=f'dashboard_save_{tracked_model.__name__}')
+    post_delete.connect(count_dashboard_delete, sender=tracked_model, dispatch_uid=f'dashboard_delete_{tracked_model.__name__}')
+
+
+@receiver(post_save, sender=Donation)
+@receiver(post_save, sender=Usage)
+def record_ledger_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        amount, count = instance.amount, 1
+    else:
+        old_amount = getattr(instance, '_old_amount', None)
+        if old_amount is None or old_amount == instance.amount:
+            return
+        amount, count = instance.amount - old_amount, 0
+    kind = 'donation' if sender is Donation else 'usage'
+    LedgerDay.record(LedgerDay.entry_date(instance), **{f'{kind}_amount': amount, f'{kind}_count': count})
+
+
+@receiver(post_delete, sender=Donation)
+@receiver(post_delete, sender=Usage)
+def record_ledger_delete(sender, instance, **kwargs):
+    kind = 'donation' if sender is Donation else 'usage'
+    LedgerDay.record(LedgerDay.entry_date(instance), **{f'{kind}_amount': -instance.amount, f'{kind}_count': -1})
+
+
+@receiver(pre_save, sender=Notification)
+def remember_notification_state(sender, instance, raw=False, **kwargs):
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    instance._old_state = sender.objects.filter(pk=instance.pk).values_list('user_id', 'is_read').first()
+
+
+@receiver(post_save, sender=Notification)
+def count_notification_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    deltas = defaultdict(int)
+    if not created:
+        old_state = getattr(instance, '_old_state', None)
+        if old_state is None:
+            return
+        old_user_id, old_is_read = old_state
+        if not old_is_read:
+            deltas[old_user_id] -= 1
+    if not instance.is_read:
+        deltas[instance.user_id] += 1
+    NotificationCounter.bump(deltas)
+
+
+@receiver(post_delete, sender=Notification)
+def count_notification_delete(sender, instance, **kwargs):
+    if not instance.is_read:
+        NotificationCounter.bump({instance.user_id: -1})
+
+
+@receiver(post_save, sender=Notification)
+def publish_notification(sender, instance, created, raw=False, **kwargs):
+    if raw or not created:
+        return
+    publish_on_commit(
+        user_channel(instance.user_id), 'notification', lambda: NotificationSerializer(instance).data
+    )
+
+
+
+# Versi cache respons (CachedReadMixin): setiap tulis ke model app core menaikkan versinya.
+# Tabel kata/posting index tidak pernah dibaca lewat cache respons dan sengaja
+# dibiarkan tanpa receiver delete: dengan begitu .delete() pada tabel tersebut
+# dijalankan Django sebagai satu DELETE langsung (fast delete), tanpa SELECT dulu.
+INDEX_TERM_MODELS = (SearchPosting, DirectoryToken, DirectoryTrigram)
+
+
+def bump_cache_version(sender, **kwargs):
+    bump_model_version(sender)
+
+
+def bump_cache_version_m2m(sender, instance, action, model, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_model_version(sender)
+        bump_model_version(type(instance))
+        bump_model_version(model)
+
+
+for cached_model in apps.get_app_config('core').get_models():
+    if cached_model in INDEX_TERM_MODELS:
+        continue
+    post_save.connect(bump_cache_version, sender=cached_model, dispatch_uid=f'cache_version_save_{cached_model.__name__}')
+    post_delete.connect(bump_cache_version, sender=cached_model,
+                        dispatch_uid=f'cache_version_delete_{cached_model.__name__}')
+m2m_changed.connect(bump_cache_version_m2m, dispatch_uid='cache_version_m2m')
+
+
+# Turunan gambar (core.imaging) untuk model yang punya RENDITION_FIELDS
+def remember_old_images(sender, instance, raw=False, **kwargs):
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    instance._old_images = (
+        sender.objects.filter(pk=instance.pk).values(*sender.RENDITION_FIELDS).first() or {}
+    )
+
+
+def schedule_image_renditions(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_images = {} if created else getattr(instance, '_old_images', None)
+    if old_images is None:
+        return
+    for field_name, renditions_field in sender.RENDITION_FIELDS.items():
+        name = getattr(instance, field_name).name
+        if name == old_images.get(field_name):
+            continue
+        if not name or name == sender._meta.get_field(field_name).get_default():
+            # Gambar dihapus atau masih gambar bawaan: tidak ada turunan
+            if getattr(instance, renditions_field):
+                sender.objects.filter(pk=instance.pk).update(**{renditions_field: {}})
+                setattr(instance, renditions_field, {})
+            continue
+        schedule_renditions(instance, field_name)
+
+
+for image_model in apps.get_app_config('core').get_models():
+    if getattr(image_model, 'RENDITION_FIELDS', None):
+        pre_save.connect(remember_old_images, sender=image_model, dispatch_uid=f'old_images_{image_model.__name__}')
+        post_save.connect(schedule_image_renditions, sender=image_model,
+                          dispatch_uid=f'image_renditions_{image_model.__name__}')
+
+
+# Indeks pencarian (core.search), diperbarui setelah transaksi commit
+def index_search_document(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    source = source_for_model(sender)
+
+    def update():
+        index_objects(source, [instance])
+        if sender is DiscussionPost and not created:
+            # Hasil pencarian balasan menampilkan judul diskusinya
+            SearchDocument.objects.filter(kind='reply', parent_id=instance.pk).update(title=instance.title[:255])
+
+    transaction.on_commit(update, robust=True)
+
+
+def remove_search_document(sender, instance, **kwargs):
+    source = source_for_model(sender)
+    object_id = instance.pk
+    transaction.on_commit(lambda: remove_objects(source, [object_id]), robust=True)
+
+
+for search_source in SEARCH_SOURCES.values():
+    post_save.connect(index_search_document, sender=search_source.model,
+                      dispatch_uid=f'search_index_{search_source.kind}')
+    post_delete.connect(remove_search_document, sender=search_source.model,
+                        dispatch_uid=f'search_remove_{search_source.kind}')
+
+
+# Direktori alumni (core.directory)
+def index_directory_user(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields and not USER_FIELDS & set(update_fields)):
+        return
+    user_id = instance.pk
+    transaction.on_commit(lambda: index_users([user_id]), robust=True)
+
+
+def index_directory_profile(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    user_id = instance.user_id
+    transaction.on_commit(lambda: index_users([user_id]), robust=True)
+
+
+post_save.connect(index_directory_user, sender=User, dispatch_uid='directory_user')
+post_save.connect(index_directory_profile, sender=AlumniProfile, dispatch_uid='directory_profile_save')
+post_delete.connect(index_directory_profile, sender=AlumniProfile, dispatch_uid='directory_profile_delete')
+
+
+# Kursi event: pendaftaran yang dihapus (batal, admin, user dihapus) mengembalikan kursinya
+@receiver(post_delete, sender=EventRegistration)
+def release_event_seat(sender, instance, **kwargs):
+    Event.release_seat(instance.event_id)
+
+
+@receiver(post_save, sender=Event)
+def promote_event_waitlist(sender, instance, created, raw=False, **kwargs):
+    # Kuota yang dinaikkan langsung diisi dari antrean tunggu
+    if raw or created:
+        return
+    if EventWaitlist.objects.filter(event_id=instance.pk).exists():
+        EventWaitlist.promote(instance.pk)
+
+
+# Cache user autentikasi JWT (core.authentication)
+def forget_cached_user(sender, instance, **kwargs):
+    forget_user(instance.pk)
+
+
+post_save.connect(forget_cached_user, sender=User, dispatch_uid='auth_user_cache_save')
+post_delete.connect(forget_cached_user, sender=User, dispatch_uid='auth_user_cache_delete')
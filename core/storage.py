@@ -0,0 +1,199 @@
+# core/storage.py
+import hashlib
+import mimetypes
+import os
+import re
+import stat as stat_module
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from .streaming import is_asgi_request, streaming_content
+
+# Nama file hasil ContentAddressedStorage: <folder>/ab/cd/<sha256>.<ext>
+CONTENT_ADDRESSED_NAME = re.compile(r'(^|/)([0-9a-f]{2})/([0-9a-f]{2})/\2\3[0-9a-f]{60}(\.[0-9a-z]+)?$')
+
+# Isi file tidak pernah berubah untuk nama yang sama, jadi boleh di-cache selamanya
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+
+def is_content_addressed(name):
+    return bool(CONTENT_ADDRESSED_NAME.search(name.replace('\\', '/')))
+
+
+def file_digest(content):
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    content.seek(0)
+    return digest.hexdigest()
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Storage yang menamai file berdasarkan hash SHA-256 isinya:
+    "<folder>/ab/cd/<hash>.<ext>", dengan folder dari upload_to (RandomFilename).
+    Upload dengan isi yang sama memakai file yang sudah ada (satu file untuk
+    banyak baris), sehingga delete() tidak menghapusnya; lihat prune_media.
+    Nama lama (angka acak) tetap dibaca apa adanya.
+    """
+
+    def content_name(self, name, content):
+        folder, filename = os.path.split(name)
+        digest = file_digest(content)
+        extension = os.path.splitext(filename)[1].lower()
+        return os.path.join(folder, digest[:2], digest[2:4], digest + extension)
+
+    def _save(self, name, content):
+        name = self.content_name(name, content)
+        if self.exists(name):
+            return name
+        saved = super()._save(name, content)
+        if saved != name:
+            # Upload lain dengan isi yang sama menang duluan: salinan ini dibuang
+            super().delete(saved)
+        return name
+
+    def delete(self, name):
+        # File content-addressed bisa dirujuk banyak baris; file yatim dihapus
+        # oleh perintah prune_media, bukan saat satu baris melepas file-nya
+        if is_content_addressed(name):
+            return
+        super().delete(name)
+
+
+def referenced_names():
+    """Semua nama file yang masih dirujuk field file atau metadata turunan gambar."""
+    from django.apps import apps
+    from django.db.models import FileField
+
+    names = set()
+    for model in apps.get_models():
+        for field in model._meta.concrete_fields:
+            if isinstance(field, FileField):
+                names.update(model._default_manager.exclude(**{field.name: ''}).values_list(field.name, flat=True))
+        for renditions_field in getattr(model, 'RENDITION_FIELDS', {}).values():
+            for renditions in model._default_manager.values_list(renditions_field, flat=True).iterator(chunk_size=500):
+                for variants in (renditions or {}).get('sources', {}).values():
+                    names.update(variant['name'] for variant in variants)
+    names.discard(None)
+    return names
+
+
+RANGE_HEADER = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def parse_range(header, size):
+    """
+    Membaca header Range satu rentang ("bytes=a-b", "bytes=a-", "bytes=-n").
+    Mengembalikan (awal, akhir) inklusif, None jika header diabaikan (tidak
+    valid atau multi-range), atau False jika rentang di luar ukuran file.
+    """
+    match = RANGE_HEADER.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if first == '':
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        return False
+    return start, end
+
+
+def read_range(handle, start, length, chunk_size=64 * 1024):
+    try:
+        handle.seek(start)
+        while length > 0:
+            chunk = handle.read(min(chunk_size, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        handle.close()
+
+
+def file_etag(name, stat):
+    if is_content_addressed(name):
+        # Hash isi file sudah menjadi ETag yang kuat
+        return '"%s"' % os.path.basename(name).split('.')[0]
+    return '"%x-%x"' % (int(stat.st_mtime), stat.st_size)
+
+
+def media_response(request, name, storage=None, cache_control=None):
+    """
+    Response untuk satu file media. Jika MEDIA_ACCEL diatur, transfer diserahkan
+    ke proxy depan (nginx: X-Accel-Redirect, Apache/lighttpd: X-Sendfile);
+    jika tidak, FileResponse dengan dukungan Range, ETag dan request kondisional.
+    Di server ASGI tanpa MEDIA_ACCEL file dikirim dari worker per 64 KB, jadi
+    MEDIA_ACCEL tetap disarankan untuk production.
+    """
+    storage = storage or default_storage
+    try:
+        path = storage.path(name)
+        stat = os.stat(path)
+    except (SuspiciousFileOperation, OSError):
+        raise Http404('File tidak ditemukan.')
+    if not stat_module.S_ISREG(stat.st_mode):
+        raise Http404('File tidak ditemukan.')
+
+    if cache_control is None:
+        cache_control = (
+            {'public': True, 'max_age': IMMUTABLE_MAX_AGE, 'immutable': True}
+            if is_content_addressed(name) else {'public': True, 'no_cache': True}
+        )
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+    etag = file_etag(name, stat)
+    last_modified = int(stat.st_mtime)
+
+    accel = getattr(settings, 'MEDIA_ACCEL', None)
+    if accel:
+        response = HttpResponse(content_type=content_type)
+        if accel == 'x-accel-redirect':
+            # Lokasi internal nginx, mis. "location /protected-media/ { internal; alias MEDIA_ROOT; }"
+            response['X-Accel-Redirect'] = quote(settings.MEDIA_ACCEL_PREFIX + name.replace(os.sep, '/'))
+        else:
+            response['X-Sendfile'] = path
+        patch_cache_control(response, **cache_control)
+        return response
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        byte_range = None
+        if_range = request.headers.get('If-Range')
+        if 'Range' in request.headers and (if_range is None or if_range == etag):
+            byte_range = parse_range(request.headers['Range'], stat.st_size)
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = 'bytes */%d' % stat.st_size
+        elif byte_range is not None:
+            start, end = byte_range
+            length = end - start + 1
+            content = streaming_content(request, read_range(open(path, 'rb'), start, length))
+            response = FileResponse(content, status=206, content_type=content_type)
+            response['Content-Length'] = str(length)
+            response['Content-Range'] = 'bytes %d-%d/%d' % (start, end, stat.st_size)
+        elif is_asgi_request(request):
+            # Handler ASGI tidak punya sendfile dan akan mengumpulkan isi file
+            # sinkron ke memori: file dibaca per 64 KB lewat iterator async
+            content = streaming_content(request, read_range(open(path, 'rb'), 0, stat.st_size))
+            response = FileResponse(content, content_type=content_type)
+            response['Content-Length'] = str(stat.st_size)
+        else:
+            # Di WSGI, FileResponse memakai wsgi.file_wrapper (sendfile) jika server menyediakannya
+            response = FileResponse(open(path, 'rb'), content_type=content_type)
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, **cache_control)
+    return response
@@ -0,0 +1,42 @@
+# core/streaming.py
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+
+
+def is_asgi_request(request):
+    # Request DRF membungkus HttpRequest asli di _request
+    return isinstance(getattr(request, '_request', request), ASGIRequest)
+
+
+async def aiter_sync(iterator):
+    """
+    Mengalirkan iterator sinkron dari event loop. Setiap potongan dibaca lewat
+    satu sync_to_async di thread request, sehingga query ORM di dalam iterator
+    tetap memakai koneksi database request tersebut.
+    """
+    iterator = iter(iterator)
+    done = object()
+    next_part = sync_to_async(next, thread_sensitive=True)
+    try:
+        while True:
+            part = await next_part(iterator, done)
+            if part is done:
+                return
+            yield part
+    finally:
+        close = getattr(iterator, 'close', None)
+        if close is not None:
+            await sync_to_async(close, thread_sensitive=True)()
+
+
+def streaming_content(request, iterator):
+    """
+    Isi StreamingHttpResponse yang dialirkan di kedua handler. Handler ASGI
+    mengumpulkan iterator sinkron dengan list() sebelum byte pertama dikirim
+    (dan handler WSGI melakukan hal yang sama untuk iterator async), jadi di
+    ASGI iterator dibungkus aiter_sync. Iterator sebaiknya sudah menggabungkan
+    potongan kecil (mis. per 64 KB) agar tidak ada perpindahan thread per baris.
+    """
+    if is_asgi_request(request):
+        return aiter_sync(iterator)
+    return iterator
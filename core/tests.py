@@ -1,3 +1,1000 @@
-from django.test import TestCase
+import atexit
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+from base64 import urlsafe_b64encode
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock, skipIf
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.test import AsyncClient, AsyncRequestFactory, RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .audit import AuditWriter, fcntl
+from .cache import get_model_versions
+from .models import AlumniProfile, AuditLog, DashboardSummary, DirectoryEntry, DirectoryToken, Event, EventRegistration, EventWaitlist, Feedback, GalleryAlbum, GalleryImage, News, Notification, NotificationCounter, SearchDocument, SearchPosting, User
+from .streaming import streaming_content
+
+# Cache per proses agar versi model dan respons tidak terbawa dari cache file
+# development; audit dan fan-out notifikasi dijalankan langsung tanpa thread,
+# dan hasher password cepat agar pembuatan user tidak mendominasi waktu test.
+TEST_SETTINGS = {
+    'CACHES': {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    'AUDIT_LOG_ASYNC': False,
+    'NOTIFICATION_FANOUT_ASYNC': False,
+    'PASSWORD_HASHERS': ['django.contrib.auth.hashers.MD5PasswordHasher'],
+}
+
+
+def encode_cursor(position, reverse=False):
+    payload = json.dumps({'r': int(reverse), 'p': position}).encode('utf-8')
+    return urlsafe_b64encode(payload).decode('ascii').rstrip('=')
+
+
+@override_settings(**TEST_SETTINGS)
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user('penulis', password='pw', role='direksi')
+        published = timezone.now()
+        # Sebagian berita berbagi published_date agar pemutus seri (id) ikut diuji
+        News.objects.bulk_create([
+            News(title='Berita %d' % index, content='isi', author=author,
+                 published_date=published - timedelta(hours=index // 3))
+            for index in range(45)
+        ])
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def expected_ids(self):
+        return list(News.objects.order_by('-published_date', '-id').values_list('id', flat=True))
+
+    def test_walks_every_page_once_in_order(self):
+        ids, url, pages = [], '/api/news/', 0
+        while url:
+            data = self.client.get(url).json()
+            ids += [item['id'] for item in data['results']]
+            url = data['next']
+            pages += 1
+        self.assertEqual(ids, self.expected_ids())
+        self.assertEqual(pages, 3)
+
+    def test_previous_link_returns_previous_page(self):
+        first = self.client.get('/api/news/').json()
+        second = self.client.get(first['next']).json()
+        self.assertIsNone(first['previous'])
+        self.assertEqual(self.client.get(second['previous']).json()['results'], first['results'])
+
+    def test_page_size_parameter(self):
+        data = self.client.get('/api/news/', {'page_size': 7}).json()
+        self.assertEqual([item['id'] for item in data['results']], self.expected_ids()[:7])
+
+    def test_rejects_bad_cursors(self):
+        cursors = [
+            '!!!',
+            encode_cursor('x'),
+            encode_cursor([1]),
+            encode_cursor(['bukan-tanggal', 1]),
+            encode_cursor([{'a': 1}, 1]),
+            encode_cursor([timezone.now().isoformat(), 'x']),
+            encode_cursor([timezone.now().isoformat(), [1]]),
+        ]
+        for cursor in cursors:
+            with self.subTest(cursor=cursor):
+                self.assertEqual(self.client.get('/api/news/', {'cursor': cursor}).status_code, 404)
+
+
+def png_upload(name, color):
+    buffer = io.BytesIO()
+    Image.new('RGB', (8, 8), color).save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+@override_settings(**TEST_SETTINGS)
+class GalleryAlbumUploadTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.album = GalleryAlbum.objects.create(title='Reuni Akbar')
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('direksi', password='pw', role='direksi'))
+        self.url = '/api/galleryalbums/%d/upload/' % self.album.pk
+
+    def upload(self, files, **data):
+        with mock.patch('core.views.schedule_rendition') as schedule:
+            response = self.client.post(self.url, dict(data, images=files), format='multipart')
+        return response, [call.args[1] for call in schedule.call_args_list]
+
+    def test_upload_creates_one_row_per_file(self):
+        response, scheduled = self.upload(
+            [png_upload('a.png', 'red'), png_upload('b.png', 'blue')], captions=['Merah', 'Biru']
+        )
+        self.assertEqual(response.status_code, 201)
+        data = response.json()
+        self.assertEqual(data['created'], 2)
+        self.assertEqual([image['caption'] for image in data['images']], ['Merah', 'Biru'])
+        self.assertEqual(sorted(scheduled), sorted(image['id'] for image in data['images']))
+        self.assertEqual(GalleryImage.objects.filter(album=self.album).count(), 2)
+
+    def test_reupload_of_same_file_counts_only_new_rows(self):
+        first, _ = self.upload([png_upload('a.png', 'red')])
+        existing_id = first.json()['images'][0]['id']
+
+        response, scheduled = self.upload([png_upload('a-lagi.png', 'red'), png_upload('b.png', 'blue')])
+        ids = [image['id'] for image in response.json()['images']]
+        self.assertEqual(response.json()['created'], 2)
+        self.assertNotIn(existing_id, ids)
+        self.assertEqual(sorted(scheduled), sorted(ids))
+        self.assertEqual(GalleryImage.objects.filter(album=self.album).count(), 3)
+
+    def test_invalid_file_rejects_whole_upload(self):
+        response, scheduled = self.upload(
+            [png_upload('a.png', 'red'), SimpleUploadedFile('rusak.png', b'bukan gambar', content_type='image/png')]
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('rusak.png', response.json()['images'])
+        self.assertEqual(scheduled, [])
+        self.assertFalse(GalleryImage.objects.exists())
+
+
+def make_event(**kwargs):
+    now = timezone.now()
+    kwargs.setdefault('title', 'Reuni')
+    return Event.objects.create(description='Temu alumni', start_date=now, end_date=now, **kwargs)
+
+
+@override_settings(**TEST_SETTINGS)
+class EventCapacityTests(TestCase):
+    def setUp(self):
+        self.users = [User.objects.create_user('alumni%d' % index, password='pw') for index in range(4)]
+
+    def seats_taken(self, event):
+        return Event.objects.values_list('seats_taken', flat=True).get(pk=event.pk)
+
+    def test_claim_seat_stops_at_capacity(self):
+        event = make_event(capacity=2)
+        self.assertTrue(Event.claim_seat(event.pk))
+        self.assertTrue(Event.claim_seat(event.pk))
+        self.assertFalse(Event.claim_seat(event.pk))
+        self.assertEqual(self.seats_taken(event), 2)
+
+    def test_claim_seat_without_capacity_is_unlimited(self):
+        event = make_event()
+        for _ in range(5):
+            self.assertTrue(Event.claim_seat(event.pk))
+        self.assertEqual(self.seats_taken(event), 5)
+
+    def test_claim_seat_for_missing_event(self):
+        self.assertFalse(Event.claim_seat(0))
+
+    def test_register_returns_none_when_full(self):
+        event = make_event(capacity=1)
+        self.assertIsNotNone(EventRegistration.register(event.pk, self.users[0]))
+        self.assertIsNone(EventRegistration.register(event.pk, self.users[1]))
+        self.assertEqual(EventRegistration.objects.filter(event=event).count(), 1)
+        self.assertEqual(self.seats_taken(event), 1)
+
+    def test_duplicate_registration_rolls_back_seat(self):
+        event = make_event(capacity=3)
+        EventRegistration.register(event.pk, self.users[0])
+        with self.assertRaises(IntegrityError):
+            EventRegistration.register(event.pk, self.users[0])
+        self.assertEqual(self.seats_taken(event), 1)
+
+    def test_deleting_registration_releases_seat(self):
+        event = make_event(capacity=1)
+        registration = EventRegistration.register(event.pk, self.users[0])
+        registration.delete()
+        self.assertEqual(self.seats_taken(event), 0)
+        self.assertIsNotNone(EventRegistration.register(event.pk, self.users[1]))
+
+    def test_promote_fills_free_seats_in_waitlist_order(self):
+        event = make_event(capacity=1)
+        EventRegistration.register(event.pk, self.users[0])
+        first = EventWaitlist.objects.create(event=event, user=self.users[1])
+        second = EventWaitlist.objects.create(event=event, user=self.users[2])
+        self.assertEqual((first.position, second.position), (1, 2))
+
+        self.assertEqual(EventWaitlist.promote(event.pk), [])
+        EventRegistration.objects.filter(user=self.users[0]).delete()
+        promoted = EventWaitlist.promote(event.pk)
+
+        self.assertEqual([registration.user_id for registration in promoted], [self.users[1].pk])
+        self.assertEqual(list(EventWaitlist.objects.values_list('user_id', flat=True)), [self.users[2].pk])
+        self.assertEqual(self.seats_taken(event), 1)
+        self.assertTrue(Notification.objects.filter(user=self.users[1]).exists())
+
+    def test_promote_with_empty_waitlist_keeps_seat_free(self):
+        event = make_event(capacity=1)
+        self.assertEqual(EventWaitlist.promote(event.pk), [])
+        self.assertEqual(self.seats_taken(event), 0)
+
+    def test_raising_capacity_promotes_waitlist(self):
+        event = make_event(capacity=1)
+        EventRegistration.register(event.pk, self.users[0])
+        EventWaitlist.objects.create(event=event, user=self.users[1])
+        event.capacity = 2
+        event.save()
+        self.assertTrue(EventRegistration.objects.filter(event=event, user=self.users[1]).exists())
+        self.assertEqual(self.seats_taken(event), 2)
+
+    def test_register_waitlist_and_cancel_through_api(self):
+        event = make_event(capacity=1)
+        client = APIClient()
+        client.force_authenticate(self.users[0])
+        self.assertEqual(client.post('/api/event-registration/', {'event': event.pk}).status_code, 201)
+        self.assertEqual(client.post('/api/event-registration/', {'event': event.pk}).status_code, 400)
+
+        client.force_authenticate(self.users[1])
+        response = client.post('/api/event-registration/', {'event': event.pk})
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()['position'], 1)
+
+        client.force_authenticate(self.users[0])
+        response = client.delete('/api/event-registration/?event=%d' % event.pk)
+        self.assertLess(response.status_code, 300)
+        self.assertEqual(
+            list(EventRegistration.objects.filter(event=event).values_list('user_id', flat=True)), [self.users[1].pk]
+        )
+        self.assertFalse(EventWaitlist.objects.filter(event=event).exists())
+        self.assertEqual(self.seats_taken(event), 1)
+
+
+@override_settings(**TEST_SETTINGS)
+class DashboardSummaryTests(TestCase):
+    def test_sharded_counters_match_source_tables(self):
+        events = [make_event() for _ in range(30)]
+        self.assertGreater(DashboardSummary.objects.count(), 1)
+        self.assertEqual(DashboardSummary.current().event_count, 30)
+
+        for event in events[:12]:
+            event.delete()
+        self.assertEqual(DashboardSummary.current().event_count, 18)
+        self.assertEqual(DashboardSummary.current().event_count, DashboardSummary.compute()['event_count'])
+        call_command('rebuild_dashboard_summary', '--check', stdout=io.StringIO())
+
+    def test_rebuild_collapses_shards(self):
+        for _ in range(10):
+            make_event()
+        DashboardSummary.objects.update(event_count=100)
+        call_command('rebuild_dashboard_summary', stdout=io.StringIO())
+        self.assertEqual(DashboardSummary.current().event_count, 10)
+        self.assertEqual(DashboardSummary.objects.get(pk=1).event_count, 10)
+        self.assertFalse(DashboardSummary.objects.exclude(pk=1).exclude(event_count=0).exists())
+
+
+@override_settings(**TEST_SETTINGS)
+class ServeMediaTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root, MEDIA_ACCEL=None)
+        media.enable()
+        self.addCleanup(media.disable)
+        for folder in ('donation_proofs', 'gallery_images'):
+            os.makedirs(os.path.join(media_root, folder))
+            with open(os.path.join(media_root, folder, 'x.jpg'), 'wb') as handle:
+                handle.write(b'rahasia' if folder == 'donation_proofs' else b'publik')
+
+    def test_public_and_protected_folders(self):
+        response = self.client.get('/media/gallery_images/x.jpg')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'publik')
+        self.assertEqual(self.client.get('/media/donation_proofs/x.jpg').status_code, 401)
+
+    def test_range_request(self):
+        response = self.client.get('/media/gallery_images/x.jpg', headers={'Range': 'bytes=1-3'})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 1-3/6')
+        self.assertEqual(b''.join(response.streaming_content), b'ubl')
+
+    async def test_streams_under_asgi(self):
+        client = AsyncClient()
+        response = await client.get('/media/gallery_images/x.jpg')
+        self.assertTrue(response.is_async)
+        self.assertEqual(response['Content-Length'], '6')
+        self.assertEqual(b''.join([part async for part in response.streaming_content]), b'publik')
+
+        response = await client.get('/media/gallery_images/x.jpg', headers={'Range': 'bytes=-2'})
+        self.assertEqual(response.status_code, 206)
+        self.assertTrue(response.is_async)
+        self.assertEqual(response['Content-Length'], '2')
+        self.assertEqual(b''.join([part async for part in response.streaming_content]), b'ik')
+
+    def test_rejects_path_traversal_into_protected_folder(self):
+        paths = [
+            '/media/./donation_proofs/x.jpg',
+            '/media/gallery_images/../donation_proofs/x.jpg',
+            '/media/gallery_images/%2e%2e/donation_proofs/x.jpg',
+            '/media/gallery_images/%2E%2E/donation_proofs/x.jpg',
+            '/media/gallery_images//../donation_proofs/x.jpg',
+            '/media/gallery_images/..%2fdonation_proofs/x.jpg',
+        ]
+        for path in paths:
+            with self.subTest(path=path):
+                self.assertEqual(self.client.get(path).status_code, 404)
+
+
+class StreamingContentTests(SimpleTestCase):
+    def test_wsgi_request_keeps_sync_iterator(self):
+        parts = iter(['a', 'b'])
+        self.assertIs(streaming_content(RequestFactory().get('/'), parts), parts)
+
+    def test_asgi_request_reads_parts_lazily(self):
+        produced = []
+
+        def parts():
+            for part in ('a', 'b', 'c'):
+                produced.append(part)
+                yield part
+
+        async def consume(content):
+            received = []
+            async for part in content:
+                # Potongan berikutnya belum dibaca sebelum potongan ini dikirim
+                self.assertEqual(produced, received + [part])
+                received.append(part)
+            return received
+
+        content = streaming_content(AsyncRequestFactory().get('/'), parts())
+        self.assertEqual(async_to_sync(consume)(content), ['a', 'b', 'c'])
+
+
+def bearer(user):
+    return {'Authorization': 'Bearer %s' % AccessToken.for_user(user)}
+
+
+@override_settings(**TEST_SETTINGS)
+class AlumniGroupingTests(TestCase):
+    profiles = [
+        ('ani', 2001, 'S1', 'Guru'),
+        ('budi', 2001, 'S2', None),
+        ('citra', 2009, 'S1', 'Dokter'),
+        ('dedi', 2012, 'S1', None),
+        ('eka', 2012, 'S3', 'Guru'),
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        for username, year, education, job in cls.profiles:
+            user = User.objects.create_user(username, password='pw')
+            AlumniProfile.objects.create(user=user, graduation_year=year, education=education, job=job)
+        cls.user = User.objects.get(username='ani')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        # Potongan kecil agar batas chunk keyset dan buffer ikut teruji
+        patcher = mock.patch.multiple('core.views.AlumniGroupingView', chunk_size=2, stream_buffer_size=1)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def groups(self, data, group_by):
+        return [
+            (group[group_by], [alumni['user']['username'] for alumni in group['alumni']], group['total'])
+            for group in data
+        ]
+
+    def test_summary_mode(self):
+        response = self.client.get('/api/alumni-group/', {'group_by': 'graduation_decade', 'summary': '1'})
+        self.assertEqual(response.json(), [
+            {'graduation_decade': 2000, 'total': 3}, {'graduation_decade': 2010, 'total': 2},
+        ])
+        response = self.client.get('/api/alumni-group/', {'group_by': 'job', 'summary': 'true'})
+        self.assertEqual([(row['job'], row['total']) for row in response.json()], [
+            (None, 2), ('Dokter', 1), ('Guru', 2),
+        ])
+
+    def test_streaming_mode(self):
+        response = self.client.get('/api/alumni-group/', {'group_by': 'graduation_year'})
+        self.assertTrue(response.streaming)
+        data = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(self.groups(data, 'graduation_year'), [
+            (2001, ['ani', 'budi'], 2), (2009, ['citra'], 1), (2012, ['dedi', 'eka'], 2),
+        ])
+
+        response = self.client.get('/api/alumni-group/', {'group_by': 'job'})
+        data = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(self.groups(data, 'job'), [
+            (None, ['budi', 'dedi'], 2), ('Dokter', ['citra'], 1), ('Guru', ['ani', 'eka'], 2),
+        ])
+
+    def test_rejects_unknown_group(self):
+        self.assertEqual(self.client.get('/api/alumni-group/', {'group_by': 'alamat'}).status_code, 400)
+
+    async def test_streaming_mode_under_asgi(self):
+        response = await AsyncClient().get(
+            '/api/alumni-group/', {'group_by': 'graduation_decade'}, headers=bearer(self.user)
+        )
+        self.assertTrue(response.is_async)
+        parts = [part async for part in response.streaming_content]
+        self.assertGreater(len(parts), 1)
+        self.assertEqual(self.groups(json.loads(b''.join(parts)), 'graduation_decade'), [
+            (2000, ['ani', 'budi', 'citra'], 3), (2010, ['dedi', 'eka'], 2),
+        ])
+
+
+def parse_export(content, export_format):
+    """Mengembalikan (kolom header, daftar baris) dari isi file export."""
+    text = content.decode('utf-8')
+    if export_format == 'excel':
+        text = text.removeprefix('\ufeff')
+    if export_format in ('csv', 'excel'):
+        header, *rows = csv.reader(io.StringIO(text))
+        return header, rows
+    if export_format == 'json':
+        rows = json.loads(text)
+    else:
+        rows = [json.loads(line) for line in text.splitlines()]
+    return list(rows[0]), rows
+
+
+EXPORT_CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'excel': 'text/csv; charset=utf-8',
+    'json': 'application/json; charset=utf-8',
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+}
+
+
+@override_settings(**TEST_SETTINGS)
+class AuditReportExportTests(TestCase):
+    columns = ['id', 'timestamp', 'user_id', 'username', 'user_role', 'action', 'details']
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('pengawas', password='pw', role='bpa')
+        now = timezone.now()
+        AuditLog.objects.bulk_create([
+            AuditLog(user=cls.user, action='update', details='log %d' % index, timestamp=now - timedelta(minutes=index))
+            for index in range(5)
+        ])
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        # 5 baris dengan potongan 2 baris: tiga query keyset
+        patcher = mock.patch('core.views.AuditReportView.export_chunk_size', 2)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_every_format(self):
+        expected = list(AuditLog.objects.order_by('-timestamp', '-id').values_list('id', flat=True))
+        for export_format, content_type in EXPORT_CONTENT_TYPES.items():
+            with self.subTest(export_format=export_format):
+                response = self.client.get('/api/audit-report/', {'export': export_format})
+                self.assertEqual(response['Content-Type'], content_type)
+                self.assertIn('attachment; filename="audit-log-', response['Content-Disposition'])
+                content = b''.join(response.streaming_content)
+                # BOM hanya untuk format excel
+                self.assertEqual(content.startswith('\ufeff'.encode('utf-8')), export_format == 'excel')
+                header, rows = parse_export(content, export_format)
+                self.assertEqual(header, self.columns)
+                self.assertEqual(len(rows), 5)
+                ids = [int(row[0]) if isinstance(row, list) else row['id'] for row in rows]
+                self.assertEqual(ids, expected)
+
+    def test_rejects_unknown_format(self):
+        self.assertEqual(self.client.get('/api/audit-report/', {'export': 'xml'}).status_code, 400)
+
+    async def test_streams_under_asgi(self):
+        response = await AsyncClient().get('/api/audit-report/', {'export': 'csv'}, headers=bearer(self.user))
+        self.assertTrue(response.is_async)
+        content = b''.join([part async for part in response.streaming_content])
+        header, rows = parse_export(content, 'csv')
+        self.assertEqual((header, len(rows)), (self.columns, 5))
+
+
+@override_settings(**TEST_SETTINGS)
+class EventRegistrationExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.direksi = User.objects.create_user('direksi', password='pw', role='direksi')
+        cls.event, other = make_event(title='Reuni'), make_event(title='Seminar')
+        for index in range(5):
+            user = User.objects.create_user('peserta%d' % index, password='pw', email='p%d@example.com' % index)
+            EventRegistration.objects.create(event=cls.event, user=user)
+            if index < 2:
+                EventRegistration.objects.create(event=other, user=user)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.direksi)
+        patcher = mock.patch('core.views.EventRegistrationListView.export_chunk_size', 2)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_every_format(self):
+        for export_format, content_type in EXPORT_CONTENT_TYPES.items():
+            with self.subTest(export_format=export_format):
+                response = self.client.get('/api/event-registrations/', {'export': export_format, 'event': self.event.pk})
+                self.assertEqual(response['Content-Type'], content_type)
+                self.assertIn('filename="peserta-event-%d.' % self.event.pk, response['Content-Disposition'])
+                header, rows = parse_export(b''.join(response.streaming_content), export_format)
+                self.assertEqual(header[:3], ['id', 'event_id', 'event_title'])
+                self.assertEqual(len(header), 13)
+                self.assertEqual(len(rows), 5)
+
+    def test_selected_columns_across_events(self):
+        response = self.client.get('/api/event-registrations/', {'export': 'csv', 'columns': 'event_title,username'})
+        header, rows = parse_export(b''.join(response.streaming_content), 'csv')
+        self.assertEqual(header, ['event_title', 'username'])
+        self.assertEqual(rows, [['Reuni', 'peserta%d' % index] for index in range(5)] + [
+            ['Seminar', 'peserta0'], ['Seminar', 'peserta1'],
+        ])
+
+    def test_rejects_unknown_format_and_column(self):
+        self.assertEqual(self.client.get('/api/event-registrations/', {'export': 'xml'}).status_code, 400)
+        response = self.client.get('/api/event-registrations/', {'export': 'csv', 'columns': 'password'})
+        self.assertEqual(response.status_code, 400)
+
+    async def test_streams_under_asgi(self):
+        response = await AsyncClient().get(
+            '/api/event-registrations/', {'export': 'ndjson'}, headers=bearer(self.direksi)
+        )
+        self.assertTrue(response.is_async)
+        header, rows = parse_export(b''.join([part async for part in response.streaming_content]), 'ndjson')
+        self.assertEqual(len(rows), 7)
+
+
+def write_spool(path, records):
+    with open(path, 'w', encoding='utf-8') as handle:
+        for user_id, action in records:
+            handle.write(json.dumps({
+                'user_id': user_id, 'action': action, 'details': '', 'timestamp': timezone.now().isoformat(),
+            }) + '\n')
+
+
+@override_settings(**TEST_SETTINGS)
+class AuditWriterTests(TestCase):
+    def setUp(self):
+        self.spool_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.spool_dir, ignore_errors=True)
+        self.user = User.objects.create_user('auditor', password='pw')
+        # Thread latar belakang tidak dijalankan: flush dipanggil langsung oleh test
+        patcher = mock.patch.object(AuditWriter, '_run')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def make_writer(self):
+        writer = AuditWriter(self.spool_dir, batch_size=100, flush_interval=3600)
+        self.addCleanup(writer.close)
+        self.addCleanup(atexit.unregister, writer.close)
+        return writer
+
+    def logged(self):
+        return list(AuditLog.objects.order_by('id').values_list('user_id', 'action'))
+
+    def test_flush_writes_spooled_records(self):
+        writer = self.make_writer()
+        writer.log(self.user.pk, 'ubah profil', 'detail')
+        writer.log(None, 'anonim')
+        self.assertEqual(self.logged(), [])
+
+        writer.flush()
+        self.assertEqual(self.logged(), [(self.user.pk, 'ubah profil'), (None, 'anonim')])
+        writer.flush()
+        self.assertEqual(len(self.logged()), 2)
+        self.assertEqual(list(Path(self.spool_dir).glob('*.segment')), [])
+
+    def test_middleware_logs_write_requests(self):
+        writer = self.make_writer()
+        client = APIClient()
+        client.force_authenticate(self.user)
+        with override_settings(AUDIT_LOG_ASYNC=True), mock.patch('core.audit._writer', writer):
+            self.assertEqual(client.post('/api/notifications/mark-all-read/').status_code, 200)
+            client.get('/api/notifications/')
+            client.post('/api/event-registration/', {'event': 0})
+        self.assertEqual(self.logged(), [])
+
+        writer.flush()
+        self.assertEqual(self.logged(), [(self.user.pk, 'POST /api/notifications/mark-all-read/')])
+        self.assertIn('status=200', AuditLog.objects.get().details)
+
+    @skipIf(fcntl is None, 'flock tidak tersedia')
+    def test_orphaned_spool_is_replayed_exactly_once(self):
+        # Sisa proses yang mati: file .lock tanpa flock, spool aktif dan satu segmen
+        spool_dir = Path(self.spool_dir)
+        (spool_dir / '99-dead.lock').touch()
+        write_spool(spool_dir / '99-dead-000001.segment', [(self.user.pk, 'segmen')])
+        write_spool(spool_dir / '99-dead.spool', [(self.user.pk, 'spool 1'), (None, 'spool 2')])
+        # Proses lain yang masih hidup memegang flock: spool-nya tidak boleh disentuh
+        (spool_dir / '98-live.lock').touch()
+        write_spool(spool_dir / '98-live.spool', [(None, 'masih hidup')])
+        live_lock = open(spool_dir / '98-live.lock', 'a')
+        self.addCleanup(live_lock.close)
+        fcntl.flock(live_lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+        writer = self.make_writer()
+        writer.log(None, 'pemicu start')
+        writer.replay_orphans()
+        writer.replay_orphans()
+        # Writer kedua melewati spool writer pertama yang masih hidup
+        second = self.make_writer()
+        second.log(None, 'writer kedua')
+        second.replay_orphans()
+
+        self.assertEqual(self.logged(), [(self.user.pk, 'segmen'), (self.user.pk, 'spool 1'), (None, 'spool 2')])
+        self.assertFalse((spool_dir / '99-dead.spool').exists())
+        self.assertFalse((spool_dir / '99-dead.lock').exists())
+        self.assertTrue((spool_dir / '98-live.spool').exists())
+
+
+@override_settings(**TEST_SETTINGS)
+class CachedJWTAuthenticationTests(TestCase):
+    url = '/api/event-registrations/'
+
+    def setUp(self):
+        self.user = User.objects.create_user('anggota', password='lama', role='direksi')
+        self.headers = bearer(self.user)
+
+    def get(self, headers=None):
+        return self.client.get(self.url, headers=headers or self.headers).status_code
+
+    def test_cache_hit_skips_user_query(self):
+        self.assertEqual(self.get(), 200)
+        with self.assertNumQueries(1):
+            # Hanya halaman pendaftaran, tanpa SELECT user
+            self.assertEqual(self.get(), 200)
+
+    def test_role_change_applies_on_next_request(self):
+        self.assertEqual(self.get(), 200)
+        self.user.role = 'alumni'
+        self.user.save()
+        self.assertEqual(self.get(), 403)
+
+    def test_deactivation_applies_on_next_request(self):
+        self.assertEqual(self.get(), 200)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.get(), 401)
+
+    def test_password_change_revokes_tokens_on_next_request(self):
+        self.assertEqual(self.get(), 200)
+        self.user.set_password('baru')
+        self.user.save()
+        self.assertEqual(self.get(), 401)
+        self.assertEqual(self.get(bearer(self.user)), 200)
+
+    def test_request_verified_uses_cached_user_without_extra_queries(self):
+        self.user.role = 'alumni'
+        self.user.save()
+        self.assertEqual(self.get(), 403)
+        # UPDATE satu kolom dan log audit; field user yang ter-defer tidak dimuat
+        with self.assertNumQueries(2):
+            response = self.client.post('/api/request-verified/', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        user = User.objects.get(pk=self.user.pk)
+        self.assertTrue(user.verification_requested)
+        self.assertEqual((user.role, user.username), ('alumni', 'anggota'))
+
+
+@override_settings(**TEST_SETTINGS)
+class FeedbackLikeCountTests(TestCase):
+    def setUp(self):
+        self.users = [User.objects.create_user('penyuka%d' % index, password='pw') for index in range(3)]
+        self.feedbacks = [Feedback.objects.create(user=self.users[0], message='Pesan %d' % index) for index in range(2)]
+
+    def assertCountsMatch(self):
+        for feedback in Feedback.objects.all():
+            self.assertEqual(feedback.likes_count, feedback.likes.count())
+
+    def test_orm_add_remove_and_clear_from_both_sides(self):
+        first, second = self.feedbacks
+        first.likes.add(*self.users)
+        self.users[0].liked_feedbacks.add(second)
+        self.assertCountsMatch()
+
+        first.likes.remove(self.users[1])
+        self.users[0].liked_feedbacks.clear()
+        self.assertCountsMatch()
+        self.assertEqual(list(Feedback.objects.order_by('id').values_list('likes_count', flat=True)), [1, 0])
+
+        first.likes.clear()
+        self.assertCountsMatch()
+
+    def test_list_shows_stored_count(self):
+        self.feedbacks[1].likes.add(*self.users[:2])
+        data = APIClient().get('/api/feedbacks/').json()
+        counts = {item['id']: item['likes_count'] for item in data.get('results', data)}
+        self.assertEqual(counts, {self.feedbacks[0].pk: 0, self.feedbacks[1].pk: 2})
+
+
+@override_settings(**TEST_SETTINGS)
+class FeedbackLikeToggleTests(TestCase):
+    def setUp(self):
+        self.users = [User.objects.create_user('pemberi%d' % index, password='pw') for index in range(2)]
+        self.feedback = Feedback.objects.create(user=self.users[0], message='Terima kasih')
+        self.url = '/api/feedbacks/%d/like/' % self.feedback.pk
+
+    def like(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.post(self.url).json()
+
+    def assertCountMatches(self, expected):
+        self.feedback.refresh_from_db()
+        self.assertEqual(self.feedback.likes_count, expected)
+        self.assertEqual(self.feedback.likes.count(), expected)
+
+    def test_like_and_unlike_keep_count_in_sync(self):
+        self.assertEqual(self.like(self.users[0]), {'liked': True, 'likes_count': 1})
+        self.assertEqual(self.like(self.users[1]), {'liked': True, 'likes_count': 2})
+        self.assertCountMatches(2)
+        self.assertEqual(self.like(self.users[0]), {'liked': False, 'likes_count': 1})
+        self.assertCountMatches(1)
+        self.assertEqual(self.like(self.users[1]), {'liked': False, 'likes_count': 0})
+        self.assertCountMatches(0)
+
+    def test_like_requires_login_and_existing_feedback(self):
+        self.assertEqual(APIClient().post(self.url).status_code, 401)
+        client = APIClient()
+        client.force_authenticate(self.users[0])
+        self.assertEqual(client.post('/api/feedbacks/0/like/').status_code, 404)
+        self.assertCountMatches(0)
+
+    def test_like_status(self):
+        other = Feedback.objects.create(user=self.users[0], message='Lainnya')
+        self.like(self.users[0])
+        client = APIClient()
+        client.force_authenticate(self.users[0])
+        response = client.get('/api/feedbacks/like-status/', {'ids': '%d,%d,0' % (self.feedback.pk, other.pk)})
+        self.assertEqual(response.json(), [
+            {'id': self.feedback.pk, 'liked': True, 'likes_count': 1},
+            {'id': other.pk, 'liked': False, 'likes_count': 0},
+        ])
+        self.assertEqual(client.get('/api/feedbacks/like-status/', {'ids': 'a'}).status_code, 400)
+
+
+@override_settings(**TEST_SETTINGS)
+class NotificationCounterTests(TestCase):
+    def setUp(self):
+        self.user, self.other = [User.objects.create_user(name, password='pw') for name in ('penerima', 'lain')]
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def notify(self, user, count):
+        return [Notification.objects.create(user=user, title='Info %d' % index, message='isi') for index in range(count)]
+
+    def unread(self):
+        api = self.client.get('/api/notifications/unread-count/').json()['unread']
+        actual = Notification.objects.filter(user=self.user, is_read=False).count()
+        self.assertEqual(api, actual)
+        return api
+
+    def test_count_follows_create_read_and_delete(self):
+        notifications = self.notify(self.user, 4)
+        others = self.notify(self.other, 2)
+        self.assertEqual(self.unread(), 4)
+
+        notifications[0].is_read = True
+        notifications[0].save()
+        notifications[1].delete()
+        self.assertEqual(self.unread(), 2)
+
+        # Id milik user lain dan yang sudah dibaca tidak mengubah counter
+        ids = [notifications[0].pk, notifications[2].pk, others[0].pk]
+        response = self.client.post('/api/notifications/mark-read/', {'ids': ids}, format='json')
+        self.assertEqual(response.json(), {'updated': 1, 'unread': 1})
+        self.assertEqual(self.unread(), 1)
+        self.assertEqual(NotificationCounter.unread_for(self.other.pk), 2)
+
+    def test_mark_all_read_then_new_notification(self):
+        self.notify(self.user, 3)
+        self.assertEqual(self.unread(), 3)
+        response = self.client.post('/api/notifications/mark-all-read/')
+        self.assertEqual(response.json(), {'updated': 3, 'unread': 0})
+        self.assertEqual(self.unread(), 0)
+        self.notify(self.user, 1)
+        self.assertEqual(self.unread(), 1)
+
+    def test_missing_counter_is_rebuilt(self):
+        self.notify(self.user, 2)
+        NotificationCounter.objects.all().delete()
+        self.assertEqual(self.unread(), 2)
+        self.assertEqual(self.client.post('/api/notifications/mark-all-read/').json()['updated'], 2)
+        self.assertEqual(self.unread(), 0)
+
+
+@override_settings(**TEST_SETTINGS)
+class CachedReadTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user('redaksi', password='pw', first_name='Redaksi', role='direksi')
+        self.news = News.objects.create(title='Judul lama', content='isi', author=self.author)
+        self.url = '/api/news/%d/' % self.news.pk
+
+    def get(self, url=None):
+        response = self.client.get(url or self.url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_write_bumps_version_and_invalidates_reads(self):
+        self.assertEqual(self.get()['X-Cache'], 'MISS')
+        self.assertEqual(self.get()['X-Cache'], 'HIT')
+        self.assertEqual(self.get('/api/news/')['X-Cache'], 'MISS')
+        self.assertEqual(self.get('/api/news/')['X-Cache'], 'HIT')
+
+        before = get_model_versions([News])
+        self.news.title = 'Judul baru'
+        self.news.save()
+        self.assertNotEqual(get_model_versions([News]), before)
+
+        response = self.get()
+        self.assertEqual((response['X-Cache'], response.json()['title']), ('MISS', 'Judul baru'))
+        response = self.get('/api/news/')
+        self.assertEqual([item['title'] for item in response.json()['results']], ['Judul baru'])
+
+    def test_related_model_write_invalidates_reads(self):
+        self.get()
+        self.author.first_name = 'Humas'
+        self.author.save()
+        response = self.get()
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['author_full_name'].split()[0], 'Humas')
+
+    def test_delete_invalidates_list(self):
+        self.assertEqual(len(self.get('/api/news/').json()['results']), 1)
+        self.news.delete()
+        response = self.get('/api/news/')
+        self.assertEqual((response['X-Cache'], response.json()['results']), ('MISS', []))
+
+
+@override_settings(**TEST_SETTINGS)
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.news = News.objects.create(title='Pengumuman', content='isi')
+        self.url = '/api/news/%d/' % self.news.pk
+
+    def change_later(self, change):
+        # Perubahan beberapa detik kemudian agar Last-Modified (resolusi detik) ikut bergeser
+        later = time.time_ns() + 5 * 10 ** 9
+        with mock.patch('core.cache.time.time_ns', return_value=later):
+            change()
+
+    def test_etag_returns_304_until_change(self):
+        for url in (self.url, '/api/news/'):
+            with self.subTest(url=url):
+                etag = self.client.get(url)['ETag']
+                self.assertEqual(self.client.get(url, headers={'If-None-Match': etag}).status_code, 304)
+                self.news.title += '!'
+                self.news.save()
+                response = self.client.get(url, headers={'If-None-Match': etag})
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response['ETag'], etag)
+
+    def test_if_modified_since_returns_304_until_change(self):
+        last_modified = self.client.get(self.url)['Last-Modified']
+        headers = {'If-Modified-Since': last_modified}
+        self.assertEqual(self.client.get(self.url, headers=headers).status_code, 304)
+        self.assertEqual(self.client.get('/api/news/', headers=headers).status_code, 304)
+
+        self.change_later(lambda: News.objects.create(title='Baru', content='isi'))
+        response = self.client.get('/api/news/', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['results']), 2)
+
+    def test_delete_changes_last_modified(self):
+        other = News.objects.create(title='Lama', content='isi')
+        headers = {'If-Modified-Since': self.client.get('/api/news/')['Last-Modified']}
+        self.assertEqual(self.client.get('/api/news/', headers=headers).status_code, 304)
+        self.change_later(other.delete)
+        self.assertEqual(self.client.get('/api/news/', headers=headers).status_code, 200)
+
+
+def walk_pages(client, url, params, key):
+    values, url, params = [], url, dict(params)
+    while url:
+        data = client.get(url, params).json()
+        values += [item[key] for item in data['results']]
+        url, params = data['next'], None
+    return values
+
+
+@override_settings(**TEST_SETTINGS)
+class SearchIndexTests(TestCase):
+    def setUp(self):
+        # Jumlah dokumen (untuk IDF) di-cache; mulai dari cache kosong
+        cache.clear()
+
+    def search(self, query, **params):
+        response = self.client.get('/api/search/', dict(params, q=query))
+        self.assertEqual(response.status_code, 200)
+        return [(item['kind'], item['object_id']) for item in response.json()['results']]
+
+    def create_news(self, title, content='isi berita'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return News.objects.create(title=title, content=content)
+
+    def test_index_update_and_remove(self):
+        news = self.create_news('Pembukaan beasiswa alumni')
+        self.assertEqual(self.search('beasiswa'), [('news', news.pk)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            news.title = 'Pelatihan kewirausahaan'
+            news.save()
+        self.assertEqual(self.search('beasiswa'), [])
+        self.assertEqual(self.search('kewirausahaan'), [('news', news.pk)])
+
+        document = SearchDocument.objects.get(kind='news', object_id=news.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            news.delete()
+        self.assertEqual(self.search('kewirausahaan'), [])
+        self.assertFalse(SearchDocument.objects.filter(pk=document.pk).exists())
+        self.assertFalse(SearchPosting.objects.filter(document_id=document.pk).exists())
+
+    def test_index_waits_for_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            News.objects.create(title='Donor darah', content='isi')
+            self.assertEqual(self.search('donor'), [])
+        for callback in callbacks:
+            callback()
+        self.assertEqual(len(self.search('donor')), 1)
+
+    def test_cursor_pagination_over_results(self):
+        ids = {self.create_news('Reuni angkatan %d' % index, 'reuni ' * (index % 4 + 1)).pk for index in range(25)}
+        self.create_news('Berita lain')
+        found = walk_pages(self.client, '/api/search/', {'q': 'reuni', 'page_size': 10}, 'object_id')
+        self.assertEqual(len(found), 25)
+        self.assertEqual(set(found), ids)
+
+
+@override_settings(**TEST_SETTINGS)
+class DirectoryIndexTests(TestCase):
+    def setUp(self):
+        self.viewer = User.objects.create_user('pembaca', password='pw')
+        self.client = APIClient()
+        self.client.force_authenticate(self.viewer)
+
+    def create_alumni(self, username, first_name, job):
+        with self.captureOnCommitCallbacks(execute=True):
+            user = User.objects.create_user(username, password='pw', first_name=first_name)
+            AlumniProfile.objects.create(user=user, graduation_year=2010, education='S1', job=job)
+        return user
+
+    def search(self, query):
+        return [item['user'] for item in self.client.get('/api/directory/', {'q': query}).json()['results']]
+
+    def test_index_update_and_remove(self):
+        user = self.create_alumni('sari', 'Sari', 'Arsitek')
+        self.assertEqual(self.search('arsitek'), [user.pk])
+        self.assertEqual(self.search('sarri'), [user.pk])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            user.profile.job = 'Apoteker'
+            user.profile.save()
+        self.assertEqual(self.search('arsitek'), [])
+        self.assertEqual(self.search('apoteker'), [user.pk])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            user.is_active = False
+            user.save()
+        self.assertEqual(self.search('apoteker'), [])
+        self.assertFalse(DirectoryEntry.objects.filter(pk=user.pk).exists())
+        self.assertFalse(DirectoryToken.objects.filter(entry_id=user.pk).exists())
+
+    def test_cursor_pagination_over_results(self):
+        ids = [self.create_alumni('guru%02d' % index, 'Guru %02d' % index, 'Guru').pk for index in range(25)]
+        self.create_alumni('dokter', 'Dokter', 'Dokter')
+        found = walk_pages(self.client, '/api/directory/', {'q': 'guru', 'page_size': 10}, 'user')
+        self.assertEqual(sorted(found), sorted(ids))
+        listed = walk_pages(self.client, '/api/directory/', {'page_size': 10}, 'user')
+        self.assertEqual(list(DirectoryEntry.objects.order_by('sort_name', 'pk').values_list('pk', flat=True)), listed)
@@ -2,11 +2,11 @@
 from django.urls import path, include
 from rest_framework import routers
 from .views import (
-    AlumniGroupingView, AuditLogViewSet, AuditReportView, BPADashboardView, BPAViewSet, DireksiViewSet, EventSupervisionView, MyEventRegistrationListView, NewsViewSet, EventViewSet, DonationViewSet, FeedbackViewSet,
+    AlumniGroupingView, AuditLogViewSet, AuditReportView, BPADashboardView, BPAViewSet, DireksiViewSet, DirectoryViewSet, EventSupervisionView, MyEventRegistrationListView, NewsViewSet, EventViewSet, DonationViewSet, FeedbackViewSet,
     RegisterView, EventRegistrationView, EventRegistrationListView,
     GalleryViewSet, AlumniProfileViewSet, StatisticsView, UsageViewSet, UserViewSet,
     DiscussionPostViewSet, DiscussionReplyViewSet, GalleryAlbumViewSet, GalleryImageViewSet,
-    AlumniProfileUpdateView, DireksiDashboardView,
+    AlumniProfileUpdateView, DireksiDashboardView, LedgerView, NotificationBroadcastViewSet, NotificationViewSet, SearchView,
     StrategicDecisionViewSet,  # import view baru
 )
 from core import views
@@ -21,9 +21,12 @@ router.register(r'gallery', GalleryViewSet)
 router.register(r'galleryalbums', GalleryAlbumViewSet)
 router.register(r'galleryimages', GalleryImageViewSet)
 router.register(r'alumni', AlumniProfileViewSet)
+router.register(r'directory', DirectoryViewSet)
 router.register(r'users', UserViewSet, basename='users')
 router.register(r'discussions', DiscussionPostViewSet)
 router.register(r'discussion-replies', DiscussionReplyViewSet)
+router.register(r'notifications', NotificationViewSet, basename='notifications')
+router.register(r'notification-broadcasts', NotificationBroadcastViewSet)
 router.register(r'strategic-decisions', StrategicDecisionViewSet, basename='strategic-decisions')
 router.register(r'audit-logs', AuditLogViewSet, basename='audit-logs')
 router.register(r'direksi', DireksiViewSet, basename='direksi')
@@ -41,7 +44,10 @@ urlpatterns = [
     path('api/alumni-group/', AlumniGroupingView.as_view(), name='alumni_group'),
     path('api/request-verified/', views.request_verification, name='request-verification'),
     path('api/bpa-dashboard/', BPADashboardView.as_view(), name='bpa-dashboard'),
+    path('api/ledger/', LedgerView.as_view(), name='ledger'),
     path('api/audit-report/', AuditReportView.as_view(), name='audit-report'),
     path('api/event-supervision/', EventSupervisionView.as_view(), name='event-supervision'),
     path('api/statistics/', StatisticsView.as_view(), name='statistics'),
+    path('api/search/', SearchView.as_view(), name='search'),
+    path('api/stream/', views.event_stream, name='event-stream'),
 ]
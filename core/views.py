@@ -1,38 +1,92 @@
 # Create your views here.
 # core/views.py
+import asyncio
+import json
+from datetime import datetime, time, timedelta
+from itertools import chain, groupby
+
+from asgiref.sync import sync_to_async
+from django import forms
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.http import Http404, HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
 from django.utils import timezone
-from rest_framework import viewsets, permissions, status, generics
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.text import Truncator
+from rest_framework import mixins, viewsets, permissions, status, generics
+from rest_framework.exceptions import AuthenticationFailed, ValidationError
+from rest_framework.parsers import MultiPartParser
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.decorators import action, api_view, permission_classes
-from django.db.models import Count, Sum
+from django.db.models import Count
 from rest_framework.permissions import IsAuthenticated, BasePermission
-
-
+from rest_framework.utils.encoders import JSONEncoder
+
+
+from core import directory
+from core.audit import log_action
+from core.authentication import CachedJWTAuthentication
+from core.cache import bump_model_version
+from core.exports import EXPORT_FORMATS, export_response, iter_objects
+from core.imaging import schedule_rendition
+from core.mixins import CachedReadMixin, ConditionalGetMixin, EagerLoadingMixin, get_eager_load_plan, requested_fields
+from core.notifications import audience_from_request, schedule_fan_out, send_broadcast
+from core.pagination import KeysetPagination
 from core.permissions import IsDireksi, IsDireksiOrReadOnly
-from .models import BPA, AlumniProfile, AuditLog, Direksi, DiscussionPost, DiscussionReply, EventRegistration, Gallery, GalleryAlbum, GalleryImage, News, Event, Donation, Feedback, StrategicDecision, Usage, User
-from .serializers import AlumniProfileSerializer, AlumniProfileUpdateSerializer, AuditLogSerializer, BPASerializer, DireksiSerializer, DiscussionPostSerializer, DiscussionReplySerializer, EventRegistrationSerializer, GalleryAlbumSerializer, GalleryImageSerializer, GallerySerializer, NewsSerializer, EventSerializer, DonationSerializer, FeedbackSerializer, NotificationSerializer, StrategicDecisionSerializer, UsageSerializer, UserSerializer, UserWithProfileSerializer
+from core.pubsub import DISCUSSIONS_CHANNEL, broker, publish_on_commit, user_channel
+from core.search import SEARCH_SOURCES, search
+from core.storage import media_response
+from core.streaming import is_asgi_request, streaming_content
+from .models import BPA, AlumniProfile, AuditLog, DashboardSummary, Direksi, DirectoryEntry, DiscussionPost, DiscussionReply, EventRegistration, EventWaitlist, Gallery, GalleryAlbum, GalleryImage, LedgerDay, News, Event, Notification, NotificationBroadcast, NotificationCounter, Donation, Feedback, StrategicDecision, Usage, User
+from .serializers import AlumniProfileSerializer, AlumniProfileUpdateSerializer, AuditLogSerializer, BPASerializer, DireksiSerializer, DirectoryEntrySerializer, DiscussionPostSerializer, DiscussionReplySerializer, EventRegistrationSerializer, GalleryAlbumSerializer, GalleryImageSerializer, GallerySerializer, NewsSerializer, EventSerializer, DonationSerializer, FeedbackSerializer, NotificationBroadcastSerializer, NotificationSerializer, SearchResultSerializer, StrategicDecisionSerializer, UsageSerializer, UserSerializer, UserWithProfileSerializer
+from rest_framework_simplejwt.exceptions import InvalidToken
 from rest_framework_simplejwt.views import TokenObtainPairView
 from .serializers import MyTokenObtainPairSerializer
 
 # Endpoint untuk Berita (publik)
-class NewsViewSet(viewsets.ModelViewSet):
+class NewsViewSet(ConditionalGetMixin, CachedReadMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = News.objects.all().order_by('-published_date')
     serializer_class = NewsSerializer
     permission_classes = [IsDireksiOrReadOnly]
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user)
+        audience = audience_from_request(self.request)
+        news = serializer.save(author=self.request.user)
+        if audience is not None:
+            send_broadcast(
+                f"Berita baru: {news.title}",
+                news.excerpt or Truncator(news.content).chars(200),
+                link=self.request.build_absolute_uri(reverse('news-detail', args=[news.pk])),
+                audience=audience,
+                created_by=self.request.user,
+            )
 
 # Endpoint untuk Event
-class EventViewSet(viewsets.ModelViewSet):
+class EventViewSet(ConditionalGetMixin, CachedReadMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = Event.objects.all().order_by('start_date')
     serializer_class = EventSerializer
     permission_classes = [IsDireksiOrReadOnly]
-    # Untuk admin, kamu bisa override metode seperti perform_create()
+
+    def perform_create(self, serializer):
+        audience = audience_from_request(self.request)
+        event = serializer.save()
+        if audience is not None:
+            send_broadcast(
+                f"Event baru: {event.title}",
+                Truncator(event.description).chars(200),
+                link=self.request.build_absolute_uri(reverse('event-detail', args=[event.pk])),
+                audience=audience,
+                created_by=self.request.user,
+            )
 
 # Endpoint untuk Donasi (hanya alumni yang telah login)
-class DonationViewSet(viewsets.ModelViewSet):
+class DonationViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = Donation.objects.all().order_by('-created_at')
     serializer_class = DonationSerializer
     permission_classes = [permissions.AllowAny]  # Siapa saja dapat melihat dan mengirim donasi
@@ -45,7 +99,7 @@ class DonationViewSet(viewsets.ModelViewSet):
             serializer.save()
 
 # Endpoint untuk Feedback/Kesan & Pesan
-class FeedbackViewSet(viewsets.ModelViewSet):
+class FeedbackViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = Feedback.objects.all().order_by('-created_at')
     serializer_class = FeedbackSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
@@ -53,21 +107,61 @@ class FeedbackViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+    # Batas jumlah id per permintaan like-status
+    like_status_max_ids = 100
+
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
     def like(self, request, pk=None):
-        feedback = self.get_object()
-        user = request.user
-        if user in feedback.likes.all():
-            feedback.likes.remove(user)
-            liked = False
-        else:
-            feedback.likes.add(user)
-            liked = True
+        Like = Feedback.likes.through
+        with transaction.atomic():
+            # Kunci baris feedback agar klik ganda yang bersamaan diproses berurutan
+            feedback = get_object_or_404(Feedback.objects.select_for_update().only('id', 'likes_count'), pk=pk)
+            # DELETE sekaligus menjadi pengecekan keanggotaan lewat index unik (feedback, user)
+            deleted, _ = Like.objects.filter(feedback_id=feedback.pk, user_id=request.user.pk).delete()
+            if deleted:
+                liked, delta = False, -1
+            else:
+                liked, delta = True, 1
+                try:
+                    with transaction.atomic():
+                        Like.objects.create(feedback_id=feedback.pk, user_id=request.user.pk)
+                except IntegrityError:
+                    # Like sudah tercatat oleh request lain, counter tidak diubah
+                    delta = 0
+            if delta:
+                Feedback.objects.filter(pk=feedback.pk).update(likes_count=F('likes_count') + delta)
         return Response({
             'liked': liked,
-            'likes_count': feedback.likes.count()
+            'likes_count': feedback.likes_count + delta
         })
 
+    @action(detail=False, methods=['get'], url_path='like-status')
+    def like_status(self, request):
+        """
+        Status like untuk banyak feedback sekaligus, contoh: ?ids=1,2,3
+        """
+        try:
+            ids = [int(value) for value in request.query_params.get('ids', '').split(',') if value.strip()]
+        except ValueError:
+            return Response({'detail': 'Parameter ids harus berupa daftar angka.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) > self.like_status_max_ids:
+            return Response(
+                {'detail': f'Maksimal {self.like_status_max_ids} id per permintaan.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        counts = dict(Feedback.objects.filter(pk__in=ids).values_list('id', 'likes_count'))
+        liked_ids = set()
+        if request.user.is_authenticated and counts:
+            liked_ids = set(
+                Feedback.likes.through.objects.filter(user_id=request.user.pk, feedback_id__in=counts)
+                .values_list('feedback_id', flat=True)
+            )
+        data = [
+            {'id': feedback_id, 'liked': feedback_id in liked_ids, 'likes_count': counts[feedback_id]}
+            for feedback_id in ids if feedback_id in counts
+        ]
+        return Response(data)
+
 # Endpoint Registrasi Alumni
 # core/views.py
 
@@ -115,20 +209,51 @@ class EventRegistrationView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Untuk mencegah pendaftaran ganda, periksa apakah user sudah mendaftar event tersebut
-        if EventRegistration.objects.filter(event_id=event_id, user=request.user).exists():
-            return Response(
-                {"detail": "Anda sudah mendaftar untuk event ini."},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
         serializer = EventRegistrationSerializer(data=request.data)
-        if serializer.is_valid():
-            # Set user yang mendaftar secara otomatis
-            serializer.save(user=request.user)
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-    
+        serializer.is_valid(raise_exception=True)
+        event = serializer.validated_data['event']
+
+        # Kursi diklaim dengan UPDATE bersyarat; pendaftaran ganda ditolak oleh
+        # constraint unik (event, user), bukan oleh pengecekan sebelumnya
+        try:
+            registration = EventRegistration.register(event.pk, request.user)
+        except IntegrityError:
+            return Response({"detail": "Anda sudah mendaftar untuk event ini."}, status=status.HTTP_400_BAD_REQUEST)
+        if registration is not None:
+            return Response(EventRegistrationSerializer(registration).data, status=status.HTTP_201_CREATED)
+
+        # Kuota penuh: masuk antrean tunggu
+        if EventRegistration.objects.filter(event_id=event.pk, user=request.user).exists():
+            return Response({"detail": "Anda sudah mendaftar untuk event ini."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            with transaction.atomic():
+                entry = EventWaitlist.objects.create(event_id=event.pk, user=request.user)
+        except IntegrityError:
+            return Response({"detail": "Anda sudah berada di antrean tunggu event ini."}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            {"detail": "Kuota event penuh, Anda masuk antrean tunggu.", "status": "waitlisted", "position": entry.position},
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+    def delete(self, request):
+        """
+        Membatalkan pendaftaran (atau keluar dari antrean tunggu) untuk event
+        ?event=<id>. Kursi yang kosong langsung diberikan ke antrean terdepan.
+        """
+        event_id = request.query_params.get("event") or request.data.get("event")
+        if not event_id:
+            return Response({"detail": "Event ID diperlukan."}, status=status.HTTP_400_BAD_REQUEST)
+        with transaction.atomic():
+            # post_delete EventRegistration mengembalikan kursinya
+            deleted, _ = EventRegistration.objects.filter(event_id=event_id, user=request.user).delete()
+            if deleted:
+                EventWaitlist.promote(event_id)
+            else:
+                deleted, _ = EventWaitlist.objects.filter(event_id=event_id, user=request.user).delete()
+        if not deleted:
+            return Response({"detail": "Anda tidak terdaftar di event ini."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
     def get_queryset(self):
         queryset = EventRegistration.objects.all().order_by('-registration_date')
         event_id = self.request.query_params.get("event", None)
@@ -137,34 +262,132 @@ class EventRegistrationView(APIView):
         return queryset
 
     
-class EventRegistrationListView(generics.ListAPIView):
+class EventRegistrationListView(EagerLoadingMixin, generics.ListAPIView):
     """
     API endpoint untuk direksi melihat daftar pendaftaran event.
     Hanya user dengan peran 'direksi' yang diizinkan.
+    Filter event=<id>. Parameter export=csv|excel|json|ndjson mengalirkan daftar
+    peserta sebagai file (satu query join, tanpa serializer bersarang);
+    columns=username,email,... memilih kolomnya.
     """
     serializer_class = EventRegistrationSerializer
     permission_classes = [permissions.IsAuthenticated, IsDireksi]
+    # (nama kolom export, lookup ORM)
+    export_fields = [
+        ('id', 'id'),
+        ('event_id', 'event_id'),
+        ('event_title', 'event__title'),
+        ('registration_date', 'registration_date'),
+        ('user_id', 'user_id'),
+        ('username', 'user__username'),
+        ('first_name', 'user__first_name'),
+        ('last_name', 'user__last_name'),
+        ('email', 'user__email'),
+        ('phone', 'user__phone'),
+        ('graduation_year', 'user__profile__graduation_year'),
+        ('education', 'user__profile__education'),
+        ('job', 'user__profile__job'),
+    ]
+    export_chunk_size = 2000
 
     def get_queryset(self):
         # Mengembalikan semua pendaftaran event, bisa diurutkan berdasarkan tanggal pendaftaran terbaru.
-        return EventRegistration.objects.all().order_by('-registration_date')
+        queryset = EventRegistration.objects.all().order_by('-registration_date')
+        event_id = self.request.query_params.get('event')
+        if event_id:
+            try:
+                queryset = queryset.filter(event_id=int(event_id))
+            except ValueError:
+                raise ValidationError({'event': ['Parameter event harus berupa id.']})
+        return queryset
 
-class GalleryViewSet(viewsets.ModelViewSet):
+    def list(self, request, *args, **kwargs):
+        export_format = request.query_params.get('export')
+        if not export_format:
+            return super().list(request, *args, **kwargs)
+        if export_format not in EXPORT_FORMATS:
+            return Response({'detail': 'Parameter export tidak valid.'}, status=status.HTTP_400_BAD_REQUEST)
+        fields = self.export_fields
+        if request.query_params.get('columns'):
+            available = dict(self.export_fields)
+            names = [name for name in request.query_params['columns'].split(',') if name]
+            unknown = [name for name in names if name not in available]
+            if unknown:
+                raise ValidationError({'columns': ['Kolom tidak dikenal: %s.' % ', '.join(unknown)]})
+            fields = [(name, available[name]) for name in names]
+        # Urutan daftar hadir: per event, lalu waktu pendaftaran
+        registrations = self.get_queryset().order_by('event_id', 'registration_date', 'id')
+        event_id = request.query_params.get('event')
+        filename = 'peserta-event-%s' % event_id if event_id else 'peserta-event'
+        return export_response(registrations, fields, export_format, filename,
+                               chunk_size=self.export_chunk_size, request=request)
+
+class GalleryViewSet(ConditionalGetMixin, CachedReadMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = Gallery.objects.all().order_by('-uploaded_date')
     serializer_class = GallerySerializer
     # Hanya direksi yang bisa membuat, mengubah, atau menghapus gambar di gallery.
     permission_classes = [IsDireksiOrReadOnly]
 
 
-class AlumniProfileViewSet(viewsets.ModelViewSet):
+class AlumniProfileViewSet(ConditionalGetMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = AlumniProfile.objects.all().order_by('user__username')
     serializer_class = AlumniProfileSerializer
     permission_classes = [permissions.IsAuthenticated]  # Atur sesuai kebutuhan; hanya direksi yang boleh mengakses
 
+class DirectoryViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Direktori alumni dari indeks DirectoryEntry.
+    Filter: q (pencarian nama/username/pekerjaan/pendidikan, toleran salah
+    ketik), angkatan (mis. angkatan=2010,2011) dan education, bisa digabung.
+    /autocomplete/?q= untuk saran saat mengetik, /facets/ untuk jumlah per
+    angkatan dan pendidikan sesuai filter lainnya.
+    """
+    queryset = DirectoryEntry.objects.all().order_by('sort_name', 'pk')
+    serializer_class = DirectoryEntrySerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def filter_facets(self, queryset, skip=None):
+        params = self.request.query_params
+        if skip != 'angkatan' and params.get('angkatan'):
+            try:
+                years = [int(year) for year in params['angkatan'].split(',') if year]
+            except ValueError:
+                raise ValidationError({'angkatan': ['Angkatan harus berupa tahun, dipisahkan koma.']})
+            queryset = queryset.filter(graduation_year__in=years)
+        if skip != 'education' and params.get('education'):
+            queryset = queryset.filter(education__in=[value for value in params['education'].split(',') if value])
+        return queryset
+
+    def get_queryset(self):
+        queryset = self.filter_facets(super().get_queryset())
+        if self.action == 'list' and self.request.query_params.get('q', '').strip():
+            queryset = directory.search(self.request.query_params['q'], queryset)
+        return queryset
+
+    @action(detail=False, methods=['get'], pagination_class=None)
+    def autocomplete(self, request):
+        entries = directory.autocomplete(request.query_params.get('q', ''), self.get_queryset())
+        return Response(self.get_serializer(entries, many=True).data)
+
+    @action(detail=False, methods=['get'], pagination_class=None)
+    def facets(self, request):
+        def counts(field, skip):
+            queryset = self.filter_facets(DirectoryEntry.objects.all(), skip=skip)
+            query = request.query_params.get('q', '').strip()
+            if query:
+                queryset = queryset.filter(pk__in=directory.search(query).values('pk'))
+            rows = queryset.values(field).annotate(count=Count('pk')).order_by(field)
+            return [{'value': row[field], 'count': row['count']} for row in rows if row[field] not in (None, '')]
+
+        return Response({
+            'angkatan': counts('graduation_year', 'angkatan'),
+            'education': counts('education', 'education'),
+        })
+
 # ---------------------------
 # UserViewSet dengan fitur reset password
 # ---------------------------
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = User.objects.all().order_by('username')
     serializer_class = UserWithProfileSerializer
     permission_classes = [permissions.IsAuthenticated]  # Sesuaikan permission sesuai kebutuhan
@@ -216,53 +439,288 @@ class UserViewSet(viewsets.ModelViewSet):
 # View untuk Pengelompokan Alumni
 # ---------------------------
 class AlumniGroupingView(APIView):
+    """
+    Pengelompokan alumni dari satu query terurut yang dikelompokkan sambil
+    di-iterasi dan dialirkan (streaming) ke client, sehingga memori tetap datar.
+    Parameter: group_by (graduation_year, graduation_decade, education, job) dan
+    summary=1 untuk hanya mengembalikan total per grup.
+    """
     permission_classes = [permissions.IsAuthenticated]  # Hanya admin yang dapat mengakses
 
+    # group_by -> (kolom urutan, fungsi kunci grup)
+    group_keys = {
+        'graduation_year': ('graduation_year', lambda value: value),
+        'graduation_decade': ('graduation_year', lambda value: value // 10 * 10),
+        'education': ('education', lambda value: value),
+        'job': ('job', lambda value: value),
+    }
+    chunk_size = 500
+    # Ukuran minimal potongan JSON yang dikirim per yield
+    stream_buffer_size = 64 * 1024
+
     def get(self, request):
         group_by = request.query_params.get("group_by", "graduation_year")
-        if group_by == "graduation_year":
-            groups = AlumniProfile.objects.values("graduation_year").annotate(total=Count("id")).order_by("graduation_year")
-            data = []
-            for group in groups:
-                alumni = AlumniProfile.objects.filter(graduation_year=group["graduation_year"])
-                serializer = AlumniProfileSerializer(alumni, many=True, context={"request": request})
-                data.append({
-                    "graduation_year": group["graduation_year"],
-                    "total": group["total"],
-                    "alumni": serializer.data
-                })
-            return Response(data, status=status.HTTP_200_OK)
-        elif group_by == "education":
-            groups = AlumniProfile.objects.values("education").annotate(total=Count("id")).order_by("education")
-            data = []
-            for group in groups:
-                alumni = AlumniProfile.objects.filter(education=group["education"])
-                serializer = AlumniProfileSerializer(alumni, many=True, context={"request": request})
-                data.append({
-                    "education": group["education"],
-                    "total": group["total"],
-                    "alumni": serializer.data
-                })
-            return Response(data, status=status.HTTP_200_OK)
-        else:
+        if group_by not in self.group_keys:
             return Response({'detail': 'Parameter group_by tidak valid.'}, status=status.HTTP_400_BAD_REQUEST)
-
-class DiscussionPostViewSet(viewsets.ModelViewSet):
+        if request.query_params.get("summary") in ('1', 'true'):
+            return Response(self.get_summary(group_by), status=status.HTTP_200_OK)
+        response = StreamingHttpResponse(
+            streaming_content(request, self.stream_groups(request, group_by)), content_type='application/json'
+        )
+        response['Cache-Control'] = 'no-cache'
+        return response
+
+    def get_summary(self, group_by):
+        field, key = self.group_keys[group_by]
+        rows = AlumniProfile.objects.values(field).annotate(total=Count("id")).order_by(field)
+        data = []
+        for value, group in groupby(rows, key=lambda row: key(row[field])):
+            data.append({group_by: value, "total": sum(row["total"] for row in group)})
+        return data
+
+    def stream_groups(self, request, group_by):
+        field, key = self.group_keys[group_by]
+        serializer = AlumniProfileSerializer(context={"request": request})
+        queryset = get_eager_load_plan(serializer, AlumniProfile).apply(AlumniProfile.objects.all())
+        # Potongan keyset (iter_objects), bukan iterator(): driver MySQL memuat
+        # seluruh hasil iterator() ke memori. Baris dengan kolom grup NULL
+        # (job) dibaca lebih dulu, sama seperti urutan NULL di MySQL.
+        parts = [queryset.filter(**{field + '__isnull': False}).order_by(field, 'user__username', 'id')]
+        if AlumniProfile._meta.get_field(field).null:
+            parts.insert(0, queryset.filter(**{field + '__isnull': True}).order_by('user__username', 'id'))
+        profiles = chain.from_iterable(iter_objects(part, chunk_size=self.chunk_size) for part in parts)
+
+        def dumps(value):
+            return json.dumps(value, cls=JSONEncoder, ensure_ascii=False)
+
+        buffer, size = ['['], 1
+        for index, (value, members) in enumerate(groupby(profiles, key=lambda profile: key(getattr(profile, field)))):
+            buffer.append('%s{%s:%s,"alumni":[' % (',' if index else '', dumps(group_by), dumps(value)))
+            total = 0
+            for profile in members:
+                chunk = (',' if total else '') + dumps(serializer.to_representation(profile))
+                buffer.append(chunk)
+                size += len(chunk)
+                total += 1
+                if size >= self.stream_buffer_size:
+                    yield ''.join(buffer)
+                    buffer, size = [], 0
+            buffer.append('],"total":%d}' % total)
+        buffer.append(']')
+        yield ''.join(buffer)
+
+class DiscussionPostViewSet(ConditionalGetMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = DiscussionPost.objects.all().order_by('-created_at')
     serializer_class = DiscussionPostSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    # reply_count/latest_replies dibaca lewat SerializerMethodField
+    cache_dependencies = (DiscussionReply,)
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+        # Dikirim ke client /api/stream/ setelah commit
+        publish_on_commit(DISCUSSIONS_CHANNEL, 'discussion_post', lambda: serializer.data)
+
+    @action(detail=True, methods=['get'], serializer_class=DiscussionReplySerializer)
+    def replies(self, request, pk=None):
+        """
+        Semua balasan sebuah post, dipaginasi dengan keyset (urut dari yang terlama).
+        """
+        post = get_object_or_404(DiscussionPost.objects.only('id'), pk=pk)
+        queryset = self.filter_queryset(post.replies.order_by('created_at'))
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            serializer = self.get_serializer(queryset, many=True)
+            return Response(serializer.data)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
 
-class DiscussionReplyViewSet(viewsets.ModelViewSet):
+class DiscussionReplyViewSet(ConditionalGetMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = DiscussionReply.objects.all().order_by('created_at')
     serializer_class = DiscussionReplySerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+        publish_on_commit(DISCUSSIONS_CHANNEL, 'discussion_reply', lambda: serializer.data)
+
+
+async def event_stream(request):
+    """
+    Server-Sent Events untuk notifikasi milik user dan aktivitas diskusi baru,
+    pengganti polling /api/notifications/ dan /api/discussions/.
+    EventSource tidak bisa mengirim header, sehingga access token JWT boleh
+    diberikan lewat ?token=. Parameter channels=notifications,discussions
+    membatasi jenis event. Hanya berjalan di server ASGI.
+    """
+    if not is_asgi_request(request):
+        return JsonResponse({'detail': 'Stream hanya tersedia melalui server ASGI.'}, status=501)
+    user = await authenticate_stream_user(request)
+    if user is None:
+        return JsonResponse({'detail': 'Token tidak valid atau tidak diberikan.'}, status=401)
+
+    requested = set(filter(None, request.GET.get('channels', 'notifications,discussions').split(',')))
+    channels = []
+    if 'notifications' in requested:
+        channels.append(user_channel(user.pk))
+    if 'discussions' in requested:
+        channels.append(DISCUSSIONS_CHANNEL)
+    if not channels:
+        return JsonResponse({'detail': 'Parameter channels tidak valid.'}, status=400)
+
+    response = StreamingHttpResponse(stream_events(channels), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Nginx tidak boleh menahan (buffer) stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def authenticate_token_user(request):
+    """
+    User dari access token JWT di header Authorization atau ?token= (untuk
+    EventSource dan tautan file yang tidak bisa mengirim header). None jika
+    token tidak ada atau tidak valid.
+    """
+    authentication = CachedJWTAuthentication()
+    raw_token = request.GET.get('token')
+    if not raw_token:
+        header = authentication.get_header(request)
+        raw_token = authentication.get_raw_token(header) if header else None
+    if not raw_token:
+        return None
+    try:
+        return authentication.get_user(authentication.get_validated_token(raw_token))
+    except (InvalidToken, AuthenticationFailed):
+        return None
+
+
+async def authenticate_stream_user(request):
+    return await sync_to_async(authenticate_token_user)(request)
+
+
+async def stream_events(channels):
+    subscription = broker.subscribe(channels, maxsize=settings.EVENT_STREAM_QUEUE_SIZE)
+    try:
+        yield 'retry: %d\n\n' % settings.EVENT_STREAM_RETRY_MS
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), timeout=settings.EVENT_STREAM_HEARTBEAT)
+            except asyncio.TimeoutError:
+                # Komentar SSE sebagai heartbeat agar proxy tidak memutus koneksi idle
+                yield ': ping\n\n'
+                continue
+            if subscription.overflowed:
+                # Ada event yang terbuang: client sebaiknya memuat ulang data dari API
+                subscription.overflowed = False
+                yield 'event: resync\ndata: {}\n\n'
+            yield 'event: %s\ndata: %s\n\n' % (event['event'], json.dumps(event['data'], cls=JSONEncoder))
+    finally:
+        broker.unsubscribe(subscription)
+
+
+def can_view_donation_proof(user, name):
+    return user.role in ('direksi', 'bpa', 'admin') or Donation.objects.filter(proof=name, donor=user).exists()
+
+
+# Folder media yang tidak publik beserta pemeriksaan aksesnya
+PROTECTED_MEDIA = {
+    'donation_proofs': can_view_donation_proof,
+}
+
+
+def serve_media(request, path):
+    """
+    Menyajikan file di MEDIA_ROOT. Folder di PROTECTED_MEDIA membutuhkan access
+    token (header Authorization atau ?token=) dan tidak di-cache bersama.
+    Pengiriman file diserahkan ke core.storage.media_response.
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return HttpResponseNotAllowed(['GET', 'HEAD'])
+    # Hanya path kanonik: "./", "../" atau "//" bisa membuat folder pertama
+    # berbeda dari folder file yang benar-benar dibaca storage
+    segments = path.split('/')
+    if '\\' in path or any(segment in ('', '.', '..') for segment in segments):
+        raise Http404('File tidak ditemukan.')
+    folder = segments[0]
+    check = PROTECTED_MEDIA.get(folder)
+    if check is None:
+        return media_response(request, path)
+    user = authenticate_token_user(request)
+    if user is None:
+        return JsonResponse({'detail': 'Token tidak valid atau tidak diberikan.'}, status=401)
+    if not check(user, path):
+        return JsonResponse({'detail': 'Anda tidak memiliki akses ke file ini.'}, status=403)
+    return media_response(request, path, cache_control={'private': True, 'no_cache': True})
+
+
+class NotificationBroadcastViewSet(EagerLoadingMixin, mixins.CreateModelMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Daftar broadcast notifikasi beserta progres dan throughput pengirimannya.
+    Direksi dapat membuat broadcast baru dengan filter audience.
+    """
+    queryset = NotificationBroadcast.objects.all().order_by('-created_at')
+    serializer_class = NotificationBroadcastSerializer
+
+    def get_permissions(self):
+        if self.request.method == 'GET':
+            return [IsAuthenticated(), IsDireksiOrBPA()]
+        return [IsAuthenticated(), IsDireksi()]
+
+    def perform_create(self, serializer):
+        broadcast = serializer.save(created_by=self.request.user)
+        schedule_fan_out(broadcast.pk)
+
+
+class NotificationViewSet(EagerLoadingMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Kotak masuk notifikasi milik user yang login, terbaru di atas.
+    Parameter ?unread=1 untuk hanya menampilkan yang belum dibaca.
+    """
+    serializer_class = NotificationSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    # Batas jumlah id per permintaan mark-read
+    mark_read_max_ids = 100
+
+    def get_queryset(self):
+        queryset = Notification.objects.filter(user=self.request.user).order_by('-created_at', '-id')
+        if self.request.query_params.get('unread') in ('1', 'true'):
+            queryset = queryset.filter(is_read=False)
+        return queryset
+
+    @action(detail=False, methods=['get'], url_path='unread-count')
+    def unread_count(self, request):
+        return Response({'unread': NotificationCounter.unread_for(request.user.pk)})
+
+    @action(detail=False, methods=['post'], url_path='mark-read')
+    def mark_read(self, request):
+        """
+        Menandai notifikasi tertentu sudah dibaca, body: {"ids": [1, 2, 3]}.
+        """
+        ids = request.data.get('ids')
+        if not isinstance(ids, list) or not all(isinstance(value, int) for value in ids):
+            return Response({'detail': 'Parameter ids harus berupa daftar angka.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) > self.mark_read_max_ids:
+            return Response(
+                {'detail': f'Maksimal {self.mark_read_max_ids} id per permintaan.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        with transaction.atomic():
+            updated = Notification.objects.filter(pk__in=ids, user=request.user, is_read=False).update(is_read=True)
+            NotificationCounter.bump({request.user.pk: -updated})
+        return Response({'updated': updated, 'unread': NotificationCounter.unread_for(request.user.pk)})
+
+    @action(detail=False, methods=['post'], url_path='mark-all-read')
+    def mark_all_read(self, request):
+        with transaction.atomic():
+            # Kunci baris counter dulu agar notifikasi baru tidak hilang dari hitungan
+            locked = NotificationCounter.objects.select_for_update().filter(pk=request.user.pk).exists()
+            updated = Notification.objects.filter(user=request.user, is_read=False).update(is_read=True)
+            if locked:
+                NotificationCounter.objects.filter(pk=request.user.pk).update(unread=0)
+            else:
+                NotificationCounter.recount([request.user.pk])
+        return Response({'updated': updated, 'unread': 0})
 
 class AlumniProfileUpdateView(generics.RetrieveUpdateAPIView):
     """
@@ -285,17 +743,76 @@ class AlumniProfileUpdateView(generics.RetrieveUpdateAPIView):
         return profile
     
 
-class UsageViewSet(viewsets.ModelViewSet):
+class UsageViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = Usage.objects.all().order_by('-date')
     serializer_class = UsageSerializer
     permission_classes = [permissions.IsAuthenticated]
 
-class GalleryAlbumViewSet(viewsets.ModelViewSet):
+class GalleryAlbumViewSet(ConditionalGetMixin, CachedReadMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = GalleryAlbum.objects.all().order_by('-uploaded_date')
     serializer_class = GalleryAlbumSerializer
     permission_classes = [IsDireksiOrReadOnly]  # Sesuaikan permission sesuai kebutuhan
 
-class GalleryImageViewSet(viewsets.ModelViewSet):
+    @action(detail=True, methods=['post'], parser_classes=[MultiPartParser], serializer_class=GalleryImageSerializer)
+    def upload(self, request, pk=None):
+        """
+        Upload banyak foto sekaligus ke album: multipart dengan field `images`
+        (berulang) dan opsional `captions` dengan urutan yang sama.
+        """
+        # Semua file langsung ditulis ke file sementara di disk, bukan ke memori.
+        # Harus diatur sebelum request.data dibaca.
+        request._request.upload_handlers = [TemporaryFileUploadHandler(request._request)]
+        album = get_object_or_404(GalleryAlbum.objects.only('id'), pk=pk)
+        files = request.FILES.getlist('images')
+        captions = request.data.getlist('captions')
+        if not files:
+            return Response({'images': ['Tidak ada file yang diunggah.']}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Validasi Pillow yang sama dengan ImageField model, sebelum ada file yang disimpan
+        image_field = forms.ImageField()
+        errors = {}
+        for index, upload in enumerate(files):
+            try:
+                image_field.clean(upload)
+            except DjangoValidationError as exc:
+                errors[upload.name or str(index)] = exc.messages
+        if errors:
+            return Response({'images': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        # File dipindahkan ke storage lebih dulu (rename file sementara, tanpa salin),
+        # lalu semua baris dimasukkan dengan satu bulk_create. Jika insert gagal,
+        # file yang sudah tersimpan tidak dihapus di sini (ContentAddressedStorage
+        # tidak menghapus file); file yatim dibersihkan oleh prune_media.
+        model_field = GalleryImage._meta.get_field('image')
+        names = [
+            model_field.storage.save(model_field.generate_filename(None, upload.name), upload)
+            for upload in files
+        ]
+        with transaction.atomic():
+            # Upload ke album yang sama diproses berurutan agar daftar baris lama
+            # di bawah tetap benar sampai baris baru dibaca ulang
+            GalleryAlbum.objects.select_for_update().only('id').get(pk=album.pk)
+            # File dengan isi yang sama mendapat nama yang sama (content-addressed),
+            # jadi baris lama di album ini bisa memakai nama yang sama
+            existing = list(GalleryImage.objects.filter(album=album, image__in=names).values_list('pk', flat=True))
+            GalleryImage.objects.bulk_create([
+                GalleryImage(album=album, image=name, caption=captions[index] if index < len(captions) else None)
+                for index, name in enumerate(names)
+            ], batch_size=100)
+            # bulk_create tidak mengembalikan id di MySQL, jadi dibaca ulang lewat nama file
+            images = list(
+                GalleryImage.objects.filter(album=album, image__in=names).exclude(pk__in=existing).order_by('id')
+            )
+            for image in images:
+                schedule_rendition(GalleryImage, image.pk, 'image', image.image.name)
+        # bulk_create tidak memicu signal: versi cache dinaikkan manual
+        bump_model_version(GalleryImage)
+
+        serializer = self.get_serializer(images, many=True)
+        return Response({'album': album.pk, 'created': len(images), 'images': serializer.data},
+                        status=status.HTTP_201_CREATED)
+
+class GalleryImageViewSet(ConditionalGetMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = GalleryImage.objects.all().order_by('-uploaded_date')
     serializer_class = GalleryImageSerializer
     permission_classes = [IsDireksiOrReadOnly]
@@ -309,11 +826,31 @@ def request_verification(request):
         return Response({"detail": "Akun sudah terverifikasi."}, status=status.HTTP_400_BAD_REQUEST)
     # Tandai bahwa user telah mengajukan verifikasi
     user.verification_requested = True
-    user.save()
+    # Hanya kolom ini: user dari cache autentikasi membawa role/verified yang bisa sudah basi
+    user.save(update_fields=['verification_requested'])
     return Response({"detail": "Permintaan verifikasi telah dikirim."}, status=status.HTTP_200_OK)
 
 
-class MyEventRegistrationListView(generics.ListAPIView):
+class SearchView(generics.ListAPIView):
+    """
+    Pencarian teks penuh atas berita, event, diskusi dan balasan diskusi.
+    Parameter: q (wajib) dan type (opsional, mis. type=news,event).
+    Hasil diurutkan menurut relevansi dan dipaginasi dengan kursor.
+    """
+    serializer_class = SearchResultSerializer
+    permission_classes = [permissions.AllowAny]
+
+    def get_queryset(self):
+        query = self.request.query_params.get('q', '').strip()
+        if not query:
+            raise ValidationError({'q': ['Parameter q wajib diisi.']})
+        kinds = [kind for kind in self.request.query_params.get('type', '').split(',') if kind]
+        unknown = set(kinds) - set(SEARCH_SOURCES)
+        if unknown:
+            raise ValidationError({'type': ['Type harus salah satu dari: %s.' % ', '.join(SEARCH_SOURCES)]})
+        return search(query, kinds)
+
+class MyEventRegistrationListView(EagerLoadingMixin, generics.ListAPIView):
     serializer_class = EventRegistrationSerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -341,9 +878,9 @@ class IsDireksiOrBPA(BasePermission):
     def has_permission(self, request, view):
         return request.user.is_authenticated and request.user.role in ['direksi', 'bpa']
 
-from .models import StrategicDecision, AuditLog  # Pastikan AuditLog diimport
+from .models import StrategicDecision
 
-class StrategicDecisionViewSet(viewsets.ModelViewSet):
+class StrategicDecisionViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = StrategicDecision.objects.all()
     serializer_class = StrategicDecisionSerializer
 
@@ -371,10 +908,11 @@ class StrategicDecisionViewSet(viewsets.ModelViewSet):
         decision.save()
 
         # Tambahkan pembuatan log audit
-        AuditLog.objects.create(
-            user=request.user,
-            action="Approve Strategic Decision",
-            details=f"Keputusan '{decision.title}' disetujui. Alasan: {decision.approval_reason}"
+        log_action(
+            request.user,
+            "Approve Strategic Decision",
+            f"Keputusan '{decision.title}' disetujui. Alasan: {decision.approval_reason}",
+            request=request
         )
         return Response({'detail': 'Keputusan disetujui.'})
 
@@ -390,10 +928,11 @@ class StrategicDecisionViewSet(viewsets.ModelViewSet):
         decision.save()
 
         # Tambahkan pembuatan log audit
-        AuditLog.objects.create(
-            user=request.user,
-            action="Reject Strategic Decision",
-            details=f"Keputusan '{decision.title}' ditolak. Alasan: {decision.approval_reason}"
+        log_action(
+            request.user,
+            "Reject Strategic Decision",
+            f"Keputusan '{decision.title}' ditolak. Alasan: {decision.approval_reason}",
+            request=request
         )
         return Response({'detail': 'Keputusan ditolak.'})
 
@@ -404,12 +943,14 @@ class DireksiDashboardView(APIView):
     permission_classes = [IsAuthenticated, IsDireksi]
 
     def get(self, request):
-        total_donations = Donation.objects.aggregate(total=Sum('amount'))['total'] or 0
-        donation_count = Donation.objects.count()
-        total_events = Event.objects.count()
+        # Angka ringkasan dibaca dari satu baris counter, bukan agregasi tabel penuh
+        summary = DashboardSummary.current()
+        total_donations = summary.donation_total
+        donation_count = summary.donation_count
+        total_events = summary.event_count
         upcoming_events = Event.objects.filter(start_date__gte=timezone.now()).order_by('start_date')[:5]
-        event_registrations_count = EventRegistration.objects.count()
-        strategic_decisions_count = StrategicDecision.objects.count()
+        event_registrations_count = summary.registration_count
+        strategic_decisions_count = summary.strategic_decision_count
 
         upcoming_events_data = [
             {
@@ -432,13 +973,15 @@ class DireksiDashboardView(APIView):
 
 class BPADashboardView(APIView):
     permission_classes = [IsAuthenticated]  # Sesuaikan jika perlu hanya untuk BPA
+    usage_data_limit = 20
 
     def get(self, request):
-        total_alumni = AlumniProfile.objects.count()
-        total_events = Event.objects.count()
-        total_donations = Donation.objects.aggregate(total=Sum('amount'))['total'] or 0
-        total_usages = Usage.objects.aggregate(total=Sum('amount'))['total'] or 0
-        balance = total_donations - total_usages
+        summary = DashboardSummary.current()
+        total_alumni = summary.alumni_count
+        total_events = summary.event_count
+        total_donations = summary.donation_total
+        total_usages = summary.usage_total
+        balance = summary.balance
 
         # Hitung partisipasi alumni: jumlah pendaftaran per event
         alumni_participation_qs = EventRegistration.objects.values('event__title').annotate(count=Count('id')).order_by('event__title')
@@ -447,9 +990,9 @@ class BPADashboardView(APIView):
             for item in alumni_participation_qs
         ]
 
-        # Ambil data penggunaan dana
-        usage_data_qs = Usage.objects.all().values("description", "amount", "date").order_by("-date")
-        usage_data = list(usage_data_qs)
+        # Ambil data penggunaan dana terbaru saja; riwayat lengkap lewat /api/ledger/
+        usage_data_qs = Usage.objects.all().values("description", "amount", "date").order_by("-date", "-id")
+        usage_data = list(usage_data_qs[:self.usage_data_limit])
 
         data = {
             "total_alumni": total_alumni,
@@ -462,8 +1005,35 @@ class BPADashboardView(APIView):
         }
         return Response(data)
     
+class LedgerView(APIView):
+    """
+    Rollup keuangan (donasi, penggunaan, saldo berjalan) dalam rentang tanggal.
+    Parameter: start, end (YYYY-MM-DD) dan granularity (day, week, month).
+    """
+    permission_classes = [IsAuthenticated, IsDireksiOrBPA]
+    default_range_days = 365
+
+    def get(self, request):
+        granularity = request.query_params.get('granularity', 'day')
+        if granularity not in LedgerDay.GRANULARITIES:
+            return Response({'detail': 'Parameter granularity tidak valid.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            end = parse_date(request.query_params['end']) if 'end' in request.query_params else timezone.localdate()
+            start = (
+                parse_date(request.query_params['start']) if 'start' in request.query_params
+                else end - timedelta(days=self.default_range_days)
+            )
+        except ValueError:
+            start = end = None
+        if start is None or end is None or start > end:
+            return Response({'detail': 'Rentang tanggal tidak valid.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        data = LedgerDay.series(start, end, granularity)
+        data.update({'start': start, 'end': end, 'granularity': granularity})
+        return Response(data)
+    
 # 1. Audit Aktivitas: ViewSet untuk log audit
-class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
+class AuditLogViewSet(EagerLoadingMixin, viewsets.ReadOnlyModelViewSet):
     """
     Endpoint untuk melihat log aktivitas (audit activity).
     Hanya dapat diakses oleh BPA.
@@ -476,34 +1046,101 @@ class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
 class AuditReportView(APIView):
     """
     Endpoint untuk BPA mengambil laporan audit.
+    Filter: start, end (tanggal atau datetime ISO), user (id) dan action.
+    Tanpa parameter export hasilnya dipaginasi; export=ndjson|csv mengalirkan
+    seluruh baris hasil filter sebagai file.
     """
     permission_classes = [IsAuthenticated, IsBPA]
+    pagination_class = KeysetPagination
+    # (nama kolom export, lookup ORM); data user diambil lewat join, bukan serializer bersarang
+    export_fields = [
+        ('id', 'id'),
+        ('timestamp', 'timestamp'),
+        ('user_id', 'user_id'),
+        ('username', 'user__username'),
+        ('user_role', 'user__role'),
+        ('action', 'action'),
+        ('details', 'details'),
+    ]
+    export_chunk_size = 2000
 
     def get(self, request):
-        logs = AuditLog.objects.all().order_by('-timestamp')
-        serializer = AuditLogSerializer(logs, many=True, context={'request': request})
-        return Response(serializer.data)
+        logs = self.filter_logs(request)
+        export_format = request.query_params.get('export')
+        if export_format:
+            if export_format not in EXPORT_FORMATS:
+                return Response({'detail': 'Parameter export tidak valid.'}, status=status.HTTP_400_BAD_REQUEST)
+            filename = 'audit-log-%s' % timezone.localdate().isoformat()
+            return export_response(logs, self.export_fields, export_format, filename,
+                                   chunk_size=self.export_chunk_size, request=request)
+
+        serializer = AuditLogSerializer(context={'request': request})
+        logs = get_eager_load_plan(serializer, AuditLog).apply(logs)
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(logs, request, view=self)
+        serializer = AuditLogSerializer(page, many=True, context={'request': request})
+        return paginator.get_paginated_response(serializer.data)
+
+    def filter_logs(self, request):
+        params = request.query_params
+        logs = AuditLog.objects.order_by('-timestamp', '-id')
+        start = self.parse_bound(params.get('start'), 'start')
+        end = self.parse_bound(params.get('end'), 'end')
+        if start is not None:
+            logs = logs.filter(timestamp__gte=start)
+        if end is not None:
+            logs = logs.filter(timestamp__lt=end)
+        if params.get('user'):
+            try:
+                logs = logs.filter(user_id=int(params['user']))
+            except ValueError:
+                raise ValidationError({'user': 'Parameter user harus berupa id.'})
+        if params.get('action'):
+            logs = logs.filter(action=params['action'])
+        return logs
+
+    @staticmethod
+    def parse_bound(value, name):
+        """
+        Mengubah parameter start/end menjadi datetime aware. Tanggal tanpa jam pada
+        `end` dianggap inklusif (sampai akhir hari tersebut).
+        """
+        if not value:
+            return None
+        try:
+            moment = parse_datetime(value)
+            if moment is None:
+                day = parse_date(value)
+                if day is None:
+                    raise ValueError
+                if name == 'end':
+                    day += timedelta(days=1)
+                moment = datetime.combine(day, time.min)
+        except ValueError:
+            raise ValidationError({name: 'Format tanggal tidak valid.'})
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+        return moment
 
 # 3. Pengawasan Event: View untuk menampilkan event beserta jumlah pendaftar
 class EventSupervisionView(APIView):
     """
     Endpoint untuk BPA melihat daftar event beserta jumlah pendaftar.
+    Mendukung ?fields= dan ?omit= (lihat requested_fields); kolom yang tidak
+    diminta tidak diambil dari database.
     """
     permission_classes = [IsAuthenticated, IsBPA]
+    supervision_fields = ['id', 'title', 'description', 'start_date', 'end_date', 'location', 'registration_count']
 
     def get(self, request):
-        events = Event.objects.annotate(registration_count=Count('registrations')).order_by('-start_date')
-        event_data = []
-        for event in events:
-            event_data.append({
-                "id": event.id,
-                "title": event.title,
-                "description": event.description,
-                "start_date": event.start_date,
-                "end_date": event.end_date,
-                "location": event.location,
-                "registration_count": event.registration_count,
-            })
+        names = requested_fields(request, self.supervision_fields)
+        if names is None:
+            names = self.supervision_fields
+        events = Event.objects.only('id', *[name for name in names if name not in ('id', 'registration_count')])
+        if 'registration_count' in names:
+            events = events.annotate(registration_count=Count('registrations'))
+        events = events.order_by('-start_date')
+        event_data = [{name: getattr(event, name) for name in names} for event in events]
         return Response(event_data)
     
 
@@ -511,9 +1148,10 @@ class StatisticsView(APIView):
     permission_classes = [IsAuthenticated]
     
     def get(self, request):
-        total_event_participation = EventRegistration.objects.count()
-        total_donations = Donation.objects.aggregate(total=Sum('amount'))['total'] or 0
-        total_engagement = Feedback.objects.count()
+        summary = DashboardSummary.current()
+        total_event_participation = summary.registration_count
+        total_donations = summary.donation_total
+        total_engagement = summary.feedback_count
         data = {
             "participation": total_event_participation,
             "donations": total_donations,
@@ -521,18 +1159,20 @@ class StatisticsView(APIView):
         }
         return Response(data)
     
-class DireksiViewSet(viewsets.ModelViewSet):
+class DireksiViewSet(ConditionalGetMixin, CachedReadMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = Direksi.objects.all()
     serializer_class = DireksiSerializer
+    pagination_class = None  # Tabel kecil, tidak perlu pagination
 
     def get_permissions(self):
         if self.request.method == 'GET':
             return [permissions.AllowAny()]
         return [permissions.IsAuthenticated(), IsDireksi()]
 
-class BPAViewSet(viewsets.ModelViewSet):
+class BPAViewSet(ConditionalGetMixin, CachedReadMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = BPA.objects.all()
     serializer_class = BPASerializer
+    pagination_class = None  # Tabel kecil, tidak perlu pagination
 
     def get_permissions(self):
         if self.request.method == 'GET':
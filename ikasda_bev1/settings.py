@@ -55,6 +55,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.audit.AuditLogMiddleware',  # Log audit untuk semua request tulis ke API
 ]
 
 # Izinkan semua origin (hanya untuk development; sesuaikan untuk production)
@@ -141,13 +142,84 @@ AUTH_USER_MODEL = 'core.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # JWTAuthentication dengan user dari cache (lihat core/authentication.py)
+        'core.authentication.CachedJWTAuthentication',
     ),
+    # Semua list endpoint memakai keyset pagination (tanpa OFFSET)
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.KeysetPagination',
+    'PAGE_SIZE': 20,
 }
 
+# Cache bersama untuk semua worker: versi model (invalidasi), respons
+# CachedReadMixin dan user autentikasi. Harus dipakai bersama oleh semua proses
+# (LocMemCache per proses membuat versi model tiap worker berbeda).
+# Produksi: Redis lewat REDIS_URL, setiap get/set O(1).
+REDIS_URL = os.environ.get('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'TIMEOUT': 300,
+        }
+    }
+else:
+    # Cadangan untuk development satu mesin tanpa Redis. FileBasedCache
+    # membaca seluruh isi direktori (_cull) di setiap set, jadi tidak untuk produksi.
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.path.join(BASE_DIR, 'var', 'cache'),
+            'TIMEOUT': 300,
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+
+# Lama user hasil autentikasi JWT disimpan di cache; dihapus setiap User disimpan/dihapus
+AUTH_USER_CACHE_TIMEOUT = 60  # detik
+
+# Log audit ditulis bertahap oleh thread latar belakang (lihat core/audit.py)
+AUDIT_LOG_ASYNC = True
+AUDIT_LOG_BATCH_SIZE = 200
+AUDIT_LOG_FLUSH_INTERVAL = 2.0  # detik
+AUDIT_LOG_SPOOL_DIR = os.path.join(BASE_DIR, 'var', 'audit-spool')
+
+# Fan-out notifikasi massal dijalankan di thread pool latar belakang (lihat core/notifications.py)
+NOTIFICATION_FANOUT_ASYNC = True
+NOTIFICATION_FANOUT_WORKERS = 2
+NOTIFICATION_FANOUT_CHUNK_SIZE = 1000
+
+# Server-Sent Events (/api/stream/), dilayani lewat ASGI (uvicorn)
+EVENT_STREAM_HEARTBEAT = 25  # detik
+EVENT_STREAM_RETRY_MS = 5000
+EVENT_STREAM_QUEUE_SIZE = 100
+
+# Turunan gambar (thumbnail/WebP) dibuat di process pool setelah upload (lihat core/imaging.py)
+IMAGE_RENDITIONS_ASYNC = True
+IMAGE_RENDITION_WORKERS = 2
+
+# Upload massal foto album (/api/galleryalbums/{id}/upload/)
+DATA_UPLOAD_MAX_NUMBER_FILES = 500
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# File upload dinamai berdasarkan hash isinya (<folder>/ab/cd/<sha256>.<ext>)
+STORAGES = {
+    'default': {
+        'BACKEND': 'core.storage.ContentAddressedStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
+
+# Penyerahan pengiriman file media ke proxy depan: None (Django sendiri),
+# 'x-accel-redirect' (nginx, lokasi internal MEDIA_ACCEL_PREFIX) atau 'x-sendfile'.
+# Diatur lewat environment di production: server ASGI tidak punya sendfile.
+MEDIA_ACCEL = os.environ.get('MEDIA_ACCEL') or None
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+
 TIME_ZONE = 'Asia/Jakarta'
 USE_TZ = True
 
@@ -162,6 +234,8 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
     'USER_ID_FIELD': 'id',
     'USER_ID_CLAIM': 'user_id',
+    # Token menyimpan hash password; token lama ditolak setelah password diganti
+    'CHECK_REVOKE_TOKEN': True,
 }
 
 